@@ -68,16 +68,27 @@ def get_info():
     return _get_pkg_info(os.path.dirname(__file__))
 
 
-from .pipeline import Node, MapNode, JoinNode, Workflow
-from .interfaces import (
-    DataGrabber,
-    DataSink,
-    SelectFiles,
-    IdentityInterface,
-    Rename,
-    Function,
-    Select,
-    Merge,
+from .utils.imports import lazy_module_attrs as _lazy_module_attrs
+
+# The pipeline engine and the interface layer (and with them numpy, scipy,
+# networkx, ...) are only imported when one of these names is first used.
+__getattr__, __dir__ = _lazy_module_attrs(
+    __name__,
+    {
+        "Node": ".pipeline",
+        "MapNode": ".pipeline",
+        "JoinNode": ".pipeline",
+        "Workflow": ".pipeline",
+        "DataGrabber": ".interfaces",
+        "DataSink": ".interfaces",
+        "SelectFiles": ".interfaces",
+        "IdentityInterface": ".interfaces",
+        "Rename": ".interfaces",
+        "Function": ".interfaces",
+        "Select": ".interfaces",
+        "Merge": ".interfaces",
+    },
+    submodules=("algorithms", "caching", "interfaces", "pipeline", "workflows"),
 )
 
 
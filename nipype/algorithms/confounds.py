@@ -7,6 +7,7 @@ Algorithms to compute confounds in :abbr:`fMRI (functional MRI)`
 import os
 import os.path as op
 from collections import OrderedDict
+from functools import partial
 from itertools import chain
 
 import nibabel as nb
@@ -27,7 +28,9 @@ from ..interfaces.base import (
     SimpleInterface,
     Tuple,
 )
+from ..utils.imagemanip import is_compressed, iter_volume_blocks, map_slabs
 from ..utils.misc import normalize_mc_params
+from ..utils.ram_estimator import SlabRamEstimator
 
 IFLOGGER = logging.getLogger("nipype.interface")
 
@@ -88,6 +91,11 @@ class ComputeDVARSInputSpec(BaseInterfaceInputSpec):
         "2012. Set this to 0 to disable intensity"
         "normalization altogether.",
     )
+    chunk_size = traits.Range(
+        low=1,
+        desc="process the timeseries in blocks of this many voxels, "
+        "which bounds the memory used by intermediate results",
+    )
 
 
 class ComputeDVARSOutputSpec(TraitedSpec):
@@ -171,6 +179,9 @@ Bradley L. and Petersen, Steven E.},
             remove_zerovariance=self.inputs.remove_zerovariance,
             variance_tol=self.inputs.variance_tol,
             intensity_normalization=self.inputs.intensity_normalization,
+            chunk_size=(
+                self.inputs.chunk_size if isdefined(self.inputs.chunk_size) else None
+            ),
         )
 
         (
@@ -509,6 +520,23 @@ class CompCorInputSpec(BaseInterfaceInputSpec):
         desc="When no components are found or convergence fails, raise an error "
         "or silently return columns of NaNs.",
     )
+    svd_method = traits.Enum(
+        "full",
+        "gram",
+        "randomized",
+        "auto",
+        usedefault=True,
+        desc="Decomposition of the noise ROI time series: the full SVD, the "
+        "eigendecomposition of the (time x time) Gram matrix (cheaper when "
+        "voxels outnumber timepoints), a randomized SVD computing only "
+        "``num_components`` components, or an automatic choice. Except for "
+        "``full``, the sign of each component is arbitrary.",
+    )
+    chunk_size = traits.Range(
+        low=1,
+        desc="Filter and decompose the time series in blocks of this many "
+        "voxels, bounding memory use (not effective with ``svd_method='full'``)",
+    )
 
 
 class CompCorOutputSpec(TraitedSpec):
@@ -669,6 +697,8 @@ class CompCor(SimpleInterface):
             TR,
             self.inputs.failure_mode,
             self.inputs.mask_names,
+            self.inputs.svd_method,
+            self.inputs.chunk_size if isdefined(self.inputs.chunk_size) else None,
         )
 
         if skip_vols:
@@ -833,11 +863,17 @@ class TCompCor(CompCor):
         out_images = []
         self._mask_files = []
         timeseries = np.asanyarray(timeseries)
+        chunk_size = (
+            self.inputs.chunk_size if isdefined(self.inputs.chunk_size) else None
+        )
         for i, img in enumerate(mask_images):
             mask = np.asanyarray(img.dataobj).astype(bool)
-            imgseries = timeseries[mask, :]
-            imgseries = regress_poly(2, imgseries)[0]
-            tSTD = _compute_tSTD(imgseries, 0, axis=-1)
+            tSTD = np.concatenate(
+                [
+                    _compute_tSTD(regress_poly(2, block)[0], 0, axis=-1)
+                    for block in _iter_masked(timeseries, mask, chunk_size)
+                ]
+            )
             threshold_std = np.percentile(
                 tSTD,
                 np.round(100.0 * (1.0 - self.inputs.percentile_threshold)).astype(int),
@@ -886,6 +922,15 @@ class TSNRInputSpec(BaseInterfaceInputSpec):
         hash_files=False,
         desc="input file after detrending",
     )
+    slab_size = traits.Range(
+        low=1,
+        desc="number of slices (along the third axis) processed at once. "
+        "Ignored with compressed inputs, which are read sequentially, and when "
+        "``regress_poly`` is set",
+    )
+    num_threads = traits.Int(
+        1, usedefault=True, nohash=True, desc="number of slabs processed in parallel"
+    )
 
 
 class TSNROutputSpec(TraitedSpec):
@@ -911,31 +956,53 @@ class TSNR(BaseInterface):
 
     input_spec = TSNRInputSpec
     output_spec = TSNROutputSpec
+    # Slabs of every run are read together, and the mean, standard deviation
+    # and tSNR maps are kept until written
+    _ram_estimator = SlabRamEstimator(n_outputs=3, full_series=("regress_poly",))
 
     def _run_interface(self, runtime):
         img = nb.load(self.inputs.in_file[0])
         header = img.header.copy()
-        vollist = [nb.load(filename) for filename in self.inputs.in_file]
-        data = np.concatenate(
-            [
-                vol.get_fdata(dtype=np.float32).reshape(vol.shape[:3] + (-1,))
-                for vol in vollist
-            ],
-            axis=3,
-        )
-        data = np.nan_to_num(data)
-
-        if data.dtype.kind == "i":
-            header.set_data_dtype(np.float32)
-            data = data.astype(np.float32)
+        vollist = [
+            nb.load(filename, keep_file_open=True) for filename in self.inputs.in_file
+        ]
 
         if isdefined(self.inputs.regress_poly):
+            data = np.concatenate(
+                [
+                    vol.get_fdata(dtype=np.float32).reshape(vol.shape[:3] + (-1,))
+                    for vol in vollist
+                ],
+                axis=3,
+            )
+            data = np.nan_to_num(data)
+
+            if data.dtype.kind == "i":
+                header.set_data_dtype(np.float32)
+                data = data.astype(np.float32)
+
             data = regress_poly(self.inputs.regress_poly, data, remove_mean=False)[0]
             img = nb.Nifti1Image(data, img.affine, header)
             nb.save(img, op.abspath(self.inputs.detrended_file))
 
-        meanimg = np.mean(data, axis=3)
-        stddevimg = np.std(data, axis=3)
+            meanimg = np.mean(data, axis=3)
+            stddevimg = np.std(data, axis=3)
+        else:
+            # Stream the series, without concatenating the runs
+            meanimg = np.zeros(img.shape[:3], dtype=np.float32)
+            stddevimg = np.zeros(img.shape[:3], dtype=np.float32)
+            dataobjs = [vol.dataobj for vol in vollist]
+
+            def _slab_moments(slab):
+                meanimg[slab], stddevimg[slab] = _temporal_moments(dataobjs, slab)
+
+            slab_size = None
+            if isdefined(self.inputs.slab_size) and not any(
+                is_compressed(vol) for vol in vollist
+            ):
+                slab_size = self.inputs.slab_size
+            map_slabs(_slab_moments, img.shape, slab_size, self.inputs.num_threads)
+
         tsnr = np.zeros_like(meanimg)
         stddevimg_nonzero = stddevimg > 1.0e-3
         tsnr[stddevimg_nonzero] = (
@@ -959,6 +1026,43 @@ class TSNR(BaseInterface):
         return outputs
 
 
+def _temporal_moments(dataobjs, slab=(slice(None),) * 3):
+    """
+    Mean and standard deviation along time of the concatenation of 4D (or 3D)
+    ``dataobjs``, within a spatial ``slab``.
+
+    Volumes are read by blocks, and the moments of each block are merged into
+    the running estimate with the parallel variant of Welford's algorithm
+    (Chan et al., 1979). NaNs are taken as zeros.
+
+    >>> data = np.random.default_rng(0).normal(size=(2, 2, 2, 70))
+    >>> mean, std = _temporal_moments([data[..., :40], data[..., 40:]])
+    >>> np.allclose(mean, data.mean(3)), np.allclose(std, data.std(3))
+    (True, True)
+
+    """
+    count, mean, m2 = 0, 0.0, 0.0
+    for dataobj in dataobjs:
+        if len(dataobj.shape) == 3:
+            blocks = [np.asarray(dataobj[slab], dtype=np.float32)[..., np.newaxis]]
+        else:
+            blocks = (block for _, block in iter_volume_blocks(dataobj, slab))
+
+        for block in blocks:
+            if np.isnan(block).any():
+                block = np.nan_to_num(block)
+            nblock = block.shape[-1]
+            block_mean = block.mean(axis=-1, dtype=np.float64)
+            block_m2 = np.square(block - block_mean[..., np.newaxis]).sum(axis=-1)
+
+            delta = block_mean - mean
+            total = count + nblock
+            mean = mean + delta * (nblock / total)
+            m2 = m2 + block_m2 + delta**2 * (count * nblock / total)
+            count = total
+    return mean, np.sqrt(m2 / count)
+
+
 class NonSteadyStateDetectorInputSpec(BaseInterfaceInputSpec):
     in_file = File(exists=True, mandatory=True, desc="4D NIFTI EPI file")
 
@@ -993,11 +1097,32 @@ class NonSteadyStateDetector(BaseInterface):
         return self._results
 
 
-def _AR_est_YW(x, order, rxx=None):
-    """Retrieve AR coefficients while dropping the sig_sq return value"""
-    from nitime.algorithms import AR_est_YW
+def _AR1_est(data):
+    """
+    Estimate the lag-1 autoregressive coefficient of each row of ``data``.
+
+    Batched equivalent of the order-1 Yule-Walker estimate of nitime's
+    ``AR_est_YW`` (i.e., the ratio of the biased lag-1 autocovariance to the
+    variance), computed for all rows at once.
+
+    >>> _AR1_est(np.array([[1.0, 2.0, 3.0, 4.0], [1.0, -1.0, 1.0, -1.0]]))
+    array([ 0.25, -0.75])
 
-    return AR_est_YW(x, order, rxx=rxx)[0]
+    """
+    data = data - data.mean(axis=1, keepdims=True)
+    num = np.einsum("ij,ij->i", data[:, 1:], data[:, :-1], dtype=np.float64)
+    den = np.einsum("ij,ij->i", data, data, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return num / den
+
+
+def _robust_sd(data):
+    """Robust standard deviation of each row, interpolating as FSL does."""
+    try:
+        q75, q25 = np.percentile(data, [75, 25], axis=1, method="lower")
+    except TypeError:  # NP < 1.22
+        q75, q25 = np.percentile(data, [75, 25], axis=1, interpolation="lower")
+    return (q75 - q25) / 1.349
 
 
 def compute_dvars(
@@ -1006,6 +1131,7 @@ def compute_dvars(
     remove_zerovariance=False,
     intensity_normalization=1000,
     variance_tol=0.0,
+    chunk_size=None,
 ):
     """
     Compute the :abbr:`DVARS (D referring to temporal
@@ -1022,78 +1148,84 @@ research/nichols/scripts/fsl/standardizeddvars.pdf>`_, 2013.
 
     .. note:: Implementation details
 
-      Uses the implementation of the `Yule-Walker equations
+      The :abbr:`AR (auto-regressive)` filtering of the fMRI signal uses
+      a lag-1 estimate equivalent to the `Yule-Walker equations
       from nitime
       <http://nipy.org/nitime/api/generated/nitime.algorithms.autoregressive.html\
-#nitime.algorithms.autoregressive.AR_est_YW>`_
-      for the :abbr:`AR (auto-regressive)` filtering of the fMRI signal.
+#nitime.algorithms.autoregressive.AR_est_YW>`_, evaluated on all voxels at
+      once.
 
     :param numpy.ndarray func: functional data, after head-motion-correction.
     :param numpy.ndarray mask: a 3D mask of the brain
     :param bool output_all: write out all dvars
     :param str out_file: a path to which the standardized dvars should be saved.
+    :param int chunk_size: process voxels in blocks of this size, bounding the
+      memory taken by intermediate arrays (default: all voxels at once)
     :return: the standardized DVARS
 
     """
-    import numpy as np
-    import nibabel as nb
     import warnings
 
-    func = np.float32(nb.load(in_file).dataobj)
-    mask = np.bool_(nb.load(in_mask).dataobj)
-
+    func = nb.load(in_file)
     if len(func.shape) != 4:
         raise RuntimeError("Input fMRI dataset should be 4-dimensional")
 
-    mfunc = func[mask]
+    # Mask before casting, so that only the voxels in the mask are converted
+    # to float32 (the image is read in its on-disk data type)
+    mask = np.bool_(nb.load(in_mask).dataobj)
+    mfunc = np.float32(np.asanyarray(func.dataobj)[mask])
+    del func
 
+    # All the statistics below scale linearly with the intensity, except for
+    # the standardized DVARS, which are scale-free. Normalization is then
+    # applied once on the (small) summaries rather than on the timeseries.
+    scale = 1.0
     if intensity_normalization != 0:
-        mfunc = (mfunc / np.median(mfunc)) * intensity_normalization
+        scale = intensity_normalization / np.median(mfunc)
 
-    # Robust standard deviation (we are using "lower" interpolation
-    # because this is what FSL is doing
-    try:
-        func_sd = (
-            np.percentile(mfunc, 75, axis=1, method="lower")
-            - np.percentile(mfunc, 25, axis=1, method="lower")
-        ) / 1.349
-    except TypeError:  # NP < 1.22
-        func_sd = (
-            np.percentile(mfunc, 75, axis=1, interpolation="lower")
-            - np.percentile(mfunc, 25, axis=1, interpolation="lower")
-        ) / 1.349
-
-    if remove_zerovariance:
-        zero_variance_voxels = func_sd > variance_tol
-        mfunc = mfunc[zero_variance_voxels, :]
-        func_sd = func_sd[zero_variance_voxels]
-
-    # Compute (non-robust) estimate of lag-1 autocorrelation
-    ar1 = np.apply_along_axis(
-        _AR_est_YW, 1, regress_poly(0, mfunc, remove_mean=True)[0].astype(np.float32), 1
-    )
+    nvox, ntr = mfunc.shape
+    chunk_size = max(nvox, 1) if not chunk_size else int(chunk_size)
 
-    # Compute (predicted) standard deviation of temporal difference time series
-    diff_sdhat = np.squeeze(np.sqrt(((1 - ar1) * 2).tolist())) * func_sd
-    diff_sd_mean = diff_sdhat.mean()
+    diff_sdhat = []
+    sq_diff = np.zeros(ntr - 1)
+    sq_diff_vx = np.zeros(ntr - 1)
+    nkept = 0
+    for start in range(0, max(nvox, 1), chunk_size):
+        chunk = mfunc[start : start + chunk_size]
+        func_sd = _robust_sd(chunk) * scale
 
-    # Compute temporal difference time series
-    func_diff = np.diff(mfunc, axis=1)
+        if remove_zerovariance:
+            keep = func_sd > variance_tol
+            chunk = chunk[keep]
+            func_sd = func_sd[keep]
 
-    # DVARS (no standardization)
-    dvars_nstd = np.sqrt(np.square(func_diff).mean(axis=0))
+        # Compute (non-robust) estimate of lag-1 autocorrelation, and
+        # (predicted) standard deviation of temporal difference time series
+        ar1 = _AR1_est(chunk)
+        sdhat = np.sqrt((1 - ar1) * 2) * func_sd
+        diff_sdhat.append(sdhat)
 
-    # standardization
-    dvars_stdz = dvars_nstd / diff_sd_mean
+        # Temporal difference time series
+        func_diff = np.diff(chunk, axis=1) * np.float32(scale)
+        sq_diff += np.einsum("ij,ij->j", func_diff, func_diff, dtype=np.float64)
 
-    with warnings.catch_warnings():  # catch, e.g., divide by zero errors
-        warnings.filterwarnings("error")
+        with warnings.catch_warnings():  # catch, e.g., divide by zero errors
+            warnings.filterwarnings("error")
 
-        # voxelwise standardization
-        diff_vx_stdz = np.square(
-            func_diff / np.array([diff_sdhat] * func_diff.shape[-1]).T
-        )
-        dvars_vx_stdz = np.sqrt(diff_vx_stdz.mean(axis=0))
+            # voxelwise standardization
+            func_diff /= sdhat[:, np.newaxis]
+            sq_diff_vx += np.einsum("ij,ij->j", func_diff, func_diff, dtype=np.float64)
+        nkept += len(chunk)
+
+    diff_sd_mean = np.concatenate(diff_sdhat).mean()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # DVARS (no standardization)
+        dvars_nstd = np.sqrt(sq_diff / nkept)
+        dvars_vx_stdz = np.sqrt(sq_diff_vx / nkept)
+
+    # standardization
+    dvars_stdz = dvars_nstd / diff_sd_mean
 
     return (dvars_stdz, dvars_nstd, dvars_vx_stdz)
 
@@ -1309,6 +1441,79 @@ def combine_mask_files(mask_files, mask_method=None, mask_index=None):
         return [img]
 
 
+def _iter_masked(data, mask, chunk_size=None):
+    """Yield the time series of the voxels within ``mask``, by blocks."""
+    if not chunk_size or not mask.any():
+        yield data[mask, :]
+        return
+
+    coords = np.nonzero(mask)
+    for start in range(0, len(coords[0]), chunk_size):
+        yield data[tuple(c[start : start + chunk_size] for c in coords)]
+
+
+def _noise_svd(blocks, ntr, nvox, svd_method, num_components, seed=0):
+    """
+    Decompose the (timepoints x voxels) matrix given by the concatenation of
+    ``blocks()``, returning its leading left singular vectors, the singular
+    values and the total sum of squares.
+
+    ``svd_method`` selects the decomposition:
+
+      - ``'full'``: SVD of the whole matrix
+      - ``'gram'``: eigendecomposition of the (timepoints x timepoints) matrix
+        :math:`MM^T`, accumulated block by block
+      - ``'randomized'``: randomized range finder with power iterations
+        [Halko2011]_, returning only the ``num_components`` leading singular
+        vectors
+
+    .. [Halko2011] Halko N, Martinsson PG, Tropp JA, `Finding structure with
+         randomness: probabilistic algorithms for constructing approximate
+         matrix decompositions <https://doi.org/10.1137/090771806>`_, 2011.
+
+    """
+    if svd_method == "full":
+        M = list(blocks())
+        M = M[0] if len(M) == 1 else np.hstack(M)
+        u, s, _ = fallback_svd(M, full_matrices=False)
+        return u, s, np.sum(s**2)
+
+    if svd_method == "gram":
+        gram = np.zeros((ntr, ntr))
+        for block in blocks():
+            gram += block.dot(block.T)
+        w, u = np.linalg.eigh(gram)
+        # Sort in decreasing order, keeping the (at most) nvox non-null values
+        rank = min(ntr, nvox)
+        w, u = w[::-1][:rank], u[:, ::-1][:, :rank]
+        s = np.sqrt(np.clip(w, 0, None))
+        return u, s, np.sum(s**2)
+
+    # Randomized SVD: sample the range of M with a few more vectors than
+    # requested, then refine the estimate with power iterations
+    nsamples = min(num_components + 10, ntr, nvox)
+    rng = np.random.default_rng(seed)
+    Y = np.zeros((ntr, nsamples))
+    total = 0.0
+    for block in blocks():
+        Y += block.dot(rng.standard_normal((block.shape[1], nsamples)))
+        total += np.sum(np.square(block, dtype=np.float64))
+    for _ in range(2):
+        Q = np.linalg.qr(Y)[0]
+        Y = np.zeros_like(Q)
+        for block in blocks():
+            Y += block.dot(block.T.dot(Q))
+    Q = np.linalg.qr(Y)[0]
+
+    B = np.zeros((nsamples, nsamples))
+    for block in blocks():
+        QtM = Q.T.dot(block)
+        B += QtM.dot(QtM.T)
+    w, v = np.linalg.eigh(B)
+    w, v = w[::-1][:num_components], v[:, ::-1][:, :num_components]
+    return Q.dot(v), np.sqrt(np.clip(w, 0, None)), total
+
+
 def compute_noise_components(
     imgseries,
     mask_images,
@@ -1319,6 +1524,8 @@ def compute_noise_components(
     repetition_time=None,
     failure_mode="error",
     mask_names=None,
+    svd_method="full",
+    chunk_size=None,
 ):
     """
     Compute the noise components from the image series for each mask.
@@ -1362,6 +1569,27 @@ def compute_noise_components(
     repetition_time: float
         Time (in sec) between volume acquisitions. This must be defined if
         the ``filter_type`` is ``cosine``.
+    svd_method: str
+        Decomposition of the noise ROI time series.
+
+            - 'full' - Singular value decomposition of the full matrix
+            - 'gram' - Eigendecomposition of the (time x time) Gram matrix,
+              which is cheaper when voxels largely outnumber timepoints
+            - 'randomized' - Randomized SVD, only computing the requested
+              components. It requires a fixed number of components, and
+              falls back to ``'gram'`` otherwise.
+            - 'auto' - ``'randomized'`` when a few components are requested
+              from long, unchunked series, ``'gram'`` when voxels outnumber
+              timepoints, ``'full'`` otherwise
+
+        Except for ``'full'``, the sign of the components is arbitrary.
+        With ``'randomized'``, the metadata only cover the retained
+        components.
+    chunk_size: int or None
+        Filter and decompose the time series in blocks of this many voxels,
+        so that memory scales with the block rather than with the mask size.
+        Has no effect on memory with ``'full'``, which requires the whole
+        matrix.
 
     Returns
     -------
@@ -1379,33 +1607,17 @@ def compute_noise_components(
         components_criterion = -1
     mask_names = mask_names or range(len(mask_images))
 
-    components = []
-    md_mask = []
-    md_sv = []
-    md_var = []
-    md_cumvar = []
-    md_retained = []
-
-    for name, img in zip(mask_names, mask_images):
-        mask = np.asanyarray(nb.squeeze_image(img).dataobj).astype(bool)
-        if imgseries.shape[:3] != mask.shape:
-            raise ValueError(
-                "Inputs for CompCor, timeseries and mask, do not have "
-                "matching spatial dimensions ({} and {}, respectively)".format(
-                    imgseries.shape[:3], mask.shape
-                )
-            )
-
-        voxel_timecourses = imgseries[mask, :]
+    if filter_type == "cosine" and repetition_time is None:
+        raise ValueError("Repetition time must be provided for cosine filter")
 
+    def _preprocess(voxel_timecourses):
         # Zero-out any bad values
         voxel_timecourses[np.isnan(np.sum(voxel_timecourses, axis=1)), :] = 0
 
         # Currently support Legendre-polynomial or cosine or detrending
         # With no filter, the mean is nonetheless removed (poly w/ degree 0)
+        basis = np.array([])
         if filter_type == "cosine":
-            if repetition_time is None:
-                raise ValueError("Repetition time must be provided for cosine filter")
             voxel_timecourses, basis = cosine_filter(
                 voxel_timecourses,
                 repetition_time,
@@ -1426,24 +1638,75 @@ def compute_noise_components(
         M = voxel_timecourses.T
 
         # "[... were removed] prior to column-wise variance normalization."
-        M = M / _compute_tSTD(M, 1.0)
+        return M / _compute_tSTD(M, 1.0), basis
+
+    components = []
+    md_mask = []
+    md_sv = []
+    md_var = []
+    md_cumvar = []
+    md_retained = []
+
+    ntr = imgseries.shape[-1]
+    for name, img in zip(mask_names, mask_images):
+        mask = np.asanyarray(nb.squeeze_image(img).dataobj).astype(bool)
+        if imgseries.shape[:3] != mask.shape:
+            raise ValueError(
+                "Inputs for CompCor, timeseries and mask, do not have "
+                "matching spatial dimensions ({} and {}, respectively)".format(
+                    imgseries.shape[:3], mask.shape
+                )
+            )
+
+        nvox = int(np.count_nonzero(mask))
+        method = svd_method
+        if method == "auto":
+            # The randomized SVD needs several passes over the data, and only
+            # pays off over the Gram matrix for long series kept in memory
+            method = "full"
+            if (
+                components_criterion >= 1
+                and not chunk_size
+                and 50 * (components_criterion + 10) < ntr
+            ):
+                method = "randomized"
+            elif nvox > ntr:
+                method = "gram"
+        if method == "randomized" and components_criterion < 1:
+            method = "gram"
+        if nvox == 0:
+            method = "full"
+
+        # Filtering and normalization are voxel-wise, so they are carried out
+        # block by block (and again on every pass of the decomposition)
+        def blocks(mask=mask):
+            nonlocal basis
+            for block in _iter_masked(imgseries, mask, chunk_size):
+                M, basis = _preprocess(block)
+                yield M
+
+        if not chunk_size:
+            blocks = partial(iter, list(blocks()))
 
         # "The covariance matrix C = MMT was constructed and decomposed into its
         # principal components using a singular value decomposition."
         try:
-            u, s, _ = fallback_svd(M, full_matrices=False)
+            u, s, total = _noise_svd(
+                blocks, ntr, nvox, method, int(components_criterion)
+            )
         except (np.linalg.LinAlgError, ValueError):
             if failure_mode == "error":
                 raise
-            s = np.full(M.shape[0], np.nan, dtype=np.float32)
+            s = np.full(ntr, np.nan, dtype=np.float32)
+            total = np.nan
             if components_criterion >= 1:
-                u = np.full(
-                    (M.shape[0], components_criterion), np.nan, dtype=np.float32
-                )
+                u = np.full((ntr, components_criterion), np.nan, dtype=np.float32)
             else:
-                u = np.full((M.shape[0], 1), np.nan, dtype=np.float32)
+                u = np.full((ntr, 1), np.nan, dtype=np.float32)
 
-        variance_explained = (s**2) / np.sum(s**2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # No variance at all (e.g., constant signals) leaves NaNs
+            variance_explained = (s**2) / total
         cumulative_variance_explained = np.cumsum(variance_explained)
 
         num_components = int(components_criterion)
@@ -1470,7 +1733,7 @@ def compute_noise_components(
     else:
         if failure_mode == "error":
             raise ValueError("No components found")
-        components = np.full((M.shape[0], num_components), np.nan, dtype=np.float32)
+        components = np.full((ntr, num_components), np.nan, dtype=np.float32)
 
     metadata = OrderedDict(
         [
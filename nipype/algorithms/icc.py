@@ -10,6 +10,7 @@ from ..interfaces.base import (
     BaseInterface,
     traits,
     File,
+    isdefined,
 )
 
 
@@ -20,6 +21,11 @@ class ICCInputSpec(BaseInterfaceInputSpec):
         mandatory=True,
     )
     mask = File(exists=True, mandatory=True)
+    chunk_size = traits.Range(
+        low=1,
+        desc="compute the ICC in blocks of this many voxels, bounding the "
+        "memory used by intermediate results",
+    )
 
 
 class ICCOutputSpec(TraitedSpec):
@@ -43,21 +49,34 @@ class ICC(BaseInterface):
         maskdata = nb.load(self.inputs.mask).get_fdata()
         maskdata = np.logical_not(np.logical_or(maskdata == 0, np.isnan(maskdata)))
 
-        session_datas = [
-            [nb.load(fname).get_fdata()[maskdata].reshape(-1, 1) for fname in sessions]
-            for sessions in self.inputs.subjects_sessions
-        ]
-        list_of_sessions = [np.dstack(session_data) for session_data in session_datas]
-        all_data = np.hstack(list_of_sessions)
-        icc = np.zeros(session_datas[0][0].shape)
-        session_F = np.zeros(session_datas[0][0].shape)
-        session_var = np.zeros(session_datas[0][0].shape)
-        subject_var = np.zeros(session_datas[0][0].shape)
-
-        for x in range(icc.shape[0]):
-            Y = all_data[x, :, :]
-            icc[x], subject_var[x], session_var[x], session_F[x], _, _ = ICC_rep_anova(
-                Y
+        # voxels x subjects x sessions, reading (memory-mapped, if possible)
+        # each image once
+        subjects_sessions = self.inputs.subjects_sessions
+        all_data = np.empty(
+            (
+                np.count_nonzero(maskdata),
+                len(subjects_sessions),
+                len(subjects_sessions[0]),
+            )
+        )
+        for i, sessions in enumerate(subjects_sessions):
+            for j, fname in enumerate(sessions):
+                all_data[:, i, j] = np.asanyarray(nb.load(fname, mmap=True).dataobj)[
+                    maskdata
+                ]
+
+        nvox = all_data.shape[0]
+        chunk_size = nvox
+        if isdefined(self.inputs.chunk_size):
+            chunk_size = self.inputs.chunk_size
+
+        icc = np.zeros(nvox)
+        session_var = np.zeros(nvox)
+        subject_var = np.zeros(nvox)
+        for start in range(0, nvox, chunk_size):
+            block = slice(start, start + chunk_size)
+            icc[block], subject_var[block], session_var[block], _, _, _ = (
+                ICC_rep_anova_batch(all_data[block])
             )
 
         nim = nb.load(self.inputs.subjects_sessions[0][0])
@@ -157,3 +176,58 @@ def ICC_rep_anova(Y, projection_matrix=None):
     r_var = (MSR - MSE) / nb_conditions  # variance between subjects
 
     return ICC, r_var, e_var, session_effect_F, dfc, dfe
+
+
+def ICC_rep_anova_batch(Y):
+    """
+    Vectorized :func:`ICC_rep_anova` over the first axis of ``Y``.
+
+    ``Y`` is an array of shape (voxels, subjects, repeated measures), and each
+    of the returned statistics is an array with one value per voxel (except
+    for the degrees of freedom).
+    Because the design is balanced, the residuals of the repeated measure
+    ANOVA are obtained from the subject and session means instead of a
+    projection matrix.
+
+    >>> Y = np.array([[9, 2, 5, 8], [6, 1, 3, 2], [8, 4, 6, 8],
+    ...               [7, 1, 2, 6], [10, 5, 6, 9], [6, 2, 4, 7]])
+    >>> icc = ICC_rep_anova_batch(np.stack([Y, 2 * Y]))[0]
+    >>> np.round(icc, 2)
+    array([0.71, 0.71])
+    """
+    _, nb_subjects, nb_conditions = Y.shape
+    dfc = nb_conditions - 1
+    dfr = nb_subjects - 1
+    dfe = dfr * dfc
+
+    # Sum Square Total
+    demeaned_Y = Y - Y.mean(axis=(1, 2), keepdims=True)
+    SST = np.einsum("vij,vij->v", demeaned_Y, demeaned_Y)
+
+    # Sum Square Error
+    session_means = demeaned_Y.mean(axis=1, keepdims=True)
+    subject_means = demeaned_Y.mean(axis=2, keepdims=True)
+    residuals = demeaned_Y - session_means - subject_means
+    SSE = np.einsum("vij,vij->v", residuals, residuals)
+
+    MSE = SSE / dfe
+
+    # Sum square session effect - between columns/sessions
+    SSC = np.sum(session_means[:, 0, :] ** 2, axis=1) * nb_subjects
+    MSC = SSC / dfc / nb_subjects
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        session_effect_F = MSC / MSE
+
+        # Sum square subject effect - between rows/subjects
+        SSR = SST - SSC - SSE
+        MSR = SSR / dfr
+
+        # ICC(3,1) = (mean square subject - mean square error) /
+        #            (mean square subject + (k-1)*-mean square error)
+        ICC = (MSR - MSE) / (MSR + dfc * MSE)
+
+    e_var = MSE  # variance of error
+    r_var = (MSR - MSE) / nb_conditions  # variance between subjects
+
+    return ICC, r_var, e_var, session_effect_F, dfc, dfe
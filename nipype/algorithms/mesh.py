@@ -23,6 +23,67 @@ from ..interfaces import vtkbase as VTKInfo
 IFLOGGER = logging.getLogger("nipype.interface")
 
 
+def face_areas(points, faces):
+    """
+    Compute the area of every triangle of a mesh.
+
+    >>> points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 2]], dtype=float)
+    >>> face_areas(points, [[0, 1, 2], [0, 1, 3]])
+    array([0.5, 1. ])
+
+    """
+    tri = np.asanyarray(points, dtype=float)[np.asanyarray(faces, dtype=int)]
+    return 0.5 * nla.norm(
+        np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]), axis=1
+    )
+
+
+def vertex_areas(points, faces, areas=None):
+    """
+    Compute, for every vertex, the total area of the triangles it belongs to.
+
+    ``areas`` may be given if the face areas (see :func:`face_areas`) were
+    already computed.
+
+    >>> points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 2]], dtype=float)
+    >>> vertex_areas(points, [[0, 1, 2], [0, 1, 3]])
+    array([1.5, 1.5, 0.5, 1. ])
+
+    """
+    faces = np.asanyarray(faces, dtype=int)
+    if areas is None:
+        areas = face_areas(points, faces)
+    weights = np.zeros(len(points))
+    for column in faces.T:
+        weights += np.bincount(column, weights=areas, minlength=len(points))
+    return weights
+
+
+def broadcast_field(values, shape):
+    """
+    Broadcast vertex-wise operator values to the shape of a warping field.
+
+    Scalar values (one per vertex) are repeated along every dimension, and
+    vector values must already match ``shape``.
+
+    >>> broadcast_field([1.0, 2.0], (2, 3))
+    array([[1., 1., 1.],
+           [2., 2., 2.]])
+
+    """
+    values = np.asanyarray(values, dtype=float)
+    if values.ndim == 2 and values.shape[1] == 1:
+        values = values[:, 0]
+    if values.ndim == 1 and len(values) == shape[0]:
+        return np.repeat(values[:, np.newaxis], shape[1], axis=1)
+    if values.shape != tuple(shape):
+        raise ValueError(
+            "Operator values of shape %s cannot be applied to a warping field "
+            "of shape %s" % (values.shape, tuple(shape))
+        )
+    return values
+
+
 class TVTKBaseInterface(BaseInterface):
     """A base class for interfaces using VTK"""
 
@@ -110,7 +171,7 @@ class WarpPoints(TVTKBaseInterface):
         vox2ras = affine[0:3, 0:3]
         ras2vox = np.linalg.inv(vox2ras)
         origin = affine[0:3, 3]
-        voxpoints = np.array([np.dot(ras2vox, (p - origin)) for p in points])
+        voxpoints = (points - origin).dot(ras2vox.T)
 
         warps = []
         for axis in warp_dims:
@@ -123,8 +184,7 @@ class WarpPoints(TVTKBaseInterface):
             warps.append(warp)
 
         disps = np.squeeze(np.dstack(warps))
-        newpoints = [p + d for p, d in zip(points, disps)]
-        mesh.points = newpoints
+        mesh.points = points + disps
         w = tvtk.PolyDataWriter()
         VTKInfo.configure_input_data(w, mesh)
         w.file_name = self._gen_fname(self.inputs.points, suffix="warped", ext=".vtk")
@@ -209,16 +269,6 @@ class ComputeMeshWarp(TVTKBaseInterface):
     input_spec = ComputeMeshWarpInputSpec
     output_spec = ComputeMeshWarpOutputSpec
 
-    def _triangle_area(self, A, B, C):
-        A = np.array(A)
-        B = np.array(B)
-        C = np.array(C)
-        ABxAC = nla.norm(A - B) * nla.norm(A - C)
-        prod = np.dot(B - A, C - A)
-        angle = np.arccos(prod / ABxAC)
-        area = 0.5 * ABxAC * np.sin(angle)
-        return area
-
     def _run_interface(self, runtime):
         r1 = tvtk.PolyDataReader(file_name=self.inputs.surface1)
         r2 = tvtk.PolyDataReader(file_name=self.inputs.surface2)
@@ -244,18 +294,7 @@ class ComputeMeshWarp(TVTKBaseInterface):
 
         if self.inputs.weighting == "area":
             faces = vtk1.polys.to_array().reshape(-1, 4).astype(int)[:, 1:]
-
-            for i, p1 in enumerate(points2):
-                # compute surfaces, set in weight
-                w = 0.0
-                point_faces = faces[(faces[:, :] == i).any(axis=1)]
-
-                for idset in point_faces:
-                    fp1 = points1[int(idset[0])]
-                    fp2 = points1[int(idset[1])]
-                    fp3 = points1[int(idset[2])]
-                    w += self._triangle_area(fp1, fp2, fp3)
-                weights[i] = w
+            weights = vertex_areas(points1, faces)
 
         result = np.vstack([errvector, weights])
         np.save(op.abspath(self.inputs.out_file), result.transpose())
@@ -361,7 +400,7 @@ class MeshWarpMaths(TVTKBaseInterface):
         opfield = np.ones_like(points1)
 
         if isinstance(operator, (str, bytes)):
-            r2 = tvtk.PolyDataReader(file_name=self.inputs.surface2)
+            r2 = tvtk.PolyDataReader(file_name=operator)
             vtk2 = VTKInfo.vtk_output(r2)
             r2.update()
             assert len(points1) == len(vtk2.points)
@@ -374,10 +413,7 @@ class MeshWarpMaths(TVTKBaseInterface):
             if opfield is None:
                 raise RuntimeError("No operator values found in operator file")
 
-            opfield = np.array(opfield)
-
-            if opfield.shape[1] < points1.shape[1]:
-                opfield = np.array([opfield.tolist()] * points1.shape[1]).T
+            opfield = broadcast_field(opfield, points1.shape)
         else:
             operator = np.atleast_1d(operator)
             opfield *= operator
@@ -53,6 +53,12 @@ class DistanceInputSpec(BaseInterfaceInputSpec):
         usedefault=True,
     )
     mask_volume = File(exists=True, desc="calculate overlap only within this mask.")
+    multilabel = traits.Bool(
+        False,
+        usedefault=True,
+        desc="treat volumes as label maps and compute the distance between "
+        "corresponding labels (eucl_min, eucl_mean and eucl_max only)",
+    )
 
 
 class DistanceOutputSpec(TraitedSpec):
@@ -60,6 +66,10 @@ class DistanceOutputSpec(TraitedSpec):
     point1 = traits.Array(shape=(3,))
     point2 = traits.Array(shape=(3,))
     histogram = File()
+    labels = traits.List(traits.Int(), desc="detected labels (with multilabel)")
+    label_distances = traits.List(
+        traits.Float(), desc="distance per label (with multilabel)"
+    )
 
 
 class Distance(BaseInterface):
@@ -85,9 +95,14 @@ class Distance(BaseInterface):
         coordinates = np.dot(affine, indices)
         return coordinates[:3, :]
 
-    def _eucl_min(self, nii1, nii2):
-        from scipy.spatial.distance import cdist, euclidean
+    def _nearest(self, coordinates1, coordinates2):
+        """Distance from each point of coordinates2 to the closest of coordinates1,
+        and the index of the latter."""
+        from scipy.spatial import cKDTree
+
+        return cKDTree(coordinates1.T).query(coordinates2.T)
 
+    def _eucl_min(self, nii1, nii2):
         origdata1 = np.asanyarray(nii1.dataobj).astype(bool)
         border1 = self._find_border(origdata1)
 
@@ -98,10 +113,11 @@ class Distance(BaseInterface):
 
         set2_coordinates = self._get_coordinates(border2, nii2.affine)
 
-        dist_matrix = cdist(set1_coordinates.T, set2_coordinates.T)
-        point1, point2 = np.unravel_index(np.argmin(dist_matrix), dist_matrix.shape)
+        distances, nearest = self._nearest(set2_coordinates, set1_coordinates)
+        point1 = np.argmin(distances)
+        point2 = nearest[point1]
         return (
-            euclidean(set1_coordinates.T[point1, :], set2_coordinates.T[point2, :]),
+            distances[point1],
             set1_coordinates.T[point1, :],
             set2_coordinates.T[point2, :],
         )
@@ -131,38 +147,36 @@ class Distance(BaseInterface):
 
         return np.mean(dist_matrix)
 
-    def _eucl_mean(self, nii1, nii2, weighted=False):
-        from scipy.spatial.distance import cdist
-
-        origdata1 = np.asanyarray(nii1.dataobj).astype(bool)
-        border1 = self._find_border(origdata1)
-
-        origdata2 = np.asanyarray(nii2.dataobj).astype(bool)
-
-        set1_coordinates = self._get_coordinates(border1, nii1.affine)
-        set2_coordinates = self._get_coordinates(origdata2, nii2.affine)
-
-        dist_matrix = cdist(set1_coordinates.T, set2_coordinates.T)
-        min_dist_matrix = np.amin(dist_matrix, axis=0)
+    def _plot_histogram(self, distances):
         import matplotlib
 
         matplotlib.use(config.get("execution", "matplotlib_backend"))
         import matplotlib.pyplot as plt
 
         plt.figure()
-        plt.hist(min_dist_matrix, 50, density=True, facecolor="green")
+        plt.hist(distances, 50, density=True, facecolor="green")
         plt.savefig(self._hist_filename)
         plt.clf()
         plt.close()
 
+    def _eucl_mean(self, nii1, nii2, weighted=False):
+        origdata1 = np.asanyarray(nii1.dataobj).astype(bool)
+        border1 = self._find_border(origdata1)
+
+        origdata2 = np.asanyarray(nii2.dataobj).astype(bool)
+
+        set1_coordinates = self._get_coordinates(border1, nii1.affine)
+        set2_coordinates = self._get_coordinates(origdata2, nii2.affine)
+
+        min_dist_matrix = self._nearest(set1_coordinates, set2_coordinates)[0]
+        self._plot_histogram(min_dist_matrix)
+
         if weighted:
             return np.average(min_dist_matrix, weights=nii2.dataobj[origdata2].flat)
         else:
             return np.mean(min_dist_matrix)
 
     def _eucl_max(self, nii1, nii2):
-        from scipy.spatial.distance import cdist
-
         origdata1 = np.asanyarray(nii1.dataobj)
         origdata1 = (np.rint(origdata1) != 0) & ~np.isnan(origdata1)
         origdata2 = np.asanyarray(nii2.dataobj)
@@ -182,17 +196,90 @@ class Distance(BaseInterface):
 
         set1_coordinates = self._get_coordinates(border1, nii1.affine)
         set2_coordinates = self._get_coordinates(border2, nii2.affine)
-        distances = cdist(set1_coordinates.T, set2_coordinates.T)
-        mins = np.concatenate((np.amin(distances, axis=0), np.amin(distances, axis=1)))
+        mins = np.concatenate(
+            (
+                self._nearest(set1_coordinates, set2_coordinates)[0],
+                self._nearest(set2_coordinates, set1_coordinates)[0],
+            )
+        )
 
         return np.max(mins)
 
+    def _label_data(self, nii):
+        data = np.asanyarray(nii.dataobj)
+        if data.ndim == 4:
+            data = data[:, :, :, 0]
+        data = np.rint(np.nan_to_num(data)).astype(np.int32)
+        if isdefined(self.inputs.mask_volume):
+            maskdata = np.asanyarray(nb.load(self.inputs.mask_volume).dataobj)
+            data[(np.rint(maskdata) == 0) | np.isnan(maskdata)] = 0
+        return data
+
+    def _label_borders(self, data):
+        """Keep the voxels of a label map that touch a different label."""
+        from scipy import ndimage
+
+        footprint = ndimage.generate_binary_structure(data.ndim, 1)
+        lowest = ndimage.minimum_filter(data, footprint=footprint, mode="constant")
+        highest = ndimage.maximum_filter(data, footprint=footprint, mode="constant")
+        return np.where((lowest != data) | (highest != data), data, 0)
+
+    def _label_coordinates(self, data, affine):
+        """Coordinates of the labeled voxels, grouped by label."""
+        indices = np.nonzero(data)
+        labels = data[indices]
+        order = np.argsort(labels, kind="stable")
+        coordinates = nb.affines.apply_affine(affine, np.column_stack(indices)[order]).T
+        labels, first = np.unique(labels[order], return_index=True)
+        return dict(zip(labels.tolist(), np.split(coordinates, first[1:], axis=1)))
+
+    def _eucl_labels(self, nii1, nii2):
+        """Compute the distance of every label present in either volume."""
+        method = self.inputs.method
+        if method not in ("eucl_min", "eucl_mean", "eucl_max"):
+            raise ValueError("multilabel is not supported with method %s" % method)
+
+        data1 = self._label_data(nii1)
+        data2 = self._label_data(nii2)
+        set1 = self._label_coordinates(self._label_borders(data1), nii1.affine)
+        if method == "eucl_mean":
+            set2 = self._label_coordinates(data2, nii2.affine)
+        else:
+            set2 = self._label_coordinates(self._label_borders(data2), nii2.affine)
+
+        labels = sorted(set(set1) | set(set2))
+        distances = []
+        all_mins = []
+        for label in labels:
+            if label not in set1 or label not in set2:
+                distances.append(np.nan)
+                continue
+            mins = self._nearest(set1[label], set2[label])[0]
+            if method == "eucl_min":
+                distances.append(np.min(mins))
+            elif method == "eucl_mean":
+                all_mins.append(mins)
+                distances.append(np.mean(mins))
+            else:
+                mins_back = self._nearest(set2[label], set1[label])[0]
+                distances.append(max(np.max(mins), np.max(mins_back)))
+
+        if method == "eucl_mean":
+            self._plot_histogram(np.concatenate(all_mins) if all_mins else [])
+        return labels, [float(d) for d in distances]
+
     def _run_interface(self, runtime):
         # there is a bug in some scipy ndimage methods that gets tripped by memory mapped objects
         nii1 = nb.load(self.inputs.volume1, mmap=False)
         nii2 = nb.load(self.inputs.volume2, mmap=False)
 
-        if self.inputs.method == "eucl_min":
+        if self.inputs.multilabel:
+            self._labels, self._label_distances = self._eucl_labels(nii1, nii2)
+            distances = np.array(self._label_distances)
+            distances = distances[~np.isnan(distances)]
+            self._distance = np.mean(distances) if distances.size else np.nan
+
+        elif self.inputs.method == "eucl_min":
             self._distance, self._point1, self._point2 = self._eucl_min(nii1, nii2)
 
         elif self.inputs.method == "eucl_cog":
@@ -211,7 +298,12 @@ class Distance(BaseInterface):
     def _list_outputs(self):
         outputs = self._outputs().get()
         outputs["distance"] = self._distance
-        if self.inputs.method == "eucl_min":
+        if self.inputs.multilabel:
+            outputs["labels"] = self._labels
+            outputs["label_distances"] = self._label_distances
+            if self.inputs.method == "eucl_mean":
+                outputs["histogram"] = os.path.abspath(self._hist_filename)
+        elif self.inputs.method == "eucl_min":
             outputs["point1"] = self._point1
             outputs["point2"] = self._point2
         elif self.inputs.method in ["eucl_mean", "eucl_wmean"]:
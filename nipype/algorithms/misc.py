@@ -27,6 +27,8 @@ from ..interfaces.base import (
     Tuple,
 )
 from ..utils.filemanip import fname_presuffix, split_filename, ensure_list
+from ..utils.imagemanip import is_compressed, map_slabs
+from ..utils.ram_estimator import SlabRamEstimator
 
 from . import confounds
 
@@ -1172,6 +1174,9 @@ class SplitROIsInputSpec(TraitedSpec):
     in_file = File(exists=True, mandatory=True, desc="file to be split")
     in_mask = File(exists=True, desc="only process files inside mask")
     roi_size = Tuple(traits.Int, traits.Int, traits.Int, desc="desired ROI size")
+    num_threads = traits.Int(
+        1, usedefault=True, nohash=True, desc="number of ROIs written in parallel"
+    )
 
 
 class SplitROIsOutputSpec(TraitedSpec):
@@ -1213,7 +1218,9 @@ class SplitROIs(BaseInterface):
         if isdefined(self.inputs.roi_size):
             roisize = self.inputs.roi_size
 
-        res = split_rois(self.inputs.in_file, mask, roisize)
+        res = split_rois(
+            self.inputs.in_file, mask, roisize, num_threads=self.inputs.num_threads
+        )
         self._outnames["out_files"] = res[0]
         self._outnames["out_masks"] = res[1]
         self._outnames["out_index"] = res[2]
@@ -1234,6 +1241,9 @@ class MergeROIsInputSpec(TraitedSpec):
         File(exists=True, mandatory=True), desc="array keeping original locations"
     )
     in_reference = File(exists=True, desc="reference file")
+    num_threads = traits.Int(
+        1, usedefault=True, nohash=True, desc="number of ROIs read in parallel"
+    )
 
 
 class MergeROIsOutputSpec(TraitedSpec):
@@ -1262,7 +1272,10 @@ class MergeROIs(BaseInterface):
 
     def _run_interface(self, runtime):
         res = merge_rois(
-            self.inputs.in_files, self.inputs.in_index, self.inputs.in_reference
+            self.inputs.in_files,
+            self.inputs.in_index,
+            self.inputs.in_reference,
+            num_threads=self.inputs.num_threads,
         )
         self._merged = res
         return runtime
@@ -1336,14 +1349,21 @@ def normalize_tpms(in_files, in_mask=None, out_files=None):
     return out_files
 
 
-def split_rois(in_file, mask=None, roishape=None):
+def split_rois(in_file, mask=None, roishape=None, num_threads=1):
     """
     Splits an image in ROIs for parallel processing
+
+    Voxels are assigned to ROIs following their order on disk, so that each
+    ROI is gathered from a contiguous slab of the image. Only the slab of
+    each ROI is read from uncompressed images (through memory mapping), and
+    ``num_threads`` ROIs are extracted and written concurrently.
     """
     import nibabel as nb
     import numpy as np
     from math import ceil
     import os.path as op
+    from concurrent.futures import ThreadPoolExecutor
+    from nipype.utils.imagemanip import is_compressed
 
     if roishape is None:
         roishape = (10, 10, 1)
@@ -1351,53 +1371,66 @@ def split_rois(in_file, mask=None, roishape=None):
     im = nb.load(in_file)
     imshape = im.shape
     dshape = imshape[:3]
-    nvols = imshape[-1]
+    nvols = imshape[-1] if len(imshape) > 3 else 1
     roisize = roishape[0] * roishape[1] * roishape[2]
     droishape = (roishape[0], roishape[1], roishape[2], nvols)
 
     if mask is not None:
-        mask = np.asanyarray(nb.load(mask).dataobj)
-        mask[mask > 0] = 1
-        mask[mask < 1] = 0
+        mask = np.asanyarray(nb.load(mask).dataobj) > 0
     else:
-        mask = np.ones(dshape)
+        mask = np.ones(dshape, dtype=bool)
 
-    mask = mask.reshape(-1).astype(np.uint8)
-    nzels = np.nonzero(mask)
-    els = np.sum(mask)
+    # Fortran (on-disk) order, each ROI then spans a range of slices
+    nzels = np.flatnonzero(mask.reshape(-1, order="F"))
+    els = len(nzels)
     nrois = int(ceil(els / float(roisize)))
+    slicesize = dshape[0] * dshape[1]
 
-    data = np.asanyarray(im.dataobj).reshape((mask.size, -1))
-    data = np.squeeze(data.take(nzels, axis=0))
-    nvols = data.shape[-1]
+    dataobj = im.dataobj
+    if is_compressed(im):
+        # Random access to compressed data is slow, decompress once
+        dataobj = np.asanyarray(dataobj)
 
     roidefname = op.abspath("onesmask.nii.gz")
     nb.Nifti1Image(np.ones(roishape, dtype=np.uint8), None, None).to_filename(
         roidefname
     )
 
-    out_files = []
-    out_mask = []
-    out_idxs = []
-
-    for i in range(nrois):
+    def _write_roi(i):
         first = i * roisize
-        last = (i + 1) * roisize
-        fill = 0
-
-        if last > els:
-            fill = last - els
-            last = els
+        last = min((i + 1) * roisize, els)
+        fill = (i + 1) * roisize - last
 
-        droi = data[first:last, ...]
+        idxs = nzels[first:last]
         iname = op.abspath("roi%010d_idx" % i)
-        out_idxs.append(iname + ".npz")
-        np.savez(iname, (nzels[0][first:last],))
+        np.savez(iname, (idxs,), order="F")
+
+        z0, z1 = idxs[0] // slicesize, idxs[-1] // slicesize + 1
+        slab = np.asanyarray(dataobj[:, :, z0:z1, ...])
+        droi = slab.reshape((-1, nvols), order="F")[idxs - z0 * slicesize]
 
         if fill > 0:
             droi = np.vstack(
                 (droi, np.zeros((int(fill), int(nvols)), dtype=np.float32))
             )
+        fname = op.abspath("roi%010d.nii.gz" % i)
+        nb.Nifti1Image(droi.reshape(droishape), None, None).to_filename(fname)
+        return fname, iname + ".npz", fill
+
+    if num_threads > 1:
+        with ThreadPoolExecutor(max_workers=num_threads) as pool:
+            results = list(pool.map(_write_roi, range(nrois)))
+    else:
+        results = [_write_roi(i) for i in range(nrois)]
+
+    out_files = []
+    out_mask = []
+    out_idxs = []
+    for fname, iname, fill in results:
+        out_files.append(fname)
+        out_idxs.append(iname)
+
+        if fill > 0:
             partialmsk = np.ones((roisize,), dtype=np.uint8)
             partialmsk[-int(fill) :] = 0
             partname = op.abspath("partialmask.nii.gz")
@@ -1407,21 +1440,23 @@ def split_rois(in_file, mask=None, roishape=None):
             out_mask.append(partname)
         else:
             out_mask.append(roidefname)
-
-        fname = op.abspath("roi%010d.nii.gz" % i)
-        nb.Nifti1Image(droi.reshape(droishape), None, None).to_filename(fname)
-        out_files.append(fname)
     return out_files, out_mask, out_idxs
 
 
-def merge_rois(in_files, in_idxs, in_ref, dtype=None, out_file=None):
+def merge_rois(in_files, in_idxs, in_ref, dtype=None, out_file=None, num_threads=1):
     """
     Re-builds an image resulting from a parallelized processing
+
+    ROIs are written into an uncompressed, memory-mapped array which is then
+    stored volume by volume, so that the whole image is never held in
+    memory. ``num_threads`` ROIs are read concurrently.
     """
+    import os
+    import tempfile
     import nibabel as nb
     import numpy as np
     import os.path as op
-    import subprocess as sp
+    from concurrent.futures import ThreadPoolExecutor
 
     if out_file is None:
         out_file = op.abspath("merged.nii.gz")
@@ -1429,22 +1464,11 @@ def merge_rois(in_files, in_idxs, in_ref, dtype=None, out_file=None):
     if dtype is None:
         dtype = np.float32
 
-    # if file is compressed, uncompress using os
-    # to avoid memory errors
-    if op.splitext(in_ref)[1] == ".gz":
-        try:
-            iflogger.info("uncompress %s", in_ref)
-            sp.check_call(["gunzip", in_ref], stdout=sp.PIPE, shell=True)
-            in_ref = op.splitext(in_ref)[0]
-        except:
-            pass
-
     ref = nb.load(in_ref)
     aff = ref.affine
     hdr = ref.header.copy()
-    rsh = ref.shape
+    rsh = ref.shape[:3]
     del ref
-    npix = rsh[0] * rsh[1] * rsh[2]
     fcimg = nb.load(in_files[0])
 
     if len(fcimg.shape) == 4:
@@ -1455,50 +1479,44 @@ def merge_rois(in_files, in_idxs, in_ref, dtype=None, out_file=None):
     hdr.set_data_dtype(dtype)
     hdr.set_xyzt_units("mm", "sec")
 
-    if ndirs < 300:
-        data = np.zeros((npix, ndirs), dtype=dtype)
-        for cname, iname in zip(in_files, in_idxs):
-            f = np.load(iname)
-            idxs = np.squeeze(f["arr_0"])
-            cdata = np.asanyarray(nb.load(cname).dataobj).reshape(-1, ndirs)
-            nels = len(idxs)
-            idata = (idxs,)
-            try:
-                data[idata, ...] = cdata[0:nels, ...]
-            except:
-                print(
-                    (
-                        "Consistency between indexes and chunks was "
-                        "lost: data=%s, chunk=%s"
-                    )
-                    % (str(data.shape), str(cdata.shape))
-                )
-                raise
-
-        nb.Nifti1Image(data.reshape(newshape), aff, hdr).to_filename(out_file)
+    fd, store_file = tempfile.mkstemp(suffix=".npy", dir=op.dirname(out_file))
+    os.close(fd)
+    data = np.lib.format.open_memmap(
+        store_file, mode="w+", dtype=dtype, shape=newshape, fortran_order=True
+    )
+    flat = data.reshape((-1, ndirs), order="F")
 
-    else:
-        hdr.set_data_shape(rsh[:3])
-        nii = []
-        for d in range(ndirs):
-            fname = op.abspath("vol%06d.nii" % d)
-            nb.Nifti1Image(np.zeros(rsh[:3]), aff, hdr).to_filename(fname)
-            nii.append(fname)
-
-        for cname, iname in zip(in_files, in_idxs):
-            f = np.load(iname)
+    def _read_roi(cname, iname):
+        with np.load(iname) as f:
             idxs = np.atleast_1d(np.squeeze(f["arr_0"]))
-            nels = len(idxs)
+            order = str(f["order"]) if "order" in f.files else "C"
+        if order != "F":
+            idxs = np.ravel_multi_index(np.unravel_index(idxs, rsh), rsh, order="F")
+        cdata = np.asanyarray(nb.load(cname).dataobj).reshape(-1, ndirs)
+        nels = len(idxs)
+        try:
+            flat[idxs, ...] = cdata[0:nels, ...]
+        except Exception:
+            iflogger.error(
+                "Consistency between indexes and chunks was lost: data=%s, chunk=%s",
+                str(data.shape),
+                str(cdata.shape),
+            )
+            raise
 
-            for d, fname in enumerate(nii):
-                data = np.asanyarray(nb.load(fname).dataobj).reshape(-1)
-                cdata = nb.load(cname).dataobj[..., d].reshape(-1)
-                data[idxs] = cdata[:nels]
-                nb.Nifti1Image(data.reshape(rsh[:3]), aff, hdr).to_filename(fname)
+    try:
+        if num_threads > 1:
+            with ThreadPoolExecutor(max_workers=num_threads) as pool:
+                list(pool.map(_read_roi, in_files, in_idxs))
+        else:
+            for cname, iname in zip(in_files, in_idxs):
+                _read_roi(cname, iname)
 
-        imgs = [nb.load(im) for im in nii]
-        allim = nb.concat_images(imgs)
-        allim.to_filename(out_file)
+        data.flush()
+        nb.Nifti1Image(data, aff, hdr).to_filename(out_file)
+    finally:
+        del flat, data
+        os.remove(store_file)
 
     return out_file
 
@@ -1515,6 +1533,14 @@ class CalculateMedianInputSpec(BaseInterfaceInputSpec):
     median_per_file = traits.Bool(
         False, usedefault=True, desc="Calculate a median file for each Nifti"
     )
+    slab_size = traits.Range(
+        low=1,
+        desc="number of slices (along the third axis) processed at once, "
+        "bounding the memory used by the median computation",
+    )
+    num_threads = traits.Int(
+        1, usedefault=True, nohash=True, desc="number of slabs processed in parallel"
+    )
 
 
 class CalculateMedianOutputSpec(TraitedSpec):
@@ -1536,6 +1562,11 @@ class CalculateMedian(BaseInterface):
 
     input_spec = CalculateMedianInputSpec
     output_spec = CalculateMedianOutputSpec
+    # Files are processed one after the other, np.median copies each slab,
+    # and the median and the running total are kept until written
+    _ram_estimator = SlabRamEstimator(
+        inputs=("in_files",), bytes_per_voxel=16, n_outputs=2, sequential=True
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1570,7 +1601,7 @@ class CalculateMedian(BaseInterface):
         self._median_files = []
         for idx, fname in enumerate(ensure_list(self.inputs.in_files)):
             img = nb.load(fname)
-            data = np.median(img.get_fdata(), axis=3)
+            data = self._median(img)
             if self.inputs.median_per_file:
                 self._median_files.append(self._write_nifti(img, data, idx))
             else:
@@ -1582,6 +1613,24 @@ class CalculateMedian(BaseInterface):
             self._median_files.append(self._write_nifti(img, total, idx))
         return runtime
 
+    def _median(self, img):
+        slab_size = None
+        if isdefined(self.inputs.slab_size):
+            slab_size = self.inputs.slab_size
+
+        # Compressed data are read once, then processed by slabs
+        dataobj = img.dataobj
+        if slab_size and is_compressed(img):
+            dataobj = np.asanyarray(dataobj)
+
+        median = np.zeros(img.shape[:3])
+
+        def _slab_median(slab):
+            median[slab] = np.median(np.asarray(dataobj[slab], dtype=float), axis=3)
+
+        map_slabs(_slab_median, img.shape, slab_size, self.inputs.num_threads)
+        return median
+
     def _list_outputs(self):
         outputs = self._outputs().get()
         outputs["median_files"] = self._median_files
@@ -768,6 +768,17 @@ class SpecifySparseModel(SpecifyModel):
 
     def _gen_regress(self, i_onsets, i_durations, i_amplitudes, nscans):
         """Generates a regressor for a sparse/clustered-sparse acquisition"""
+        events = [(i_onsets, i_durations, i_amplitudes)]
+        return self._gen_regressors(events, nscans)[0]
+
+    def _gen_regressors(self, events, nscans):
+        """Generates the regressors of several conditions at once
+
+        ``events`` is a list of ``(onsets, durations, amplitudes)`` tuples, one
+        per condition. The stimulus timelines of all conditions are built
+        as boxcars (through cumulative sums), convolved with the HRF in a single
+        FFT and sampled at every scan with one fancy-indexing operation.
+        """
         bplot = False
         if isdefined(self.inputs.save_plot) and self.inputs.save_plot:
             bplot = True
@@ -776,6 +787,11 @@ class SpecifySparseModel(SpecifyModel):
             matplotlib.use(config.get("execution", "matplotlib_backend"))
             import matplotlib.pyplot as plt
 
+        model_hrf = isdefined(self.inputs.model_hrf) and self.inputs.model_hrf
+        use_deriv = (
+            isdefined(self.inputs.use_temporal_deriv) and self.inputs.use_temporal_deriv
+        )
+
         TR = int(np.round(self.inputs.time_repetition * 1000))  # in ms
         if self.inputs.time_acquisition:
             TA = int(np.round(self.inputs.time_acquisition * 1000))  # in ms
@@ -786,10 +802,6 @@ class SpecifySparseModel(SpecifyModel):
         total_time = TR * (nscans - nvol) / nvol + TA * nvol + SCANONSET
         SILENCE = TR - TA * nvol
         dt = TA / 10.0
-        durations = np.round(np.array(i_durations) * 1000)
-        if len(durations) == 1:
-            durations = durations * np.ones(len(i_onsets))
-        onsets = np.round(np.array(i_onsets) * 1000)
         dttemp = math.gcd(TA, math.gcd(SILENCE, TR))
         if dt < dttemp:
             if dttemp % dt != 0:
@@ -800,9 +812,7 @@ class SpecifySparseModel(SpecifyModel):
         iflogger.info("Setting dt = %d ms\n", dt)
         npts = int(np.ceil(total_time / dt))
         times = np.arange(0, total_time, dt) * 1e-3
-        timeline = np.zeros(npts)
-        timeline2 = np.zeros(npts)
-        if isdefined(self.inputs.model_hrf) and self.inputs.model_hrf:
+        if model_hrf:
             hrf = spm_hrf(dt * 1e-3)
         reg_scale = 1.0
         if self.inputs.scale_regressors:
@@ -813,7 +823,7 @@ class SpecifySparseModel(SpecifyModel):
             else:
                 boxcar[int(1.0 * 1e3 / dt) : int(2.0 * 1e3 / dt)] = 1.0
 
-            if isdefined(self.inputs.model_hrf) and self.inputs.model_hrf:
+            if model_hrf:
                 response = np.convolve(boxcar, hrf)
                 reg_scale = 1.0 / response.max()
                 iflogger.info(
@@ -821,91 +831,96 @@ class SpecifySparseModel(SpecifyModel):
                 )
             iflogger.info("reg_scale: %.4f", reg_scale)
 
-        for i, t in enumerate(onsets):
-            idx = int(np.round(t / dt))
+        # stimulus timelines, as the running sum of onset/offset steps
+        steps = np.zeros((len(events), npts + 1))
+        for row, (i_onsets, i_durations, i_amplitudes) in zip(steps, events):
+            onsets = np.round(np.array(i_onsets) * 1000)
+            idx = np.round(onsets / dt).astype(int)
+            amplitudes = np.ones(len(onsets))
             if i_amplitudes:
                 if len(i_amplitudes) > 1:
-                    timeline2[idx] = i_amplitudes[i]
+                    amplitudes = np.array(i_amplitudes[: len(onsets)], dtype=float)
                 else:
-                    timeline2[idx] = i_amplitudes[0]
+                    amplitudes *= i_amplitudes[0]
+
+            if self.inputs.stimuli_as_impulses:
+                ends = idx + 1
             else:
-                timeline2[idx] = 1
+                durations = np.round(np.array(i_durations) * 1000)
+                if len(durations) == 1:
+                    durations = durations * np.ones(len(i_onsets))
+                durations[durations == 0] = TA * nvol
+                ends = idx + (durations / dt).astype(int)
+
+            np.add.at(row, idx, amplitudes)
+            np.add.at(row, np.minimum(ends, npts), -amplitudes)
 
             if bplot:
+                impulses = np.zeros(npts)
+                np.add.at(impulses, idx, amplitudes)
                 plt.subplot(4, 1, 1)
-                plt.plot(times, timeline2)
-
-            if not self.inputs.stimuli_as_impulses:
-                if durations[i] == 0:
-                    durations[i] = TA * nvol
-                stimdur = np.ones(int(durations[i] / dt))
-                timeline2 = np.convolve(timeline2, stimdur)[0 : len(timeline2)]
-            timeline += timeline2
-            timeline2[:] = 0
+                plt.plot(times, impulses)
+        timelines = np.cumsum(steps, axis=1)[:, :npts]
+        del steps
 
         if bplot:
             plt.subplot(4, 1, 2)
-            plt.plot(times, timeline)
-
-        if isdefined(self.inputs.model_hrf) and self.inputs.model_hrf:
-            timeline = np.convolve(timeline, hrf)[0 : len(timeline)]
-            if (
-                isdefined(self.inputs.use_temporal_deriv)
-                and self.inputs.use_temporal_deriv
-            ):
+            for timeline in timelines:
+                plt.plot(times, timeline)
+
+        if model_hrf:
+            nfft = 1 << (npts + len(hrf) - 2).bit_length()
+            timelines = np.fft.irfft(
+                np.fft.rfft(timelines, nfft, axis=1) * np.fft.rfft(hrf, nfft),
+                nfft,
+                axis=1,
+            )[:, :npts]
+            if use_deriv:
                 # create temporal deriv
-                timederiv = np.concatenate(([0], np.diff(timeline)))
+                timederivs = np.diff(timelines, axis=1)
+                timederivs = np.hstack((np.zeros((len(events), 1)), timederivs))
 
-        if bplot:
-            plt.subplot(4, 1, 3)
-            plt.plot(times, timeline)
-            if (
-                isdefined(self.inputs.use_temporal_deriv)
-                and self.inputs.use_temporal_deriv
-            ):
-                plt.plot(times, timederiv)
         # sample timeline
-        timeline2 = np.zeros(npts)
-        reg = []
-        regderiv = []
-        for i, trial in enumerate(np.arange(nscans) / nvol):
-            scanstart = int((SCANONSET + trial * TR + (i % nvol) * TA) / dt)
-            scanidx = scanstart + np.arange(int(TA / dt))
-            timeline2[scanidx] = np.max(timeline)
-            reg.insert(i, np.mean(timeline[scanidx]) * reg_scale)
-            if (
-                isdefined(self.inputs.use_temporal_deriv)
-                and self.inputs.use_temporal_deriv
-            ):
-                regderiv.insert(i, np.mean(timederiv[scanidx]) * reg_scale)
-
-        if isdefined(self.inputs.use_temporal_deriv) and self.inputs.use_temporal_deriv:
-            iflogger.info("orthoganlizing derivative w.r.t. main regressor")
-            regderiv = orth(reg, regderiv)
+        scans = np.arange(nscans)
+        scanstart = (SCANONSET + scans / nvol * TR + (scans % nvol) * TA) / dt
+        scanidx = scanstart.astype(int)[:, np.newaxis] + np.arange(int(TA / dt))
+        regs = timelines[:, scanidx].mean(axis=2) * reg_scale
+        if use_deriv:
+            regderivs = timederivs[:, scanidx].mean(axis=2) * reg_scale
 
         if bplot:
             plt.subplot(4, 1, 3)
-            plt.plot(times, timeline2)
+            for i, timeline in enumerate(timelines):
+                plt.plot(times, timeline)
+                if use_deriv:
+                    plt.plot(times, timederivs[i])
+                scanmarks = np.zeros(npts)
+                scanmarks[scanidx] = np.max(timeline)
+                plt.plot(times, scanmarks)
             plt.subplot(4, 1, 4)
-            plt.bar(np.arange(len(reg)), reg, width=0.5)
+            for reg in regs:
+                plt.bar(np.arange(len(reg)), reg, width=0.5)
             plt.savefig("sparse.png")
             plt.savefig("sparse.svg")
 
-        if regderiv:
-            return [reg, regderiv]
-        else:
-            return reg
+        if use_deriv:
+            iflogger.info("orthoganlizing derivative w.r.t. main regressor")
+            return [
+                [reg.tolist(), orth(reg.tolist(), regderiv.tolist())]
+                for reg, regderiv in zip(regs, regderivs)
+            ]
+        return [reg.tolist() for reg in regs]
 
     def _cond_to_regress(self, info, nscans):
         """Converts condition information to full regressors"""
         reg = []
         regnames = []
+        events = []
         for i, cond in enumerate(info.conditions):
             if hasattr(info, "amplitudes") and info.amplitudes:
                 amplitudes = info.amplitudes[i]
             else:
                 amplitudes = None
-            regnames.insert(len(regnames), cond)
             scaled_onsets = scale_timings(
                 info.onsets[i],
                 self.inputs.input_units,
@@ -918,9 +933,12 @@ class SpecifySparseModel(SpecifyModel):
                 "secs",
                 self.inputs.time_repetition,
             )
-            regressor = self._gen_regress(
-                scaled_onsets, scaled_durations, amplitudes, nscans
-            )
+            events.append((scaled_onsets, scaled_durations, amplitudes))
+
+        for cond, regressor in zip(
+            info.conditions, self._gen_regressors(events, nscans)
+        ):
+            regnames.insert(len(regnames), cond)
             if (
                 isdefined(self.inputs.use_temporal_deriv)
                 and self.inputs.use_temporal_deriv
@@ -935,7 +953,7 @@ class SpecifySparseModel(SpecifyModel):
         nvol = self.inputs.volumes_in_cluster
         if nvol > 1:
             for i in range(nvol - 1):
-                treg = np.zeros((nscans / nvol, nvol))
+                treg = np.zeros((nscans // nvol, nvol))
                 treg[:, i] = 1
                 reg.insert(len(reg), treg.ravel().tolist())
                 regnames.insert(len(regnames), "T1effect_%d" % i)
@@ -29,6 +29,7 @@ from ..interfaces.base import (
     isdefined,
 )
 from ..utils.filemanip import ensure_list, save_json, split_filename
+from ..utils.imagemanip import is_compressed, iter_volume_blocks
 from ..utils.misc import find_indices, normalize_mc_params
 from .. import logging, config
 
@@ -166,6 +167,98 @@ def _calc_norm_affine(affines, use_differences, brain_pts=None):
     return normdata, displacement
 
 
+def _volume_means(block, mask=None):
+    """Mean of each volume of ``block``, ignoring NaNs.
+
+    ``mask`` restricts the mean to a 3D region, or to a different region for
+    every volume if it is 4D.
+    """
+    # Flatten space keeping the memory layout, so that no copies are made
+    order = "F" if block.flags.f_contiguous else "C"
+    data = block.reshape((-1, block.shape[-1]), order=order)
+    if mask is not None:
+        mask = mask.reshape((data.shape[0],) + mask.shape[3:], order=order)
+        if mask.ndim == 1:
+            data, mask = data[mask], None
+
+    if not np.isnan(data).any():
+        if mask is None:
+            return data.sum(axis=0, dtype=np.float64) / data.shape[0]
+        valid, data = mask, data * mask
+    else:
+        valid = ~np.isnan(data)
+        if mask is not None:
+            valid &= mask
+        data = np.where(valid, data, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return data.sum(axis=0, dtype=np.float64) / np.count_nonzero(valid, axis=0)
+
+
+def _global_intensity(
+    nim,
+    mask_type,
+    global_threshold=8.0,
+    intersect_mask=True,
+    mask_file=None,
+    mask_threshold=None,
+):
+    """Compute the global intensity signal of a 4D image.
+
+    Volumes are read by blocks, and the statistics of all the volumes in a
+    block are computed at once. The SPM-like intersection mask requires two
+    passes over the data, so compressed series are then loaded only once.
+
+    Returns
+    -------
+
+    g : global intensity, as a [timepoints x 1] array
+    mask : the mask used to compute ``g`` (4D when it differs across volumes)
+    affine : affine of the mask
+
+    """
+    x, y, z, timepoints = nim.shape
+    affine = nim.affine
+    dataobj = nim.dataobj
+    g = np.zeros((timepoints, 1))
+    if mask_type == "spm_global":  # spm_global like calculation
+        iflogger.debug("art: using spm global")
+        if intersect_mask:
+            if is_compressed(nim):
+                dataobj = np.asarray(dataobj, dtype=np.float32)
+            mask = np.ones((x, y, z), dtype=bool)
+            for _, block in iter_volume_blocks(dataobj):
+                # Use an SPM like approach
+                mask &= np.all(block > _volume_means(block) / global_threshold, -1)
+            for tslice, block in iter_volume_blocks(dataobj):
+                g[tslice, 0] = _volume_means(block, mask)
+            if len(find_indices(mask)) < (np.prod((x, y, z)) / 10):
+                intersect_mask = False
+                g = np.zeros((timepoints, 1))
+        if not intersect_mask:
+            iflogger.info("not intersect_mask is True")
+            mask = np.zeros((x, y, z, timepoints), dtype=bool)
+            for tslice, block in iter_volume_blocks(dataobj):
+                mask[..., tslice] = block > (_volume_means(block) / global_threshold)
+                g[tslice, 0] = _volume_means(block, mask[..., tslice])
+    elif mask_type == "file":  # uses a mask image to determine intensity
+        maskimg = load(mask_file)
+        mask = maskimg.get_fdata(dtype=np.float32)
+        affine = maskimg.affine
+        mask = mask > 0.5
+        for tslice, block in iter_volume_blocks(dataobj):
+            g[tslice, 0] = _volume_means(block, mask)
+    elif mask_type == "thresh":  # uses a fixed signal threshold
+        for tslice, block in iter_volume_blocks(dataobj):
+            g[tslice, 0] = _volume_means(block, block > mask_threshold)
+        # Keep the mask of the last volume
+        mask = block[..., -1] > mask_threshold
+    else:
+        mask = np.ones((x, y, z))
+        for tslice, block in iter_volume_blocks(dataobj):
+            g[tslice, 0] = _volume_means(block)
+    return g, mask, affine
+
+
 class ArtifactDetectInputSpec(BaseInterfaceInputSpec):
     realigned_files = InputMultiPath(
         File(exists=True),
@@ -477,63 +570,27 @@ class ArtifactDetect(BaseInterface):
         if not cwd:
             cwd = os.getcwd()
 
-        # read in functional image
+        # read in functional image (keeping compressed files open, so that
+        # reading volumes by blocks does not decompress them over and over)
         if isinstance(imgfile, (str, bytes)):
-            nim = load(imgfile)
+            nim = load(imgfile, keep_file_open=True)
         elif isinstance(imgfile, list):
             if len(imgfile) == 1:
-                nim = load(imgfile[0])
+                nim = load(imgfile[0], keep_file_open=True)
             else:
                 images = [load(f) for f in imgfile]
                 nim = funcs.concat_images(images)
 
         # compute global intensity signal
         x, y, z, timepoints = nim.shape
-
-        data = nim.get_fdata(dtype=np.float32)
-        affine = nim.affine
-        g = np.zeros((timepoints, 1))
-        masktype = self.inputs.mask_type
-        if masktype == "spm_global":  # spm_global like calculation
-            iflogger.debug("art: using spm global")
-            intersect_mask = self.inputs.intersect_mask
-            if intersect_mask:
-                mask = np.ones((x, y, z), dtype=bool)
-                for t0 in range(timepoints):
-                    vol = data[:, :, :, t0]
-                    # Use an SPM like approach
-                    mask_tmp = vol > (np.nanmean(vol) / self.inputs.global_threshold)
-                    mask = mask * mask_tmp
-                for t0 in range(timepoints):
-                    vol = data[:, :, :, t0]
-                    g[t0] = np.nanmean(vol[mask])
-                if len(find_indices(mask)) < (np.prod((x, y, z)) / 10):
-                    intersect_mask = False
-                    g = np.zeros((timepoints, 1))
-            if not intersect_mask:
-                iflogger.info("not intersect_mask is True")
-                mask = np.zeros((x, y, z, timepoints))
-                for t0 in range(timepoints):
-                    vol = data[:, :, :, t0]
-                    mask_tmp = vol > (np.nanmean(vol) / self.inputs.global_threshold)
-                    mask[:, :, :, t0] = mask_tmp
-                    g[t0] = np.nansum(vol * mask_tmp) / np.nansum(mask_tmp)
-        elif masktype == "file":  # uses a mask image to determine intensity
-            maskimg = load(self.inputs.mask_file)
-            mask = maskimg.get_fdata(dtype=np.float32)
-            affine = maskimg.affine
-            mask = mask > 0.5
-            for t0 in range(timepoints):
-                vol = data[:, :, :, t0]
-                g[t0] = np.nanmean(vol[mask])
-        elif masktype == "thresh":  # uses a fixed signal threshold
-            for t0 in range(timepoints):
-                vol = data[:, :, :, t0]
-                mask = vol > self.inputs.mask_threshold
-                g[t0] = np.nanmean(vol[mask])
-        else:
-            mask = np.ones((x, y, z))
-            g = np.nanmean(data[mask > 0, :], 1)
+        g, mask, affine = _global_intensity(
+            nim,
+            self.inputs.mask_type,
+            global_threshold=self.inputs.global_threshold,
+            intersect_mask=self.inputs.intersect_mask,
+            mask_file=self.inputs.mask_file,
+            mask_threshold=self.inputs.mask_threshold,
+        )
 
         # compute normalized intensity values
         gz = signal.detrend(g, axis=0)  # detrend the signal
@@ -579,10 +636,9 @@ class ArtifactDetect(BaseInterface):
             ridx = find_indices(normval < 0)
             if displacement is not None:
                 dmap = np.zeros((x, y, z, timepoints), dtype=np.float64)
-                for i in range(timepoints):
-                    dmap[voxel_coords[0], voxel_coords[1], voxel_coords[2], i] = (
-                        displacement[i, :]
-                    )
+                dmap[voxel_coords[0], voxel_coords[1], voxel_coords[2], :] = (
+                    displacement.T
+                )
                 dimg = Nifti1Image(dmap, affine)
                 dimg.to_filename(displacementfile)
         else:
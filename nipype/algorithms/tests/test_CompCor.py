@@ -77,14 +77,16 @@ class TestCompCor:
 
         self.mask_files = [mask1, mask2]
 
+    compcor_components = [
+        [-0.1989607212, -0.5753813646],
+        [0.5692369697, 0.5674945949],
+        [-0.6662573243, 0.4675843432],
+        [0.4206466244, -0.3361270124],
+        [-0.1246655485, -0.1235705610],
+    ]
+
     def test_compcor(self):
-        expected_components = [
-            [-0.1989607212, -0.5753813646],
-            [0.5692369697, 0.5674945949],
-            [-0.6662573243, 0.4675843432],
-            [0.4206466244, -0.3361270124],
-            [-0.1246655485, -0.1235705610],
-        ]
+        expected_components = self.compcor_components
 
         self.run_cc(
             CompCor(
@@ -108,6 +110,20 @@ class TestCompCor:
             "aCompCor",
         )
 
+    @pytest.mark.parametrize("svd_method", ["gram", "randomized", "auto"])
+    @pytest.mark.parametrize("chunk_size", [None, 2])
+    def test_compcor_svd_method(self, svd_method, chunk_size):
+        ccinterface = CompCor(
+            num_components=6,
+            realigned_file=self.realigned_file,
+            mask_files=self.mask_files,
+            mask_index=0,
+            svd_method=svd_method,
+        )
+        if chunk_size:
+            ccinterface.inputs.chunk_size = chunk_size
+        self.run_cc(ccinterface, self.compcor_components)
+
     def test_compcor_variance_threshold_and_metadata(self):
         expected_components = [
             [-0.2027150345, -0.4954813834],
@@ -157,6 +173,21 @@ class TestCompCor:
             "tCompCor",
         )
 
+    def test_tcompcor_chunked(self):
+        TCompCor(
+            num_components=6,
+            realigned_file=self.realigned_file,
+            percentile_threshold=0.75,
+        ).run()
+        full_mask = np.asanyarray(nb.load("mask_000.nii.gz").dataobj)
+        TCompCor(
+            num_components=6,
+            realigned_file=self.realigned_file,
+            percentile_threshold=0.75,
+            chunk_size=3,
+        ).run()
+        assert np.array_equal(nb.load("mask_000.nii.gz").dataobj, full_mask)
+
     def test_tcompcor_no_percentile(self):
         ccinterface = TCompCor(num_components=6, realigned_file=self.realigned_file)
         ccinterface.run()
@@ -91,6 +91,52 @@ class TestTSNR:
             },
         )
 
+    @pytest.mark.parametrize("num_threads", [1, 2])
+    def test_tsnr_slabs(self, num_threads):
+        expected = TSNR(in_file=self.in_filenames["in_file"]).run().outputs
+        expected = {
+            key: np.asarray(nb.load(getattr(expected, key)).dataobj)
+            for key in ("mean_file", "stddev_file", "tsnr_file")
+        }
+
+        tsnrresult = TSNR(
+            in_file=[self.in_filenames["in_file"]] * 2,
+            slab_size=1,
+            num_threads=num_threads,
+        ).run()
+
+        for key, value in expected.items():
+            data = np.asarray(nb.load(getattr(tsnrresult.outputs, key)).dataobj)
+            npt.assert_allclose(data, value, rtol=1e-5)
+
+    def test_tsnr_ram_estimator(self):
+        from ...pipeline import engine as pe
+        from ...utils.ram_estimator import SlabRamEstimator
+
+        # Header-only image, large enough to exceed the minimum estimate
+        hdr = nb.Nifti1Header()
+        hdr.set_data_shape((96, 96, 60, 1000))
+        hdr.set_data_dtype(np.int16)
+        hdr["vox_offset"] = 352
+        with open("bold.nii", "wb") as fobj:
+            fobj.write(hdr.binaryblock + b"\0" * 4)
+
+        def estimate(**kwargs):
+            node = pe.Node(TSNR(in_file="bold.nii", **kwargs), name="tsnr")
+            assert isinstance(node.ram_estimator, SlabRamEstimator)
+            return node.mem_gb_runtime
+
+        full = estimate()
+        assert estimate(slab_size=10) < full
+        assert estimate(slab_size=2) < estimate(slab_size=10)
+        assert estimate(slab_size=2, num_threads=2) > estimate(slab_size=2)
+        # Detrending reads the full series
+        assert estimate(slab_size=2, regress_poly=1) == full
+
+        node = pe.Node(TSNR(in_file="bold.nii", slab_size=2), name="tsnr", mem_gb=3)
+        assert node.ram_estimator is None
+        assert node.mem_gb_runtime == 3
+
     @mock.patch("warnings.warn")
     def test_warning(self, mock_warn):
         """test that usage of misc.TSNR trips a warning to use
@@ -4,6 +4,7 @@ from ..confounds import ACompCor
 
 def test_ACompCor_inputs():
     input_map = dict(
+        chunk_size=dict(),
         components_file=dict(
             usedefault=True,
         ),
@@ -47,6 +48,9 @@ def test_ACompCor_inputs():
         save_pre_filter=dict(
             usedefault=True,
         ),
+        svd_method=dict(
+            usedefault=True,
+        ),
         use_regress_poly=dict(
             deprecated="0.15.0",
             new_name="pre_filter",
@@ -9,6 +9,11 @@ def test_CalculateMedian_inputs():
         median_per_file=dict(
             usedefault=True,
         ),
+        num_threads=dict(
+            nohash=True,
+            usedefault=True,
+        ),
+        slab_size=dict(),
     )
     inputs = CalculateMedian.input_spec()
 
@@ -4,6 +4,7 @@ from ..confounds import ComputeDVARS
 
 def test_ComputeDVARS_inputs():
     input_map = dict(
+        chunk_size=dict(),
         figdpi=dict(
             usedefault=True,
         ),
@@ -10,6 +10,9 @@ def test_Distance_inputs():
         method=dict(
             usedefault=True,
         ),
+        multilabel=dict(
+            usedefault=True,
+        ),
         volume1=dict(
             extensions=None,
             mandatory=True,
@@ -32,6 +35,8 @@ def test_Distance_outputs():
         histogram=dict(
             extensions=None,
         ),
+        label_distances=dict(),
+        labels=dict(),
         point1=dict(),
         point2=dict(),
     )
@@ -4,6 +4,7 @@ from ..icc import ICC
 
 def test_ICC_inputs():
     input_map = dict(
+        chunk_size=dict(),
         mask=dict(
             extensions=None,
             mandatory=True,
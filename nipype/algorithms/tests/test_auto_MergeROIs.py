@@ -9,6 +9,10 @@ def test_MergeROIs_inputs():
         in_reference=dict(
             extensions=None,
         ),
+        num_threads=dict(
+            nohash=True,
+            usedefault=True,
+        ),
     )
     inputs = MergeROIs.input_spec()
 
@@ -11,6 +11,10 @@ def test_SplitROIs_inputs():
         in_mask=dict(
             extensions=None,
         ),
+        num_threads=dict(
+            nohash=True,
+            usedefault=True,
+        ),
         roi_size=dict(),
     )
     inputs = SplitROIs.input_spec()
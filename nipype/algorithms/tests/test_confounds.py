@@ -2,16 +2,15 @@
 
 import pytest
 from nipype.testing import example_data
-from nipype.algorithms.confounds import FramewiseDisplacement, ComputeDVARS, is_outlier
+from nipype.algorithms.confounds import (
+    FramewiseDisplacement,
+    ComputeDVARS,
+    is_outlier,
+    compute_dvars,
+    _AR1_est,
+)
 import numpy as np
-
-nonitime = True
-try:
-    import nitime
-
-    nonitime = False
-except ImportError:
-    pass
+import nibabel as nb
 
 
 def test_fd(tmpdir):
@@ -35,7 +34,6 @@ def test_fd(tmpdir):
     assert np.abs(ground_truth.mean() - res.outputs.fd_average) < 1e-2
 
 
-@pytest.mark.skipif(nonitime, reason="nitime is not installed")
 def test_dvars(tmpdir):
     ground_truth = np.loadtxt(example_data("ds003_sub-01_mc.DVARS"))
     dvars = ComputeDVARS(
@@ -69,6 +67,47 @@ def test_dvars(tmpdir):
     assert (np.abs(dv1[:, 2] - ground_truth[:, 2]).sum() / len(dv1)) < 0.05
 
 
+@pytest.mark.parametrize("intensity_normalization", [0, 1000])
+def test_dvars_chunked(intensity_normalization):
+    args = (
+        example_data("ds003_sub-01_mc.nii.gz"),
+        example_data("ds003_sub-01_mc_brainmask.nii.gz"),
+    )
+    kwargs = dict(
+        remove_zerovariance=True,
+        variance_tol=1e-7,
+        intensity_normalization=intensity_normalization,
+    )
+    full = compute_dvars(*args, **kwargs)
+    chunked = compute_dvars(*args, chunk_size=37, **kwargs)
+    assert np.allclose(full, chunked, rtol=1e-5)
+
+
+def test_dvars_empty_mask(tmp_path):
+    in_file = str(tmp_path / "func.nii")
+    in_mask = str(tmp_path / "mask.nii")
+    data = np.random.default_rng(0).random((4, 4, 4, 10), dtype=np.float32)
+    nb.Nifti1Image(data, np.eye(4)).to_filename(in_file)
+    nb.Nifti1Image(np.zeros((4, 4, 4), np.uint8), np.eye(4)).to_filename(in_mask)
+    with pytest.warns(RuntimeWarning):
+        dvars = compute_dvars(in_file, in_mask)
+    assert [len(d) for d in dvars] == [9, 9, 9]
+
+
+def test_AR1_est():
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((20, 200)).astype(np.float32)
+    data[:, 1:] += 0.5 * data[:, :-1]
+
+    # Per-row solution of the order-1 Yule-Walker equations
+    expected = []
+    for row in data.astype(float):
+        row = row - row.mean()
+        expected.append(np.dot(row[1:], row[:-1]) / np.dot(row, row))
+
+    assert np.allclose(_AR1_est(data), expected, rtol=1e-5)
+
+
 def test_outliers():
     np.random.seed(0)
     in_data = np.random.randn(100)
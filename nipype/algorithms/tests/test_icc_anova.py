@@ -1,5 +1,6 @@
+import nibabel as nb
 import numpy as np
-from nipype.algorithms.icc import ICC_rep_anova
+from nipype.algorithms.icc import ICC, ICC_rep_anova, ICC_rep_anova_batch
 
 
 def test_ICC_rep_anova():
@@ -23,3 +24,39 @@ def test_ICC_rep_anova():
     assert dfc == 3
     assert dfe == 15
     assert np.isclose(r_var / (r_var + e_var), icc)
+
+
+def test_ICC_rep_anova_batch():
+    rng = np.random.default_rng(0)
+    Y = rng.standard_normal((50, 10, 3)) + rng.standard_normal((50, 10, 1))
+
+    batch = ICC_rep_anova_batch(Y)
+    for x in range(Y.shape[0]):
+        expected = ICC_rep_anova(Y[x])
+        assert np.allclose([stat[x] for stat in batch[:4]], expected[:4])
+        assert batch[4:] == expected[4:]
+
+
+def test_ICC(tmpdir):
+    tmpdir.chdir()
+    rng = np.random.default_rng(0)
+    shape = (4, 5, 6)
+    data = rng.standard_normal((3, 2) + shape) + rng.standard_normal((3, 1) + shape)
+    mask = np.ones(shape)
+    mask[0] = 0
+
+    subjects_sessions = []
+    for i, subject in enumerate(data):
+        subjects_sessions.append([])
+        for j, session in enumerate(subject):
+            fname = f"sub{i}_ses{j}.nii"
+            nb.Nifti1Image(session, np.eye(4)).to_filename(fname)
+            subjects_sessions[-1].append(fname)
+    nb.Nifti1Image(mask, np.eye(4)).to_filename("mask.nii")
+
+    res = ICC(subjects_sessions=subjects_sessions, mask="mask.nii", chunk_size=7).run()
+    icc_map = nb.load(res.outputs.icc_map).get_fdata()
+
+    assert np.all(icc_map[0] == 0)
+    voxel = (1, 2, 3)
+    assert np.isclose(icc_map[voxel], ICC_rep_anova(data[(...,) + voxel])[0])
@@ -55,6 +55,24 @@ def test_trans_distances(tmpdir):
     assert np.allclose(res.outputs.distance, np.linalg.norm(inc), 4)
 
 
+def test_vertex_areas():
+    # Regular tetrahedron, every vertex belongs to three faces
+    points = np.array([[1, 1, 1], [1, -1, -1], [-1, 1, -1], [-1, -1, 1]], dtype=float)
+    faces = np.array([[0, 1, 2], [0, 3, 1], [0, 2, 3], [1, 3, 2]])
+
+    areas = m.face_areas(points, faces)
+    assert np.allclose(areas, 2 * np.sqrt(3))
+
+    expected = np.zeros(len(points))
+    for i in range(len(points)):
+        for face in faces[(faces == i).any(axis=1)]:
+            a, b, c = points[face]
+            expected[i] += 0.5 * np.linalg.norm(np.cross(b - a, c - a))
+    assert np.allclose(m.vertex_areas(points, faces), expected)
+    assert np.allclose(m.vertex_areas(points, faces, areas=areas), expected)
+    assert np.isclose(m.vertex_areas(points, faces).sum(), 3 * areas.sum())
+
+
 @pytest.mark.skipif(VTKInfo.no_tvtk(), reason="tvtk is not installed")
 def test_warppoints(tmpdir):
     tmpdir.chdir()
@@ -62,11 +80,60 @@ def test_warppoints(tmpdir):
     # TODO: include regression tests for when tvtk is installed
 
 
+def test_broadcast_field():
+    scalars = np.arange(4, dtype=float)
+    expected = np.repeat(scalars[:, np.newaxis], 3, axis=1)
+    assert np.array_equal(m.broadcast_field(scalars, (4, 3)), expected)
+    assert np.array_equal(m.broadcast_field(scalars[:, np.newaxis], (4, 3)), expected)
+
+    vectors = np.arange(12, dtype=float).reshape(4, 3)
+    assert np.array_equal(m.broadcast_field(vectors, (4, 3)), vectors)
+
+    # Two-column fields are ambiguous, and must not be truncated
+    with pytest.raises(ValueError):
+        m.broadcast_field(vectors[:, :2], (4, 3))
+    with pytest.raises(ValueError):
+        m.broadcast_field(scalars[:3], (4, 3))
+
+
 @pytest.mark.skipif(VTKInfo.no_tvtk(), reason="tvtk is not installed")
 def test_meshwarpmaths(tmpdir):
+    from ...interfaces.vtkbase import tvtk
+
     tmpdir.chdir()
 
-    # TODO: include regression tests for when tvtk is installed
+    r1 = tvtk.PolyDataReader(file_name=example_data("surf01.vtk"))
+    vtk1 = VTKInfo.vtk_output(r1)
+    r1.update()
+    npoints = len(vtk1.points)
+    warping = np.tile([0.7, 0.3, -0.2], (npoints, 1))
+    scale = np.linspace(0.5, 2.0, npoints)
+
+    def write(fname, **point_data):
+        for key, value in point_data.items():
+            setattr(vtk1.point_data, key, value)
+        writer = tvtk.PolyDataWriter(file_name=tmpdir.join(fname).strpath)
+        VTKInfo.configure_input_data(writer, vtk1)
+        writer.write()
+        return tmpdir.join(fname).strpath
+
+    in_surf = write("warp.vtk", vectors=warping)
+    scalar_surf = write("scalars.vtk", vectors=None, scalars=scale)
+
+    def read_warp(fname):
+        r = tvtk.PolyDataReader(file_name=fname)
+        out = VTKInfo.vtk_output(r)
+        r.update()
+        return np.array(out.point_data.vectors)
+
+    # The operator surface is read from the operator input
+    mmath = m.MeshWarpMaths(in_surf=in_surf, operator=scalar_surf, operation="mul")
+    res = mmath.run()
+    assert np.allclose(read_warp(res.outputs.out_warp), warping * scale[:, np.newaxis])
+
+    mmath.inputs.operator = 2.0
+    res = mmath.run()
+    assert np.allclose(read_warp(res.outputs.out_warp), warping * 2.0)
 
 
 @pytest.mark.skipif(not VTKInfo.no_tvtk(), reason="tvtk is installed")
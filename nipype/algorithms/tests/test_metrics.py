@@ -3,8 +3,11 @@
 
 import numpy as np
 import nibabel as nb
+import pytest
+from scipy.ndimage import binary_erosion
+from scipy.spatial.distance import cdist
 from nipype.testing import example_data
-from ..metrics import FuzzyOverlap
+from ..metrics import Distance, FuzzyOverlap
 
 
 def test_fuzzy_overlap(tmpdir):
@@ -58,3 +61,61 @@ def test_fuzzy_overlap(tmpdir):
         .outputs
     )
     assert np.allclose(out.dice, 0.74074)
+
+
+def _border_coordinates(data, affine):
+    border = data & ~binary_erosion(data)
+    return nb.affines.apply_affine(affine, np.argwhere(border))
+
+
+@pytest.fixture
+def label_volumes(tmpdir):
+    tmpdir.chdir()
+    affine = np.diag([0.5, 0.5, 0.5, 1])
+    data1 = np.zeros((20, 20, 20), dtype=np.int16)
+    data1[2:9, 3:10, 4:11] = 1
+    data1[11:18, 10:16, 4:14] = 2
+    data2 = np.zeros_like(data1)
+    data2[3:10, 3:9, 5:12] = 1
+    data2[10:17, 11:17, 3:12] = 2
+    data2[0:2, 0:2, 0:2] = 3
+    nb.Nifti1Image(data1, affine).to_filename("labels1.nii")
+    nb.Nifti1Image(data2, affine).to_filename("labels2.nii")
+    return data1, data2, affine
+
+
+@pytest.mark.parametrize("method", ["eucl_min", "eucl_mean", "eucl_max"])
+def test_distance(label_volumes, method):
+    if method == "eucl_mean":
+        pytest.importorskip("matplotlib")
+    data1, data2, affine = label_volumes
+
+    expected = []
+    for label in (1, 2):
+        set1 = _border_coordinates(data1 == label, affine)
+        if method == "eucl_mean":
+            set2 = nb.affines.apply_affine(affine, np.argwhere(data2 == label))
+        else:
+            set2 = _border_coordinates(data2 == label, affine)
+        dist_matrix = cdist(set1, set2)
+        if method == "eucl_min":
+            expected.append(dist_matrix.min())
+        elif method == "eucl_mean":
+            expected.append(dist_matrix.min(axis=0).mean())
+        else:
+            expected.append(
+                max(dist_matrix.min(axis=0).max(), dist_matrix.min(axis=1).max())
+            )
+
+    nb.Nifti1Image((data1 == 1).astype(np.uint8), affine).to_filename("mask1.nii")
+    nb.Nifti1Image((data2 == 1).astype(np.uint8), affine).to_filename("mask2.nii")
+    res = Distance(volume1="mask1.nii", volume2="mask2.nii", method=method).run()
+    assert np.isclose(res.outputs.distance, expected[0])
+
+    res = Distance(
+        volume1="labels1.nii", volume2="labels2.nii", method=method, multilabel=True
+    ).run()
+    assert res.outputs.labels == [1, 2, 3]
+    assert np.allclose(res.outputs.label_distances[:2], expected)
+    assert np.isnan(res.outputs.label_distances[2])
+    assert np.isclose(res.outputs.distance, np.mean(expected))
@@ -5,6 +5,7 @@ import pytest
 import os
 
 import nibabel as nb
+import numpy as np
 
 from nipype.algorithms import misc
 from nipype.utils.filemanip import fname_presuffix
@@ -44,3 +45,16 @@ def test_CalculateMedian(create_analyze_pair_file_in_directory):
 
     assert os.path.exists(eg.outputs.median_files)
     assert nb.load(eg.outputs.median_files)
+
+
+@pytest.mark.parametrize("num_threads", [1, 2])
+def test_CalculateMedian_slabs(tmpdir, num_threads):
+    tmpdir.chdir()
+    in_file = example_data("ds003_sub-01_mc.nii.gz")
+    expected = np.median(nb.load(in_file).get_fdata(), axis=3)
+
+    median = misc.CalculateMedian(
+        in_files=in_file, slab_size=5, num_threads=num_threads
+    ).run()
+
+    assert np.allclose(nb.load(median.outputs.median_files).get_fdata(), expected)
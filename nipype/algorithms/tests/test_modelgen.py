@@ -15,6 +15,7 @@ from nipype.algorithms.modelgen import (
     SpecifyModel,
     SpecifySparseModel,
     SpecifySPMModel,
+    spm_hrf,
 )
 
 
@@ -268,3 +269,60 @@ def test_modelgen_sparse(tmpdir):
     npt.assert_almost_equal(
         res.outputs.session_info[1]["regress"][1]["val"][5], 0.007671459162258378
     )
+
+
+@pytest.mark.parametrize("stimuli_as_impulses", [True, False])
+def test_modelgen_sparse_regressors(stimuli_as_impulses):
+    s = SpecifySparseModel(
+        input_units="secs",
+        time_repetition=3.0,
+        time_acquisition=1.0,
+        model_hrf=True,
+        stimuli_as_impulses=stimuli_as_impulses,
+    )
+    events = [
+        ([0, 12.5, 40, 41], [2], [2.0]),
+        ([3, 33, 60.2], [0, 1.5, 4], [1.0, -1.0, 0.5]),
+    ]
+    nscans = 30
+
+    # Reference: one boxcar convolution per event
+    dt = 100.0
+    npts = int(np.ceil((3000 * (nscans - 1) + 1000) / dt))
+    hrf = spm_hrf(dt * 1e-3)
+    expected = []
+    for onsets, durations, amplitudes in events:
+        timeline = np.zeros(npts)
+        durations = durations * (len(onsets) // len(durations))
+        amplitudes = amplitudes * (len(onsets) // len(amplitudes))
+        for onset, duration, amplitude in zip(onsets, durations, amplitudes):
+            start = int(round(onset * 1000 / dt))
+            if stimuli_as_impulses:
+                stop = start + 1
+            else:
+                stop = start + int((duration * 1000 or 1000) / dt)
+            timeline[start:stop] += amplitude
+        timeline = np.convolve(timeline, hrf)[:npts]
+        scanidx = (np.arange(nscans) * 30)[:, None] + np.arange(10)
+        expected.append(timeline[scanidx].mean(axis=1))
+
+    regressors = np.array(s._gen_regressors(events, nscans))
+    scale = regressors[0, 5] / expected[0][5]
+    npt.assert_allclose(regressors, np.array(expected) * scale, atol=1e-12)
+    for event, regressor in zip(events, regressors):
+        npt.assert_allclose(s._gen_regress(*event, nscans), regressor)
+
+
+def test_modelgen_sparse_derivatives():
+    s = SpecifySparseModel(
+        input_units="secs",
+        time_repetition=3.0,
+        time_acquisition=1.0,
+        model_hrf=True,
+        use_temporal_deriv=True,
+    )
+    events = [([0, 12.5, 40], [2], None), ([3, 33, 60.2], [1], None)]
+    for regressor, derivative in s._gen_regressors(events, 30):
+        assert isinstance(regressor, list) and isinstance(derivative, list)
+        assert all(isinstance(v, float) for v in regressor + derivative)
+        npt.assert_almost_equal(np.dot(regressor, derivative), 0)
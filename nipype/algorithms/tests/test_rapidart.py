@@ -1,6 +1,8 @@
 # emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
 # vi: set ft=python sts=4 ts=4 sw=4 et:
+import nibabel as nb
 import numpy as np
+import pytest
 
 import numpy.testing as npt
 from .. import rapidart as ra
@@ -90,6 +92,49 @@ def test_ad_get_norm():
     npt.assert_almost_equal(norm, np.array([0.0, 143.72192614, 173.92527131]))
 
 
+@pytest.mark.parametrize(
+    "mask_type, intersect_mask",
+    [("spm_global", True), ("spm_global", False), ("file", None), ("thresh", None)],
+)
+def test_ad_global_intensity(tmpdir, mask_type, intersect_mask):
+    tmpdir.chdir()
+    rng = np.random.default_rng(0)
+    data = rng.uniform(0, 100, (6, 5, 4, 70)).astype(np.float32)
+    data[:3] += 500
+    data[0, 0, 0, 3] = np.nan
+    nim = nb.Nifti1Image(data, np.eye(4))
+    mask = np.zeros(data.shape[:3], dtype=np.uint8)
+    mask[1:4] = 1
+    nb.Nifti1Image(mask, np.eye(4)).to_filename("mask.nii")
+
+    g, out_mask, _ = ra._global_intensity(
+        nim,
+        mask_type,
+        global_threshold=1.5,
+        intersect_mask=intersect_mask,
+        mask_file="mask.nii",
+        mask_threshold=50,
+    )
+
+    # Volume-by-volume reference
+    expected = []
+    for t0 in range(data.shape[-1]):
+        vol = data[..., t0]
+        if mask_type == "spm_global":
+            vmask = vol > np.nanmean(vol) / 1.5
+            if intersect_mask:
+                vmask = out_mask
+            else:
+                npt.assert_array_equal(out_mask[..., t0], vmask)
+        elif mask_type == "file":
+            vmask = mask > 0
+        else:
+            vmask = vol > 50
+        expected.append(np.nanmean(vol[vmask]))
+    npt.assert_allclose(g[:, 0], expected, rtol=1e-6)
+    assert out_mask.ndim == (4 if intersect_mask is False else 3)
+
+
 def test_sc_init():
     sc = ra.StimulusCorrelation(concatenated_design=True)
     assert sc.inputs.concatenated_design
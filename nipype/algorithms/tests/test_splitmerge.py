@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 
+import pytest
+
 from nipype.testing import example_data
 
 
@@ -27,3 +29,40 @@ def test_split_and_merge(tmpdir):
     dwmasked = dwdata * mskdata[:, :, :, np.newaxis]
 
     assert np.allclose(dwmasked, dwmerged)
+
+
+@pytest.mark.parametrize("ext,num_threads", [(".nii", 1), (".nii", 3), (".nii.gz", 2)])
+def test_split_and_merge_threads(tmpdir, ext, num_threads):
+    import numpy as np
+    import nibabel as nb
+
+    from nipype.algorithms.misc import split_rois, merge_rois
+
+    tmpdir.chdir()
+    rng = np.random.default_rng(0)
+    dwdata = rng.normal(size=(9, 8, 7, 5)).astype(np.float32)
+    mskdata = (rng.random(dwdata.shape[:3]) > 0.3).astype(np.uint8)
+    dwfile = "dwi" + ext
+    nb.Nifti1Image(dwdata, np.eye(4)).to_filename(dwfile)
+    nb.Nifti1Image(mskdata, np.eye(4)).to_filename("mask.nii")
+
+    resdw, resmsk, resid = split_rois(
+        dwfile, "mask.nii", roishape=(4, 4, 2), num_threads=num_threads
+    )
+    assert len(resdw) == int(np.ceil(mskdata.sum() / 32))
+    merged = merge_rois(resdw, resid, "mask.nii", num_threads=num_threads)
+    dwmerged = nb.load(merged).get_fdata(dtype=np.float32)
+    assert np.allclose(dwdata * mskdata[..., np.newaxis], dwmerged)
+
+    # Indexes written in C order (older releases) are still understood
+    idxs = []
+    for i, iname in enumerate(resid):
+        with np.load(iname) as f:
+            fidx = np.atleast_1d(np.squeeze(f["arr_0"]))
+        cidx = np.ravel_multi_index(
+            np.unravel_index(fidx, mskdata.shape, order="F"), mskdata.shape
+        )
+        idxs.append("c%d_idx.npz" % i)
+        np.savez(idxs[-1], (cidx,))
+    merged = merge_rois(resdw, idxs, "mask.nii", out_file="merged_c.nii")
+    assert np.allclose(nb.load(merged).get_fdata(), dwmerged)
@@ -4,15 +4,26 @@ name-steps pipeline: getting back scope in command-line based programming.
 """
 
 import os
+import copy
 import hashlib
 import pickle
 import time
 import shutil
+import sqlite3
 import glob
-
+import threading
+import multiprocessing as mp
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+from .. import config
 from ..interfaces.base import BaseInterface
 from ..pipeline.engine import Node
 from ..pipeline.engine.utils import modify_paths
+from ..utils.filemanip import ensure_list
+from ..utils.profiler import get_system_total_memory_gb
 
 ###############################################################################
 # PipeFunc object: callable interface to nipype.interface objects
@@ -28,7 +39,7 @@ class PipeFunc:
         out = fsl_merge(in_files=files, dimension='t')
     """
 
-    def __init__(self, interface, base_dir, callback=None):
+    def __init__(self, interface, base_dir, callback=None, memo=None, pool=None):
         """
 
         Parameters
@@ -41,6 +52,14 @@ class PipeFunc:
         callback: a callable
             An optional callable called each time after the function
             is called.
+        memo: a ResultMemo, optional
+            An in-memory store of results. Calls with identical inputs
+            found in it are answered without loading the result file,
+            as long as the node is still cached and up-to-date.
+        pool: a ResourcePool, optional
+            The process pool used by submit and map. If not given, a
+            pool using all the resources of the system is created on
+            first use.
         """
         if not (isinstance(interface, type) and issubclass(interface, BaseInterface)):
             raise ValueError(
@@ -56,8 +75,11 @@ class PipeFunc:
         doc = f"{self.interface.__doc__}\n{self.interface.help(returnhelp=True)}"
         self.__doc__ = doc
         self.callback = callback
+        self.memo = memo
+        self.pool = pool
 
-    def __call__(self, **kwargs):
+    def _make_node(self, kwargs):
+        """Create the node that computes the interface on kwargs"""
         kwargs = modify_paths(kwargs, relative=False)
         interface = self.interface()
         # Set the inputs early to get some argument checking
@@ -73,18 +95,89 @@ class PipeFunc:
         job_name = hasher.hexdigest()
         node = Node(interface, name=job_name)
         node.base_dir = os.path.join(self.base_dir, dir_name)
+        return node, dir_name, job_name
 
-        cwd = os.getcwd()
-        try:
-            out = node.run()
-        finally:
-            # node.run() changes to the node directory - if something goes
-            # wrong before it cds back you would end up in strange places
-            os.chdir(cwd)
+    def _done(self, dir_name, job_name, out):
+        if self.memo is not None:
+            self.memo.put((dir_name, job_name), out)
         if self.callback is not None:
             self.callback(dir_name, job_name)
+
+    def _memoized(self, node, dir_name, job_name):
+        """Return a copy of the memoized result of node, if still valid"""
+        if self.memo is None:
+            return None
+        out = self.memo.get((dir_name, job_name))
+        if out is None:
+            return None
+        # The run may have been removed, or its input files modified
+        node.config = copy.deepcopy(config._sections)
+        if node.is_cached() != (True, True):
+            self.memo.discard((dir_name, job_name))
+            return None
+        return copy.deepcopy(out)
+
+    def __call__(self, **kwargs):
+        node, dir_name, job_name = self._make_node(kwargs)
+
+        out = self._memoized(node, dir_name, job_name)
+        if out is None:
+            out = run_node(node)
+        self._done(dir_name, job_name, out)
         return out
 
+    def submit(self, **kwargs):
+        """Schedule a call on the process pool
+
+        The call is started as soon as the pool has enough free
+        processors and memory for the node (see ``Node.n_procs`` and
+        ``Node.mem_gb``). Results are stored in the same locations as
+        those of synchronous calls.
+
+        Returns
+        =======
+        future: a concurrent.futures.Future
+            Resolves to the result of the call
+        """
+        node, dir_name, job_name = self._make_node(kwargs)
+
+        out = self._memoized(node, dir_name, job_name)
+        if out is not None:
+            self._done(dir_name, job_name, out)
+            future = Future()
+            future.set_result(out)
+            return future
+
+        if self.pool is None:
+            self.pool = ResourcePool()
+        return self.pool.submit(node, done=partial(self._done, dir_name, job_name))
+
+    def map(self, iterfield, **kwargs):
+        """Apply the interface over lists of inputs in parallel
+
+        Parameters
+        ==========
+        iterfield: string or list of strings
+            The inputs over which to iterate. Their values must be lists
+            of the same length, which are traversed in parallel.
+        kwargs:
+            The inputs of the interface
+
+        Returns
+        =======
+        results: list
+            The results of the calls, in order
+        """
+        iterfield = ensure_list(iterfield)
+        values = [kwargs.pop(name) for name in iterfield]
+        if len({len(value) for value in values}) > 1:
+            raise ValueError("All iterfield inputs should be of the same length")
+        futures = [
+            self.submit(**kwargs, **dict(zip(iterfield, items)))
+            for items in zip(*values)
+        ]
+        return [future.result() for future in futures]
+
     def __repr__(self):
         return "{}({}.{}), base_dir={})".format(
             self.__class__.__name__,
@@ -94,6 +187,121 @@ class PipeFunc:
         )
 
 
+def run_node(node):
+    """Run node, returning to the current directory afterwards"""
+    cwd = os.getcwd()
+    try:
+        return node.run()
+    finally:
+        # node.run() changes to the node directory - if something goes
+        # wrong before it cds back you would end up in strange places
+        os.chdir(cwd)
+
+
+class ResourcePool:
+    """Run nodes on a pool of processes without exceeding the available
+    processors and memory
+
+    Parameters
+    ==========
+    n_procs: integer, optional
+        The maximum number of processors used at once (default: all)
+    memory_gb: float, optional
+        The maximum memory (in GB) used at once (default: 90% of the
+        system memory)
+    mp_context: string, optional
+        The name of the multiprocessing context to use
+    """
+
+    def __init__(self, n_procs=None, memory_gb=None, mp_context=None):
+        self.n_procs = n_procs or mp.cpu_count()
+        self.memory_gb = (
+            get_system_total_memory_gb() * 0.9 if memory_gb is None else memory_gb
+        )
+        self.mp_context = mp_context
+        self._executor = None
+        self._lock = threading.RLock()
+        self._pending = deque()
+        self._free_procs = self.n_procs
+        self._free_gb = self.memory_gb
+
+    def __getstate__(self):
+        return {
+            "n_procs": self.n_procs,
+            "memory_gb": self.memory_gb,
+            "mp_context": self.mp_context,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def submit(self, node, done=None):
+        """Queue node for execution, returning a Future of its result
+
+        If given, done is called with the result of a successful run
+        before the future is resolved.
+        """
+        n_procs, mem_gb = node.n_procs, node.mem_gb
+        if n_procs > self.n_procs or mem_gb > self.memory_gb:
+            raise RuntimeError("Insufficient resources available for job")
+        future = Future()
+        with self._lock:
+            self._pending.append((future, node, n_procs, mem_gb, done))
+            self._dispatch()
+        return future
+
+    def _dispatch(self):
+        """Start as many pending jobs as fit in the free resources"""
+        from ..pipeline.plugins.multiproc import process_initializer
+
+        with self._lock:
+            waiting = deque()
+            while self._pending:
+                job = self._pending.popleft()
+                future, node, n_procs, mem_gb, done = job
+                if n_procs > self._free_procs or mem_gb > self._free_gb:
+                    waiting.append(job)
+                    continue
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.n_procs,
+                        initializer=process_initializer,
+                        initargs=(os.getcwd(),),
+                        mp_context=mp.get_context(self.mp_context),
+                    )
+                self._free_procs -= n_procs
+                self._free_gb -= mem_gb
+                self._executor.submit(run_node, node).add_done_callback(
+                    partial(self._release, future, n_procs, mem_gb, done)
+                )
+            self._pending = waiting
+
+    def _release(self, future, n_procs, mem_gb, done, job):
+        with self._lock:
+            self._free_procs += n_procs
+            self._free_gb += mem_gb
+        try:
+            result = job.result()
+            if done is not None:
+                done(result)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        self._dispatch()
+
+    def shutdown(self, wait=True):
+        """Cancel pending jobs and release the worker processes"""
+        with self._lock:
+            while self._pending:
+                self._pending.popleft()[0].cancel()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
 ###############################################################################
 # Memory manager: provide some tracking about what is computed when, to
 # be able to flush the disk
@@ -137,6 +345,164 @@ def rm_all_but(base_dir, dirs_to_keep, warn=False):
             shutil.rmtree(dir_name)
 
 
+def dir_size(path):
+    """Return the total size in bytes of the files under path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for fname in files:
+            try:
+                total += os.lstat(os.path.join(root, fname)).st_size
+            except OSError:
+                "File has been deleted"
+    return total
+
+
+class ResultMemo:
+    """A bounded, in-process LRU store of results of cached calls
+
+    Parameters
+    ==========
+    maxsize: integer
+        The maximum number of results kept in memory
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+
+    def get(self, key):
+        try:
+            self._results.move_to_end(key)
+        except KeyError:
+            return None
+        return self._results[key]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._results[key] = value
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def discard(self, key):
+        self._results.pop(key, None)
+
+    def clear(self):
+        self._results.clear()
+
+    def __len__(self):
+        return len(self._results)
+
+    def __getstate__(self):
+        # Results are never shipped to other processes
+        return {"maxsize": self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+class CacheIndex:
+    """Track the size and accesses of the cached runs under a directory
+
+    The index is an SQLite database, so that several processes can share
+    the same Memory directory safely.
+
+    Parameters
+    ==========
+    filename: string
+        The location of the database
+    timeout: float
+        How many seconds to wait for other processes to release the
+        database lock
+    """
+
+    def __init__(self, filename, timeout=60.0):
+        self.filename = filename
+        self.timeout = timeout
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "dir_name TEXT NOT NULL, job_name TEXT NOT NULL, "
+                "size INTEGER NOT NULL, ctime REAL NOT NULL, "
+                "atime REAL NOT NULL, hits INTEGER NOT NULL, "
+                "PRIMARY KEY (dir_name, job_name))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.filename, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def touch(self, dir_name, job_name, path=None, atime=None):
+        """Record an access to a run, registering it if it is new"""
+        atime = time.time() if atime is None else atime
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE runs SET atime = ?, hits = hits + 1 "
+                "WHERE dir_name = ? AND job_name = ?",
+                (atime, dir_name, job_name),
+            ).rowcount
+            if not updated:
+                size = dir_size(path) if path is not None else 0
+                conn.execute(
+                    "INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, 1)",
+                    (dir_name, job_name, size, atime, atime),
+                )
+
+    def total_size(self):
+        query = "SELECT COALESCE(SUM(size), 0) FROM runs"
+        with self._connect() as conn:
+            return conn.execute(query).fetchone()[0]
+
+    def runs(self):
+        """Return all the indexed runs as (dir_name, job_name) tuples"""
+        with self._connect() as conn:
+            return set(conn.execute("SELECT dir_name, job_name FROM runs"))
+
+    def remove(self, runs):
+        with self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM runs WHERE dir_name = ? AND job_name = ?", list(runs)
+            )
+
+    def select_evictable(self, max_bytes=None, max_age=None, policy="lru"):
+        """List the runs that must be removed to honor the given bounds
+
+        Parameters
+        ==========
+        max_bytes: integer, optional
+            The total size that the remaining runs may take on disk
+        max_age: float, optional
+            The number of seconds after which unused runs are evicted
+        policy: 'lru' or 'lfu'
+            Whether the least recently or the least frequently used runs
+            are evicted first to honor max_bytes
+        """
+        if policy not in ("lru", "lfu"):
+            raise ValueError("policy should be 'lru' or 'lfu', not %r" % policy)
+        order = "atime" if policy == "lru" else "hits, atime"
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT dir_name, job_name, size, atime FROM runs ORDER BY " + order
+            ).fetchall()
+
+        evict = []
+        total = sum(row[2] for row in rows)
+        cutoff = None if max_age is None else time.time() - max_age
+        for dir_name, job_name, size, atime in rows:
+            too_big = max_bytes is not None and total > max_bytes
+            too_old = cutoff is not None and atime < cutoff
+            if too_big or too_old:
+                evict.append((dir_name, job_name))
+                total -= size
+        return evict
+
+
 class _MemoryCallback:
     "An object to avoid closures and have everything pickle"
 
@@ -154,6 +520,26 @@ class Memory:
     ==========
     base_dir: string
         The directory name of the location for the caching
+    max_bytes: integer, optional
+        If given, the least valuable runs (according to policy) are
+        removed from the disk whenever the cache grows beyond this
+        number of bytes
+    max_age: float, optional
+        If given, runs that have not been used for this number of
+        seconds are removed from the disk
+    policy: 'lru' or 'lfu', optional
+        Whether the least recently used (default) or the least
+        frequently used runs are evicted first to honor max_bytes
+    memo_size: integer, optional
+        How many results are kept in memory, so that repeated
+        identical calls from this process are answered without
+        loading their result files (default: 0, disabled)
+    n_procs, memory_gb: optional
+        The maximum number of processors and memory (in GB) used at
+        once by calls scheduled with submit and map (default: all the
+        resources of the system)
+    mp_context: string, optional
+        The name of the multiprocessing context used by submit and map
 
     Methods
     =======
@@ -165,15 +551,43 @@ class Memory:
     clear_previous_runs
         Removes from the disk all the runs that where not used after
         the given time
+    evict
+        Removes from the disk the runs exceeding the size and age
+        budgets
+    shutdown
+        Stops the worker processes used by submit and map
     """
 
-    def __init__(self, base_dir):
+    def __init__(
+        self,
+        base_dir,
+        max_bytes=None,
+        max_age=None,
+        policy="lru",
+        memo_size=0,
+        n_procs=None,
+        memory_gb=None,
+        mp_context=None,
+    ):
         base_dir = os.path.join(os.path.abspath(base_dir), "nipype_mem")
         if not os.path.exists(base_dir):
             os.mkdir(base_dir)
         elif not os.path.isdir(base_dir):
             raise ValueError("base_dir should be a directory")
+        if policy not in ("lru", "lfu"):
+            raise ValueError("policy should be 'lru' or 'lfu', not %r" % policy)
         self.base_dir = base_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.policy = policy
+        self.memo = ResultMemo(memo_size)
+        self.pool = ResourcePool(
+            n_procs=n_procs, memory_gb=memory_gb, mp_context=mp_context
+        )
+        # The name starts with "log." so it is never taken for a cached run
+        self.index = CacheIndex(os.path.join(base_dir, "log.index.sqlite"))
+        # Modification times of the directories found in sync with the index
+        self._synced = {}
         open(os.path.join(base_dir, "log.current"), "a").close()
 
     def cache(self, interface):
@@ -214,8 +628,19 @@ class Memory:
         We can retrieve the resulting file from the outputs:
         >>> results.outputs.merged_file # doctest: +SKIP
         '...'
+
+        Calls can also be run in parallel, in separate processes:
+
+        >>> future = fsl_merge.submit(in_files=['a.nii', 'b.nii'],
+        ...                           dimension='t') # doctest: +SKIP
+        >>> results = future.result() # doctest: +SKIP
+        >>> all_results = fsl_merge.map('in_files',
+        ...     in_files=[['a.nii', 'b.nii'], ['c.nii', 'd.nii']],
+        ...     dimension='t') # doctest: +SKIP
         """
-        return PipeFunc(interface, self.base_dir, _MemoryCallback(self))
+        return PipeFunc(
+            interface, self.base_dir, _MemoryCallback(self), self.memo, self.pool
+        )
 
     def _log_name(self, dir_name, job_name):
         """Increment counters tracking which cached function get executed."""
@@ -241,6 +666,100 @@ class Memory:
         with open(os.path.join(month_dir, "%02i.log" % t.tm_mday), "a") as rotatefile:
             rotatefile.write(f"{dir_name}/{job_name}\n")
 
+        self.index.touch(
+            dir_name, job_name, path=os.path.join(base_dir, dir_name, job_name)
+        )
+        if self.max_bytes is not None or self.max_age is not None:
+            self.evict(keep=[(dir_name, job_name)])
+
+    def evict(self, max_bytes=None, max_age=None, policy=None, keep=(), warn=False):
+        """Remove runs from the disk until the cache honors its budgets
+
+        Parameters
+        ==========
+        max_bytes, max_age, policy: optional
+            Override the corresponding settings of the Memory object
+        keep: list of (dir_name, job_name) tuples, optional
+            Runs that must not be removed
+        warn: boolean, optional
+            If true, echoes warning messages for all directory
+            removed
+
+        Returns
+        =======
+        evicted: list of (dir_name, job_name) tuples
+            The runs that were removed
+        """
+        self._sync_index()
+        evicted = [
+            run
+            for run in self.index.select_evictable(
+                max_bytes=self.max_bytes if max_bytes is None else max_bytes,
+                max_age=self.max_age if max_age is None else max_age,
+                policy=policy or self.policy,
+            )
+            if run not in keep
+        ]
+        for dir_name, job_name in evicted:
+            self.memo.discard((dir_name, job_name))
+            job_dir = os.path.join(self.base_dir, dir_name, job_name)
+            if os.path.exists(job_dir):
+                if warn:
+                    print("removing directory: %s" % job_dir)
+                shutil.rmtree(job_dir, ignore_errors=True)
+        self.index.remove(evicted)
+        return evicted
+
+    def _sync_index(self):
+        """Register untracked runs (e.g., created by older versions of
+        nipype) and forget about runs removed from the disk.
+
+        Only the directories modified since the previous sync are listed.
+        """
+        on_disk, scanned, present, synced = set(), set(), set(), {}
+        for dir_name in os.listdir(self.base_dir):
+            path = os.path.join(self.base_dir, dir_name)
+            if dir_name.startswith("log.") or not os.path.isdir(path):
+                continue
+            present.add(dir_name)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if self._synced.get(dir_name) == mtime:
+                    synced[dir_name] = mtime
+                    continue
+                jobs = os.listdir(path)
+            except OSError:
+                continue
+            # Skip runs that are not finished
+            finished = [
+                job
+                for job in jobs
+                if glob.glob(os.path.join(path, job, "result_*.pklz"))
+            ]
+            on_disk.update((dir_name, job) for job in finished)
+            scanned.add(dir_name)
+            if len(finished) == len(jobs):
+                # Directories with unfinished runs are listed again next time
+                synced[dir_name] = mtime
+        self._synced = synced
+
+        indexed = self.index.runs()
+        for dir_name, job_name in on_disk - indexed:
+            path = os.path.join(self.base_dir, dir_name, job_name)
+            try:
+                atime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            self.index.touch(dir_name, job_name, path=path, atime=atime)
+        gone = {
+            run
+            for run in indexed
+            if run[0] not in present or (run[0] in scanned and run not in on_disk)
+        }
+        for run in gone:
+            self.memo.discard(run)
+        self.index.remove(gone)
+
     def clear_previous_runs(self, warn=True):
         """Remove all the cache that where not used in the latest run of
         the memory object: i.e. since the corresponding Python object
@@ -293,6 +812,12 @@ class Memory:
         rm_all_but(self.base_dir, set(runs.keys()), warn=warn)
         for dir_name, job_names in list(runs.items()):
             rm_all_but(os.path.join(self.base_dir, dir_name), job_names, warn=warn)
+        self._sync_index()
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes used by submit and map, cancelling
+        calls that have not started yet."""
+        self.pool.shutdown(wait=wait)
 
     def __repr__(self):
         return f"{self.__class__.__name__}(base_dir={self.base_dir})"
@@ -1,6 +1,13 @@
 """Test the nipype interface caching mechanism"""
 
+import os
+import shutil
+
+import pytest
+
 from .. import Memory
+from ..memory import ResourcePool
+from ...pipeline.engine import Node
 from ...pipeline.engine.tests.test_engine import EngineTestInterface
 
 from ... import config
@@ -37,3 +44,121 @@ def test_caching(tmpdir):
         assert results.outputs.output1 == [1, 1]
     finally:
         config.set("execution", "stop_on_first_rerun", old_rerun)
+
+
+def test_memo(tmpdir):
+    assert len(Memory(tmpdir.strpath).memo) == 0
+    mem = Memory(tmpdir.strpath, memo_size=128)
+    func = mem.cache(SideEffectInterface)
+    first_nb_run = nb_runs
+    results = func(input1=2, input2=1)
+    assert len(mem.memo) == 1
+    memoized = func(input1=2, input2=1)
+    assert memoized is not results
+    assert memoized.outputs.output1 == results.outputs.output1
+    assert nb_runs == first_nb_run + 1
+
+    # Access tracking is updated on memoized calls too
+    (run,) = mem.index.runs()
+    assert run[0] == "nipype-caching-tests-test_memory-SideEffectInterface"
+
+    # Runs removed from the disk are not answered from memory
+    shutil.rmtree(os.path.join(mem.base_dir, *run))
+    func(input1=2, input2=1)
+    assert nb_runs == first_nb_run + 2
+
+    mem.clear_runs_since(year=2100)
+    assert len(mem.memo) == 0
+    assert not mem.index.runs()
+
+
+def test_eviction(tmpdir):
+    mem = Memory(tmpdir.strpath, memo_size=0)
+    func = mem.cache(SideEffectInterface)
+    jobs = []
+    for input1 in range(4):
+        known = mem.index.runs()
+        func(input1=input1, input2=1)
+        (new,) = mem.index.runs() - known
+        jobs.append(new)
+    assert mem.index.total_size() > 0
+
+    # Use the first run again, so it is the most recently used
+    func(input1=0, input2=1)
+    evicted = mem.evict(max_bytes=mem.index.total_size() - 1)
+    assert evicted == [jobs[1]]
+    dir_name, job_name = jobs[1]
+    assert not os.path.exists(os.path.join(mem.base_dir, dir_name, job_name))
+
+    # Least frequently used: the first run has been used twice
+    evicted = mem.evict(max_bytes=mem.index.total_size() - 1, policy="lfu")
+    assert evicted == [jobs[2]]
+    assert mem.index.runs() == {jobs[0], jobs[3]}
+
+    # Age based eviction
+    assert len(mem.evict(max_age=0)) == 2
+    assert not mem.index.runs()
+
+
+def test_budget(tmpdir):
+    mem = Memory(tmpdir.strpath, max_bytes=1)
+    func = mem.cache(SideEffectInterface)
+    for input1 in range(3):
+        func(input1=input1, input2=1)
+        # The run that was just used is always kept
+        assert len(mem.index.runs()) == 1
+
+
+def test_sync_index(tmpdir):
+    mem = Memory(tmpdir.strpath)
+    mem.cache(SideEffectInterface)(input1=1, input2=1)
+    os.remove(os.path.join(mem.base_dir, "log.index.sqlite"))
+
+    # An index-less cache (e.g., from an older nipype) is picked up again
+    mem = Memory(tmpdir.strpath)
+    assert not mem.index.runs()
+    assert mem.evict() == []
+    assert len(mem.index.runs()) == 1
+    assert mem.index.total_size() > 0
+
+    # Runs removed from the disk are forgotten
+    (run,) = mem.index.runs()
+    shutil.rmtree(os.path.join(mem.base_dir, *run))
+    assert mem.evict() == []
+    assert not mem.index.runs()
+
+
+def test_submit_map(tmpdir):
+    old_rerun = config.get("execution", "stop_on_first_rerun")
+    mem = Memory(tmpdir.strpath, n_procs=2)
+    try:
+        func = mem.cache(SideEffectInterface)
+        future = func.submit(input1=5, input2=1)
+        assert future.result().outputs.output1 == [1, 5]
+        results = func.map("input1", input1=[0, 1, 2], input2=1)
+        assert [res.outputs.output1 for res in results] == [[1, 0], [1, 1], [1, 2]]
+        assert len(mem.index.runs()) == 4
+
+        # Asynchronous and synchronous calls share the cache
+        config.set("execution", "stop_on_first_rerun", "true")
+        first_nb_run = nb_runs
+        mem.memo.clear()
+        results = func(input1=2, input2=1)
+        assert results.outputs.output1 == [1, 2]
+        assert nb_runs == first_nb_run
+    finally:
+        config.set("execution", "stop_on_first_rerun", old_rerun)
+        mem.shutdown()
+
+
+def test_pool_resources(tmpdir):
+    pool = ResourcePool(n_procs=2, memory_gb=1)
+    node = Node(SideEffectInterface(), name="node", base_dir=tmpdir.strpath)
+    node.inputs.input1 = 1
+    node.n_procs = 4
+    with pytest.raises(RuntimeError):
+        pool.submit(node)
+    node.n_procs = 1
+    node._mem_gb = 2
+    with pytest.raises(RuntimeError):
+        pool.submit(node)
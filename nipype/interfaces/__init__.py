@@ -8,5 +8,19 @@ Requires Packages to be installed
 
 __docformat__ = "restructuredtext"
 
-from .io import DataGrabber, DataSink, SelectFiles, BIDSDataGrabber
-from .utility import IdentityInterface, Rename, Function, Select, Merge
+from ..utils.imports import lazy_module_attrs as _lazy_module_attrs
+
+__getattr__, __dir__ = _lazy_module_attrs(
+    __name__,
+    {
+        "DataGrabber": ".io",
+        "DataSink": ".io",
+        "SelectFiles": ".io",
+        "BIDSDataGrabber": ".io",
+        "IdentityInterface": ".utility",
+        "Rename": ".utility",
+        "Function": ".utility",
+        "Select": ".utility",
+        "Merge": ".utility",
+    },
+)
@@ -30,6 +30,7 @@ from ...utils.filemanip import (
     which,
 )
 from ...utils.subprocess import run_command
+from ...utils.tool_cache import cached_probe
 
 from ...external.due import due
 
@@ -40,6 +41,7 @@ from .specs import (
     StdOutCommandLineInputSpec,
     MpiCommandLineInputSpec,
     get_filecopy_info,
+    spec_plan,
 )
 from .support import (
     RuntimeContext,
@@ -81,6 +83,9 @@ class Interface:
 
     _can_resume = False  # See property below
     _always_run = False  # See property below
+    _lightweight = False  # See property below
+    _fusible = False  # See property below
+    _ram_estimator = None  # See property below
 
     @property
     def can_resume(self):
@@ -94,6 +99,24 @@ class Interface:
         Only applies to interfaces being run within a workflow context."""
         return self._always_run
 
+    @property
+    def lightweight(self):
+        """Can the interface run in memory, without a working directory?
+        Only applies to interfaces being run within a workflow context."""
+        return self._lightweight
+
+    @property
+    def fusible(self):
+        """Is the interface cheap enough to share a scheduled task with others?
+        Only applies to interfaces being run within a workflow context."""
+        return self._fusible
+
+    @property
+    def ram_estimator(self):
+        """Default estimator of the memory needed to run the interface.
+        Only applies to interfaces being run within a workflow context."""
+        return self._ram_estimator
+
     @property
     def version(self):
         """interfaces should implement a version property"""
@@ -266,7 +289,9 @@ class BaseInterface(Interface):
 
     def _check_mandatory_inputs(self):
         """Raises an exception if a mandatory input is Undefined"""
-        for name, spec in list(self.inputs.traits(mandatory=True).items()):
+        plan = spec_plan(self.inputs)
+        for name in plan.mandatory:
+            spec = self.inputs.trait(name)
             value = getattr(self.inputs, name)
             self._check_xor(spec, name, value)
             if not isdefined(value) and spec.xor is None:
@@ -278,10 +303,10 @@ class BaseInterface(Interface):
                 raise ValueError(msg)
             if isdefined(value):
                 self._check_requires(spec, name, value)
-        for name, spec in list(
-            self.inputs.traits(mandatory=None, transient=None).items()
-        ):
-            self._check_requires(spec, name, getattr(self.inputs, name))
+        for name in plan.requires:
+            self._check_requires(
+                self.inputs.trait(name), name, getattr(self.inputs, name)
+            )
 
     def _check_version_requirements(self, trait_object, permissive=False):
         """Raises an exception on version mismatch
@@ -742,7 +767,6 @@ class CommandLine(BaseInterface):
 
         runtime.stdout = None
         runtime.stderr = None
-        runtime.cmdline = self.cmdline
         runtime.environ.update(out_environ)
         runtime.success_codes = correct_return_codes
 
@@ -929,10 +953,10 @@ class CommandLine(BaseInterface):
         all_args = []
         initial_args = {}
         final_args = {}
-        metadata = dict(argstr=lambda t: t is not None)
-        for name, spec in sorted(self.inputs.traits(**metadata).items()):
+        for name in spec_plan(self.inputs).arguments:
             if skip and name in skip:
                 continue
+            spec = self.inputs.trait(name)
             value = getattr(self.inputs, name)
             if spec.name_source:
                 value = self._filename_from_source(name)
@@ -1088,16 +1112,13 @@ class PackageInfo:
     def version(klass):
         if klass._version is None:
             if klass.version_cmd is not None:
-                try:
-                    clout = CommandLine(
-                        command=klass.version_cmd,
-                        resource_monitor=False,
-                        terminal_output="allatonce",
-                    ).run()
-                except OSError:
+                raw_info = cached_probe(
+                    "version_cmd:%s" % klass.version_cmd,
+                    klass.version_cmd,
+                    klass._run_version_cmd,
+                )
+                if raw_info is None:
                     return None
-
-                raw_info = clout.runtime.stdout
             elif klass.version_file is not None:
                 try:
                     with open(klass.version_file) as fobj:
@@ -1111,6 +1132,19 @@ class PackageInfo:
 
         return klass._version
 
+    @classmethod
+    def _run_version_cmd(klass):
+        try:
+            clout = CommandLine(
+                command=klass.version_cmd,
+                resource_monitor=False,
+                terminal_output="allatonce",
+            ).run()
+        except OSError:
+            return None
+
+        return clout.runtime.stdout
+
     @staticmethod
     def parse_version(raw_info):
         raise NotImplementedError
@@ -10,8 +10,10 @@ Define the API for the I/O of interfaces
 """
 
 import os
+from functools import lru_cache
 from inspect import isclass
 from copy import deepcopy
+from pathlib import PurePath
 from warnings import warn
 from packaging.version import Version
 
@@ -33,6 +35,74 @@ from ... import config, __version__
 
 _float_fmt = "{:.10f}".format
 nipype_version = Version(__version__)
+_immutable_types = (str, bytes, int, float, complex, type(None), PurePath)
+
+
+def _is_immutable_type(cls):
+    """Check whether instances of cls cannot be modified in place"""
+    return issubclass(cls, _immutable_types) or cls is type(Undefined)
+
+
+def _copy_mutable(value, memo=None):
+    """Copy value, sharing all immutable items
+
+    Strings, numbers and flat lists and tuples of them are the vast
+    majority of inputs; copying them does not require ``deepcopy``.
+    """
+    if _is_immutable_type(type(value)):
+        return value
+    if isinstance(value, (list, tuple)) and all(
+        _is_immutable_type(cls) for cls in set(map(type, value))
+    ):
+        return value if type(value) is tuple else list(value)
+    return deepcopy(value, memo)
+
+
+def _hash_file(path, hash_method):
+    if hash_method.lower() == "timestamp":
+        return hash_timestamp(path)
+    if hash_method.lower() == "content":
+        return hash_infile(path)
+    raise Exception("Unknown hash method: %s" % hash_method)
+
+
+def _hash_value(objekt, hash_method, hash_files=True):
+    """Return the representations of a value with and without file names.
+
+    This is a single-pass equivalent of calling
+    :meth:`BaseTraitedSpec._get_sorteddict` with and without ``dictwithhash``.
+
+    >>> _hash_value({"b": [1.0, (2, "a")], "a": None}, "timestamp")[1]
+    [('a', None), ('b', ['1.0000000000', (2, 'a')])]
+
+    """
+    if isinstance(objekt, dict):
+        items = [
+            (key, _hash_value(val, hash_method, hash_files))
+            for key, val in sorted(objekt.items())
+            if isdefined(val)
+        ]
+        return (
+            [(key, val[0]) for key, val in items],
+            [(key, val[1]) for key, val in items],
+        )
+    if isinstance(objekt, (list, tuple)):
+        items = [
+            _hash_value(val, hash_method, hash_files)
+            for val in objekt
+            if isdefined(val)
+        ]
+        withhash = [val[0] for val in items]
+        nofilename = [val[1] for val in items]
+        if isinstance(objekt, tuple):
+            return tuple(withhash), tuple(nofilename)
+        return withhash, nofilename
+    if hash_files and isinstance(objekt, (str, bytes)) and os.path.isfile(objekt):
+        hash = _hash_file(objekt, hash_method)
+        return (objekt, hash), hash
+    if isinstance(objekt, float):
+        objekt = _float_fmt(objekt)
+    return objekt, objekt
 
 
 class BaseTraitedSpec(traits.HasTraits):
@@ -67,8 +137,9 @@ class BaseTraitedSpec(traits.HasTraits):
         super().__init__(**kwargs)
         traits.push_exception_handler(reraise_exceptions=True)
         undefined_traits = {}
+        spec_traits = self.traits()
         for trait in self.copyable_trait_names():
-            if not self.traits()[trait].usedefault:
+            if not spec_traits[trait].usedefault:
                 undefined_traits[trait] = Undefined
         self.trait_set(trait_change_notify=False, **undefined_traits)
         self._generate_handlers()
@@ -86,6 +157,62 @@ class BaseTraitedSpec(traits.HasTraits):
             outstr.append(f"{name} = {value}")
         return "\n{}\n".format("\n".join(outstr))
 
+    def copy_spec(self, values=None, memo=None):
+        """Return a copy of this specification, sharing immutable values
+
+        The copy is a new instance of the same class, extended with the
+        traits that were dynamically added to this one. Strings, numbers
+        and flat lists/tuples of them are not duplicated, and every value
+        is validated only once.
+
+        Parameters
+        ----------
+        values : dict, optional
+            The values to set on the copy (default: the values of this
+            specification, as returned by ``trait_get()``). Inputs not
+            listed are left undefined.
+        memo : dict, optional
+            The memo passed on to ``deepcopy`` for mutable values.
+
+        >>> from nipype.interfaces.io import add_traits
+        >>> spec = add_traits(DynamicTraitedSpec(), ["a", "b"])
+        >>> spec.a = ["x", "y"]
+        >>> dup = spec.copy_spec()
+        >>> dup.a.append("z")
+        >>> spec.a, dup.a, dup.b
+        (['x', 'y'], ['x', 'y', 'z'], <undefined>)
+
+        """
+        if values is None:
+            values = self.trait_get()
+
+        dup = self.__class__()
+        instance_traits = self._instance_traits()
+        spec_traits = dup.traits()
+        dynamic = [
+            name
+            for name in self.copyable_trait_names()
+            if name in instance_traits and name not in spec_traits
+        ]
+        for name in dynamic:
+            dup.add_trait(name, instance_traits[name])
+        # access each trait, as add_traits does
+        for name in dynamic:
+            _ = getattr(dup, name)
+
+        # Values of the new instance are already undefined, unless
+        # ``usedefault`` is set
+        dup.trait_set(
+            **{
+                name: _copy_mutable(value, memo)
+                for name, value in values.items()
+                if isdefined(value)
+                or name not in spec_traits
+                or spec_traits[name].usedefault
+            }
+        )
+        return dup
+
     def _generate_handlers(self):
         """Find all traits with the 'xor' metadata and attach an event
         handler to them.
@@ -235,32 +362,17 @@ class BaseTraitedSpec(traits.HasTraits):
             The md5 hash value of the traited spec
 
         """
+        if hash_method is None:
+            hash_method = config.get("execution", "hash_method")
         list_withhash = []
         list_nofilename = []
-        for name, val in sorted(self.trait_get().items()):
-            if not isdefined(val) or self.has_metadata(name, "nohash", True):
-                # skip undefined traits and traits with nohash=True
+        for name, hash_files in spec_plan(self).hashed:
+            val = getattr(self, name)
+            if not isdefined(val):
                 continue
-
-            hash_files = not self.has_metadata(
-                name, "hash_files", False
-            ) and not self.has_metadata(name, "name_source")
-            list_nofilename.append(
-                (
-                    name,
-                    self._get_sorteddict(
-                        val, hash_method=hash_method, hash_files=hash_files
-                    ),
-                )
-            )
-            list_withhash.append(
-                (
-                    name,
-                    self._get_sorteddict(
-                        val, True, hash_method=hash_method, hash_files=hash_files
-                    ),
-                )
-            )
+            withhash, nofilename = _hash_value(val, hash_method, hash_files)
+            list_nofilename.append((name, nofilename))
+            list_withhash.append((name, withhash))
         return list_withhash, md5(str(list_nofilename).encode()).hexdigest()
 
     def _get_sorteddict(
@@ -306,12 +418,7 @@ class BaseTraitedSpec(traits.HasTraits):
                     if hash_method is None:
                         hash_method = config.get("execution", "hash_method")
 
-                    if hash_method.lower() == "timestamp":
-                        hash = hash_timestamp(objekt)
-                    elif hash_method.lower() == "content":
-                        hash = hash_infile(objekt)
-                    else:
-                        raise Exception("Unknown hash method: %s" % hash_method)
+                    hash = _hash_file(objekt, hash_method)
                     if dictwithhash:
                         out = (objekt, hash)
                     else:
@@ -382,21 +489,8 @@ class DynamicTraitedSpec(BaseTraitedSpec):
         id_self = id(self)
         if id_self in memo:
             return memo[id_self]
-        dup_dict = deepcopy(self.trait_get(), memo)
-        # access all keys
-        for key in self.copyable_trait_names():
-            if key in self.__dict__:
-                _ = getattr(self, key)
-        # clone once
-        dup = self.clone_traits(memo=memo)
-        for key in self.copyable_trait_names():
-            try:
-                _ = getattr(dup, key)
-            except:
-                pass
-        # clone twice
-        dup = self.clone_traits(memo=memo)
-        dup.trait_set(**dup_dict)
+        dup = self.copy_spec(memo=memo)
+        memo[id_self] = dup
         return dup
 
 
@@ -422,6 +516,99 @@ class MpiCommandLineInputSpec(CommandLineInputSpec):
     )
 
 
+class SpecPlan:
+    """Static metadata of an input specification, gathered once per class.
+
+    Querying traits by metadata (e.g., ``inputs.traits(mandatory=True)``)
+    walks every trait of the specification, which adds up when command lines
+    are built and validated thousands of times (e.g., by MapNodes).
+
+    >>> from nipype.interfaces.base import CommandLineInputSpec
+    >>> plan = spec_plan(CommandLineInputSpec())
+    >>> plan.arguments
+    ('args',)
+    >>> spec_plan(CommandLineInputSpec()) is plan
+    True
+
+    """
+
+    def __init__(self, traits):
+        self.names = frozenset(traits)
+        #: Inputs formatted on the command line, sorted by name
+        self.arguments = tuple(
+            sorted(name for name, spec in traits.items() if spec.argstr is not None)
+        )
+        #: Mandatory inputs
+        self.mandatory = tuple(
+            name for name, spec in traits.items() if spec.mandatory is True
+        )
+        #: Optional inputs declared as requiring other inputs
+        self.requires = tuple(
+            name
+            for name, spec in traits.items()
+            if spec.requires and spec.mandatory is None and spec.transient is None
+        )
+        #: Hashed inputs, sorted by name, and whether they may hold files
+        self.hashed = tuple(
+            (
+                name,
+                not has_metadata(spec.trait_type, "hash_files", False)
+                and not has_metadata(spec.trait_type, "name_source")
+                and _may_hold_path(spec.trait_type),
+            )
+            for name, spec in sorted(traits.items())
+            if spec.type != "event"
+            and not has_metadata(spec.trait_type, "nohash", True)
+        )
+        self._handlers = {name: spec.handler for name, spec in traits.items()}
+
+
+_NO_PATH_TRAITS = (
+    traits.BaseInt,
+    traits.BaseFloat,
+    traits.BaseBool,
+    traits.BaseRange,
+    traits.BaseEnum,
+)
+
+
+def _may_hold_path(trait_type):
+    """Whether values of ``trait_type`` may be paths to files.
+
+    >>> _may_hold_path(traits.List(traits.Float()))
+    False
+    >>> _may_hold_path(traits.List(traits.Str()))
+    True
+
+    """
+    if isinstance(trait_type, _NO_PATH_TRAITS):
+        return False
+    if isinstance(trait_type, (traits.List, traits.BaseTuple)):
+        inner_traits = trait_type.inner_traits()
+        return not inner_traits or any(
+            _may_hold_path(inner.trait_type) for inner in inner_traits
+        )
+    return True
+
+
+@lru_cache(maxsize=None)
+def _class_spec_plan(spec_class):
+    return SpecPlan(spec_class.class_traits())
+
+
+def spec_plan(inputs):
+    """Return the :class:`SpecPlan` of an input specification instance.
+
+    The plan is shared by all instances of the same class, unless traits
+    were added to or replaced in ``inputs`` (e.g., by dynamic interfaces).
+    """
+    plan = _class_spec_plan(type(inputs))
+    for name, spec in inputs._instance_traits().items():
+        if plan._handlers.get(name) is not spec.handler:
+            return SpecPlan(inputs.traits())
+    return plan
+
+
 def get_filecopy_info(cls):
     """Provides information about file inputs to copy or link to cwd.
     Necessary for pipeline operation
@@ -428,6 +428,38 @@ def test_Commandline():
     nib.CommandLine.input_spec = nib.CommandLineInputSpec
 
 
+def test_Commandline_spec_plan():
+    class PlanInputSpec(nib.CommandLineInputSpec):
+        foo = nib.Str(argstr="%s", mandatory=True, desc="a str")
+        goo = nib.traits.Bool(argstr="-g", requires=["hoo"], desc="a bool")
+        hoo = nib.traits.Int(argstr="-h %d", position=0, desc="an int")
+
+    class PlanCommand(nib.CommandLine):
+        input_spec = PlanInputSpec
+        _cmd = "cmd"
+
+    ci = PlanCommand(foo="foo")
+    plan = nib.specs.spec_plan(ci.inputs)
+    assert plan.arguments == ("args", "foo", "goo", "hoo")
+    assert plan.mandatory == ("foo",)
+    assert plan.requires == ("goo",)
+    assert nib.specs.spec_plan(PlanCommand().inputs) is plan
+
+    ci.inputs.goo = True
+    with pytest.raises(ValueError, match="because 'goo' is set"):
+        ci.cmdline
+    ci.inputs.hoo = 1
+    assert ci.cmdline == "cmd -h 1 foo -g"
+
+    # Traits added to an instance are not ignored
+    ci.inputs.add_trait("ioo", nib.File(argstr="-i %s", mandatory=True))
+    assert nib.specs.spec_plan(ci.inputs) is not plan
+    with pytest.raises(ValueError, match="input 'ioo'"):
+        ci.cmdline
+    ci.inputs.ioo = "bar"
+    assert ci.cmdline == "cmd -h 1 foo -g -i bar"
+
+
 def test_Commandline_environ(monkeypatch, tmpdir):
     from nipype import config
 
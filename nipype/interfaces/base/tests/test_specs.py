@@ -114,6 +114,29 @@ def test_DynamicTraitedSpec_tab_completion():
     assert set(list_extract.outputs.__all__) == expected_output
 
 
+def test_DynamicTraitedSpec_copy():
+    from copy import deepcopy
+    from ...io import add_traits
+
+    spec = add_traits(nib.DynamicTraitedSpec(), ["shared", "nested", "unset"])
+    spec.shared = ["a", "b"]
+    spec.nested = [{"key": [1]}]
+    spec.undeclared = 1
+
+    for dup in (deepcopy(spec), spec.copy_spec()):
+        assert dup.trait_get() == spec.trait_get()
+        assert dup.unset is Undefined
+        dup.shared.append("c")
+        dup.nested[0]["key"].append(2)
+        assert spec.shared == ["a", "b"]
+        assert spec.nested == [{"key": [1]}]
+        assert dup.get_hashval()
+
+    dup = spec.copy_spec({"shared": ["z"], "nested": Undefined})
+    assert dup.shared == ["z"]
+    assert dup.nested is Undefined
+
+
 def test_TraitedSpec_logic():
     class spec3(nib.TraitedSpec):
         _xor_inputs = ("foo", "bar")
@@ -410,6 +433,45 @@ def test_TraitedSpec_withNoFileHashing(setup_file):
     assert hashval1[1] != hashval2[1]
 
 
+def test_TraitedSpec_hash_plan(setup_file):
+    tmp_infile = setup_file
+    _, nme = os.path.split(tmp_infile)
+
+    class spec(nib.TraitedSpec):
+        moo = nib.File(exists=True)
+        doo = nib.traits.List(nib.traits.Float())
+        noo = nib.traits.Str(nohash=True)
+        soo = nib.traits.Either(nib.traits.Int(), nib.traits.Str())
+        too = nib.traits.Enum("a", "b")
+
+    infields = spec(moo=nme, doo=[1.0], noo="x", soo=nme, too="b")
+    plan = nib.specs.spec_plan(infields)
+    assert plan.hashed == (
+        ("doo", False),
+        ("moo", True),
+        ("soo", True),
+        ("too", False),
+    )
+    hashval = infields.get_hashval(hash_method="content")
+    assert hashval[0] == [
+        ("doo", ["1.0000000000"]),
+        ("moo", (nme, "25f9e794323b453885f5181f1b624d0b")),
+        ("soo", (nme, "25f9e794323b453885f5181f1b624d0b")),
+        ("too", "b"),
+    ]
+
+    # Replacing a trait (as MapNode does with iterfields) updates the plan
+    infields.remove_trait("doo")
+    infields.add_trait("doo", nib.InputMultiPath(nib.File(exists=True)))
+    infields.doo = [nme]
+    assert nib.specs.spec_plan(infields).hashed[0] == ("doo", True)
+    assert infields.get_hashval(hash_method="content")[0][0] == (
+        "doo",
+        [(nme, "25f9e794323b453885f5181f1b624d0b")],
+    )
+    assert nib.specs.spec_plan(spec()) is plan
+
+
 def test_ImageFile():
     x = nib.BaseInterface().inputs
 
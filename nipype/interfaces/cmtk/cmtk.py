@@ -69,52 +69,173 @@ def length(xyz, along=False):
     return np.sum(dists)
 
 
+def _mm_to_voxel(pointsmm, voxelSize):
+    """Truncate millimeter coordinates to voxel indices."""
+    pointsmm = np.asanyarray(pointsmm)
+    dtype = pointsmm.dtype if pointsmm.dtype.kind == "f" else np.float64
+    return (pointsmm[..., :3] / np.asarray(voxelSize[:3], dtype=dtype)).astype(int)
+
+
 def get_rois_crossed(pointsmm, roiData, voxelSize):
-    n_points = len(pointsmm)
-    rois_crossed = []
-    for j in range(n_points):
-        # store point
-        x = int(pointsmm[j, 0] / float(voxelSize[0]))
-        y = int(pointsmm[j, 1] / float(voxelSize[1]))
-        z = int(pointsmm[j, 2] / float(voxelSize[2]))
-        if roiData[x, y, z] != 0:
-            rois_crossed.append(roiData[x, y, z])
-    rois_crossed = list(
-        dict.fromkeys(rois_crossed).keys()
-    )  # Removed duplicates from the list
-    return rois_crossed
+    """
+    List the ROIs crossed by a fiber, in the order they are first reached.
+
+    >>> roiData = np.array([[[0, 1], [2, 0]], [[3, 0], [0, 0]]])
+    >>> pointsmm = np.array([[0.5, 1.5, 0], [0, 0, 2.5], [1.5, 0, 0], [0, 0, 3]])
+    >>> get_rois_crossed(pointsmm, roiData, (1.0, 1.0, 2.0))
+    [2, 1, 3]
+    """
+    ijk = _mm_to_voxel(pointsmm, voxelSize)
+    rois = roiData[ijk[:, 0], ijk[:, 1], ijk[:, 2]]
+    rois = rois[rois != 0]
+    _, first = np.unique(rois, return_index=True)
+    return rois[np.sort(first)].tolist()
+
+
+def get_fibers_rois(points, lengths, roiData, voxelSize):
+    """
+    Find the (unique) ROIs crossed by a set of fibers.
+
+    Parameters
+    ----------
+    points : ndarray of shape (N, 3)
+      the points of all fibers, concatenated, in millimeter coordinates
+    lengths : array-like
+      number of points of each fiber
+    roiData : ndarray
+      the ROI labels
+    voxelSize : tuple
+      3-tuple containing the voxel size of the ROI image
+
+    Returns
+    -------
+    fibers, rois : ndarray
+      indices of the fibers (within this set) and ROIs they cross, one entry
+      per crossing, sorted by fiber
+
+    >>> roiData = np.array([[[0, 1], [2, 0]], [[3, 0], [0, 0]]])
+    >>> points = np.array([[0, 0, 3], [1, 0, 0], [1, 0, 0], [0, 0, 0]])
+    >>> get_fibers_rois(points, [2, 1, 1], roiData, (1.0, 1.0, 2.0))
+    (array([0, 0, 1]), array([1, 3, 3]))
+    """
+    ijk = _mm_to_voxel(points, voxelSize)
+    rois = np.asarray(roiData[ijk[:, 0], ijk[:, 1], ijk[:, 2]], dtype=np.int64)
+    fibers = np.repeat(np.arange(len(lengths)), lengths)
+    crossed = rois != 0
+    fibers, rois = fibers[crossed], rois[crossed]
+    if not rois.size:
+        return fibers, rois
+
+    # Encode each crossing in a single integer to remove duplicates at once
+    offset = rois.min()
+    span = rois.max() - offset + 1
+    keys = np.unique(fibers * span + (rois - offset))
+    return keys // span, keys % span + offset
 
 
 def get_connectivity_matrix(n_rois, list_of_roi_crossed_lists):
-    connectivity_matrix = np.zeros((n_rois, n_rois), dtype=np.uint)
-    for rois_crossed in list_of_roi_crossed_lists:
-        for idx_i, roi_i in enumerate(rois_crossed):
-            for idx_j, roi_j in enumerate(rois_crossed):
-                if idx_i > idx_j:
-                    if roi_i != roi_j:
-                        connectivity_matrix[roi_i - 1, roi_j - 1] += 1
-    connectivity_matrix = connectivity_matrix + connectivity_matrix.T
-    return connectivity_matrix
-
-
-def create_allpoints_cmat(streamlines, roiData, voxelSize, n_rois):
-    """Create the intersection arrays for each fiber"""
+    """
+    Count, for every pair of ROIs, the fibers crossing both of them.
+
+    ``list_of_roi_crossed_lists`` has the ROIs crossed by each fiber.
+
+    >>> get_connectivity_matrix(3, [[1, 2], [3, 1, 2], [2]])
+    array([[0, 2, 1],
+           [2, 0, 1],
+           [1, 1, 0]], dtype=uint64)
+    """
+    fibers = np.repeat(
+        np.arange(len(list_of_roi_crossed_lists)),
+        [len(rois_crossed) for rois_crossed in list_of_roi_crossed_lists],
+    )
+    rois = np.fromiter(
+        (roi for rois_crossed in list_of_roi_crossed_lists for roi in rois_crossed),
+        dtype=np.int64,
+        count=len(fibers),
+    )
+    return get_fibers_connectivity_matrix(n_rois, fibers, rois)
+
+
+def get_fibers_connectivity_matrix(n_rois, fibers, rois):
+    """
+    Count, for every pair of ROIs, the fibers crossing both of them.
+
+    ``fibers`` and ``rois`` list the fiber/ROI crossings, as returned by
+    :func:`get_fibers_rois`.
+
+    >>> fibers, rois = np.array([0, 0, 1, 1]), np.array([1, 2, 2, 3])
+    >>> get_fibers_connectivity_matrix(3, fibers, rois)
+    array([[0, 1, 0],
+           [1, 0, 1],
+           [0, 1, 0]], dtype=uint64)
+    """
+    from scipy import sparse
+
+    n_fibers = fibers.max() + 1 if fibers.size else 0
+    incidence = sparse.coo_matrix(
+        (np.ones(len(fibers), dtype=np.int64), (fibers, rois - 1)),
+        shape=(n_fibers, n_rois),
+    ).tocsr()
+    incidence.data[:] = 1  # a fiber counts once per ROI
+    connectivity_matrix = (incidence.T @ incidence).toarray()
+    np.fill_diagonal(connectivity_matrix, 0)
+    return connectivity_matrix.astype(np.uint)
+
+
+_WORKER_ROIS = None
+
+
+def _init_rois_worker(roiData, voxelSize):
+    global _WORKER_ROIS
+    _WORKER_ROIS = (roiData, voxelSize)
+
+
+def _rois_worker(chunk):
+    points, lengths = chunk
+    return get_fibers_rois(points, lengths, *_WORKER_ROIS)
+
+
+def _fiber_chunks(streamlines, chunk_size):
+    for start in range(0, len(streamlines), chunk_size):
+        fibers = [fiber[0] for fiber in streamlines[start : start + chunk_size]]
+        lengths = [len(fiber) for fiber in fibers]
+        yield np.concatenate(fibers, axis=0), lengths
+
+
+def create_allpoints_cmat(
+    streamlines, roiData, voxelSize, n_rois, chunk_size=None, n_procs=1
+):
+    """Create the intersection arrays for each fiber
+
+    The points of ``chunk_size`` fibers (all of them by default) are looked up
+    at once, and chunks are distributed over ``n_procs`` processes.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
     n_fib = len(streamlines)
-    pc = -1
-    # Computation for each fiber
-    final_fiber_ids = []
-    list_of_roi_crossed_lists = []
-    for i, fiber in enumerate(streamlines):
-        pcN = int(round(float(100 * i) / n_fib))
-        if pcN > pc and pcN % 1 == 0:
-            pc = pcN
-            print("%4.0f%%" % (pc))
-        rois_crossed = get_rois_crossed(fiber[0], roiData, voxelSize)
-        if len(rois_crossed) > 0:
-            list_of_roi_crossed_lists.append(list(rois_crossed))
-            final_fiber_ids.append(i)
-
-    connectivity_matrix = get_connectivity_matrix(n_rois, list_of_roi_crossed_lists)
+    chunk_size = chunk_size or max(n_fib, 1)
+    chunks = _fiber_chunks(streamlines, chunk_size)
+    if n_procs > 1 and n_fib > chunk_size:
+        with ProcessPoolExecutor(
+            max_workers=n_procs,
+            initializer=_init_rois_worker,
+            initargs=(roiData, voxelSize),
+        ) as pool:
+            results = list(pool.map(_rois_worker, chunks))
+    else:
+        results = [
+            get_fibers_rois(points, lengths, roiData, voxelSize)
+            for points, lengths in chunks
+        ]
+
+    fibers = np.concatenate(
+        [fibers + i * chunk_size for i, (fibers, _) in enumerate(results)]
+        or [np.zeros(0, dtype=int)]
+    )
+    rois = np.concatenate([rois for _, rois in results] or [np.zeros(0, dtype=int)])
+
+    connectivity_matrix = get_fibers_connectivity_matrix(n_rois, fibers, rois)
+    final_fiber_ids = np.unique(fibers).tolist()
     dis = n_fib - len(final_fiber_ids)
     iflogger.info(
         "Found %i (%f percent out of %i fibers) fibers that start or "
@@ -188,6 +309,8 @@ def cmat(
     matrix_mat_name,
     endpoint_name,
     intersections=False,
+    chunk_size=None,
+    n_procs=1,
 ):
     """Create the connection matrix for each resolution using fibers and ROIs."""
     import scipy.io as sio
@@ -253,7 +376,7 @@ def cmat(
     if intersections:
         iflogger.info("Filtering tractography from intersections")
         intersection_matrix, final_fiber_ids = create_allpoints_cmat(
-            fib, roiData, roiVoxelSize, nROIs
+            fib, roiData, roiVoxelSize, nROIs, chunk_size=chunk_size, n_procs=n_procs
         )
         finalfibers_fname = op.abspath(
             endpoint_name + "_intersections_streamline_final.trk"
@@ -486,6 +609,16 @@ class CreateMatrixInputSpec(TraitedSpec):
         usedefault=True,
         desc="Counts all of the fiber-region traversals in the connectivity matrix (requires significantly more computational time)",
     )
+    chunk_size = traits.Range(
+        low=1,
+        desc="number of fibers whose region intersections are computed at once",
+    )
+    n_procs = traits.Int(
+        1,
+        usedefault=True,
+        nohash=True,
+        desc="number of processes counting region intersections",
+    )
     out_matrix_file = File(
         genfile=True, desc="NetworkX graph describing the connectivity"
     )
@@ -653,6 +786,10 @@ class CreateMatrix(BaseInterface):
             matrix_mat_file,
             endpoint_name,
             self.inputs.count_region_intersections,
+            chunk_size=(
+                self.inputs.chunk_size if isdefined(self.inputs.chunk_size) else None
+            ),
+            n_procs=self.inputs.n_procs,
         )
         return runtime
 
@@ -4,9 +4,14 @@ from ..cmtk import CreateMatrix
 
 def test_CreateMatrix_inputs():
     input_map = dict(
+        chunk_size=dict(),
         count_region_intersections=dict(
             usedefault=True,
         ),
+        n_procs=dict(
+            nohash=True,
+            usedefault=True,
+        ),
         out_endpoint_array_name=dict(
             extensions=None,
             genfile=True,
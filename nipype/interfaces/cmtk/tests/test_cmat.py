@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ..cmtk import create_allpoints_cmat
+
+
+def _reference_allpoints_cmat(streamlines, roiData, voxelSize, n_rois):
+    connectivity_matrix = np.zeros((n_rois, n_rois), dtype=np.uint)
+    final_fiber_ids = []
+    for i, fiber in enumerate(streamlines):
+        rois_crossed = []
+        for point in fiber[0]:
+            x, y, z = (int(point[k] / float(voxelSize[k])) for k in range(3))
+            if roiData[x, y, z] != 0:
+                rois_crossed.append(roiData[x, y, z])
+        rois_crossed = list(dict.fromkeys(rois_crossed))
+        if rois_crossed:
+            final_fiber_ids.append(i)
+        for idx_i, roi_i in enumerate(rois_crossed):
+            for roi_j in rois_crossed[:idx_i]:
+                connectivity_matrix[roi_i - 1, roi_j - 1] += 1
+    return connectivity_matrix + connectivity_matrix.T, final_fiber_ids
+
+
+@pytest.mark.parametrize("chunk_size,n_procs", [(None, 1), (7, 1), (7, 2)])
+def test_create_allpoints_cmat(chunk_size, n_procs):
+    rng = np.random.default_rng(0)
+    voxelSize = np.array([2.0, 2.0, 2.5], dtype=np.float32)
+    roiData = rng.integers(0, 6, size=(10, 10, 8)).astype(np.int16)
+    roiData[rng.random(roiData.shape) < 0.6] = 0
+    streamlines = []
+    for _ in range(50):
+        n_points = rng.integers(1, 30)
+        start = rng.uniform(0, 15, 3)
+        steps = rng.normal(0, 1.5, (n_points, 3))
+        points = np.clip(start + np.cumsum(steps, axis=0), 0, 19.9)
+        streamlines.append((points.astype(np.float32), None, None))
+
+    expected = _reference_allpoints_cmat(streamlines, roiData, voxelSize, 5)
+    matrix, fiber_ids = create_allpoints_cmat(
+        streamlines, roiData, voxelSize, 5, chunk_size=chunk_size, n_procs=n_procs
+    )
+    assert np.array_equal(matrix, expected[0])
+    assert matrix.dtype == expected[0].dtype
+    assert fiber_ids == expected[1]
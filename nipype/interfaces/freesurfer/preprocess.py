@@ -34,9 +34,15 @@ from .utils import copy2subjdir
 __docformat__ = "restructuredtext"
 iflogger = logging.getLogger("nipype.interface")
 
-# Keeping this to avoid breaking external programs that depend on it, but
-# this should not be used internally
-FSVersion = Info.looseversion().vstring
+
+def __getattr__(name):
+    # Keeping ``FSVersion`` to avoid breaking external programs that depend on
+    # it, but this should not be used internally. It is resolved on first
+    # access to avoid probing FreeSurfer at import time.
+    if name == "FSVersion":
+        globals()[name] = value = Info.looseversion().vstring
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class ParseDICOMDirInputSpec(FSTraitedSpec):
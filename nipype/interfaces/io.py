@@ -17,11 +17,17 @@ import string
 import json
 import os
 import os.path as op
+import posixpath
 import shutil
 import subprocess
 import re
+import bisect
 import copy
 import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import util as mputil
 from os.path import join, dirname
 from warnings import warn
 
@@ -32,6 +38,8 @@ from ..utils.filemanip import (
     ensure_list,
     get_related_files,
     split_filename,
+    hash_infile,
+    md5,
 )
 from ..utils.misc import human_order_sorted, str2bool
 from .base import (
@@ -797,6 +805,90 @@ class DataSink(IOBase):
         return outputs
 
 
+def _regex_prefix(pattern):
+    r"""Return the literal prefix of all the strings ``pattern`` matches.
+
+    >>> _regex_prefix(r'ds001/sub-0[12]/anat/.*\.nii')
+    'ds001/sub-0'
+    >>> _regex_prefix(r'ds001/sub-01?\.nii')
+    'ds001/sub-0'
+    >>> _regex_prefix('ds001/(sub-01|sub-02)')
+    'ds001/'
+    >>> _regex_prefix('ds001/sub-01|ds002')
+    ''
+
+    """
+    depth, escaped, in_class = 0, False, False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char in "()":
+            depth += 1 if char == "(" else -1
+        elif char == "|" and depth == 0:
+            # alternatives need not share a prefix
+            return ""
+
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        char, step = pattern[i], 1
+        if char == "\\":
+            char, step = pattern[i + 1 : i + 2], 2
+            if not char or char.isalnum():
+                break
+        elif char in ".^$*+?{}[]|()":
+            break
+        if pattern[i + step : i + step + 1] in ("*", "?", "{"):
+            # the character may be absent
+            break
+        prefix.append(char)
+        i += step
+    return "".join(prefix)
+
+
+class _S3KeyIndex:
+    """The keys of an S3 listing, sorted for regular expression lookups."""
+
+    def __init__(self, keys):
+        self.entries = {k.key: (k.size, (k.etag or "").strip('"')) for k in keys}
+        self._names = sorted(self.entries)
+
+    def match(self, pattern):
+        """Return the keys matching ``pattern``, in listing order.
+
+        Only the keys starting with the literal prefix of ``pattern`` are
+        tested.
+        """
+        prefix = _regex_prefix(pattern)
+        regexp = re.compile(pattern)
+        names = []
+        for name in self._names[bisect.bisect_left(self._names, prefix) :]:
+            if not name.startswith(prefix):
+                break
+            if regexp.match(name):
+                names.append(name)
+        return names
+
+
+# Indices of S3 listings, shared by all the grabbers of a process
+_s3_indices = {}
+_S3_LISTING_TTL = 60
+
+
+def _s3_unchanged(localpath, size, etag):
+    """Whether ``localpath`` holds the S3 object of ``size`` and ``etag``."""
+    if not op.isfile(localpath) or op.getsize(localpath) != size:
+        return False
+    # The ETag of multipart uploads is not the MD5 of the object
+    return "-" not in etag and hash_infile(localpath) == etag
+
+
 class S3DataGrabberInputSpec(DynamicTraitedSpec, BaseInterfaceInputSpec):
     anon = traits.Bool(
         False,
@@ -832,6 +924,15 @@ class S3DataGrabberInputSpec(DynamicTraitedSpec, BaseInterfaceInputSpec):
         value_trait=traits.List(traits.List),
         desc="Information to plug into template",
     )
+    num_threads = traits.Int(
+        4, usedefault=True, nohash=True, desc="number of files downloaded in parallel"
+    )
+    cache_listings = traits.Bool(
+        False,
+        usedefault=True,
+        nohash=True,
+        desc="Reuse bucket listings made in the last minute by this process",
+    )
 
 
 class S3DataGrabber(LibraryBaseInterface, IOBase):
@@ -849,6 +950,11 @@ class S3DataGrabber(LibraryBaseInterface, IOBase):
     "template" uses regex style formatting, rather than the
     glob-style found in the original DataGrabber.
 
+    Bucket listings can be shared by the grabbers that run in a process
+    (see ``cache_listings``), files are downloaded concurrently (see
+    ``num_threads``), and files already downloaded are only fetched again if
+    they changed on S3.
+
     Examples
     --------
     >>> s3grab = S3DataGrabber(infields=['subj_id'], outfields=["func", "anat"])
@@ -927,8 +1033,6 @@ class S3DataGrabber(LibraryBaseInterface, IOBase):
     def _list_outputs(self):
         # infields are mandatory, however I could not figure out how to set 'mandatory' flag dynamically
         # hence manual check
-        import boto
-
         if self._infields:
             for key in self._infields:
                 value = getattr(self.inputs, key)
@@ -940,10 +1044,9 @@ class S3DataGrabber(LibraryBaseInterface, IOBase):
                     raise ValueError(msg)
 
         outputs = {}
-        # get list of all files in s3 bucket
-        conn = boto.connect_s3(anon=self.inputs.anon)
-        bkt = conn.get_bucket(self.inputs.bucket)
-        bkt_files = [k.key for k in bkt.list(prefix=self.inputs.bucket_path)]
+        # get the index of all files in s3 bucket
+        bkt = self._get_bucket()
+        index = self._get_index(bkt)
 
         # keys are outfields, args are template args for the outfield
         for key, args in list(self.inputs.template_args.items()):
@@ -960,7 +1063,7 @@ class S3DataGrabber(LibraryBaseInterface, IOBase):
             if isdefined(self.inputs.bucket_path):
                 template = os.path.join(self.inputs.bucket_path, template)
             if not args:
-                filelist = [fname for fname in bkt_files if re.match(template, fname)]
+                filelist = index.match(template)
                 if len(filelist) == 0:
                     msg = "Output key: {} Template: {} returned no files".format(
                         key,
@@ -1005,10 +1108,7 @@ class S3DataGrabber(LibraryBaseInterface, IOBase):
                                 f"{e}: Template {template} failed to convert "
                                 f"with args {tuple(argtuple)}"
                             )
-                    outfiles = []
-                    for fname in bkt_files:
-                        if re.match(filledtemplate, fname):
-                            outfiles.append(fname)
+                    outfiles = index.match(filledtemplate)
                     if len(outfiles) == 0:
                         msg = "Output key: {} Template: {} returned no files".format(
                             key,
@@ -1032,24 +1132,67 @@ class S3DataGrabber(LibraryBaseInterface, IOBase):
         # Outputs are currently stored as locations on S3.
         # We must convert to the local location specified
         # and download the files.
-        for key, val in outputs.items():
+        s3paths = []
+        for val in outputs.values():
             # This will basically be either list-like or string-like:
             # if it's an instance of a list, we'll iterate through it.
             # If it isn't, it's string-like (string, unicode), we
             # convert that value directly.
+            s3paths.extend(val if isinstance(val, (list, tuple, set)) else [val])
+        localpaths = self._download(s3paths, bkt, index)
+        for key, val in outputs.items():
             if isinstance(val, (list, tuple, set)):
-                for i, path in enumerate(val):
-                    outputs[key][i] = self.s3tolocal(path, bkt)
+                outputs[key] = [localpaths[path] for path in val]
             else:
-                outputs[key] = self.s3tolocal(val, bkt)
+                outputs[key] = localpaths[val]
 
         return outputs
 
-    # Takes an s3 address and downloads the file to a local
-    # directory, returning the local path.
-    def s3tolocal(self, s3path, bkt):
+    def _get_bucket(self):
         import boto
 
+        conn = boto.connect_s3(anon=self.inputs.anon)
+        return conn.get_bucket(self.inputs.bucket)
+
+    def _get_index(self, bkt):
+        """Index the keys under ``bucket_path``, reusing recent listings."""
+        key = (self.inputs.bucket, self.inputs.bucket_path, self.inputs.anon)
+        now = time.monotonic()
+        stamp, index = _s3_indices.get(key, (None, None))
+        if (
+            not self.inputs.cache_listings
+            or stamp is None
+            or now - stamp >= _S3_LISTING_TTL
+        ):
+            index = _S3KeyIndex(bkt.list(prefix=self.inputs.bucket_path))
+            _s3_indices[key] = (now, index)
+        return index
+
+    def _download(self, s3paths, bkt, index):
+        """Download the files concurrently, returning their local paths."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        s3paths = list(dict.fromkeys(s3paths))  # drop duplicates
+        # boto connections are not thread-safe: other threads open their own
+        local = threading.local()
+        local.bkt = bkt
+
+        def _get(s3path):
+            if not hasattr(local, "bkt"):
+                local.bkt = self._get_bucket()
+            return self.s3tolocal(s3path, local.bkt, index.entries.get(s3path))
+
+        if self.inputs.num_threads > 1 and len(s3paths) > 1:
+            with ThreadPoolExecutor(max_workers=self.inputs.num_threads) as pool:
+                localpaths = list(pool.map(_get, s3paths))
+        else:
+            localpaths = [_get(s3path) for s3path in s3paths]
+        return dict(zip(s3paths, localpaths))
+
+    # Takes an s3 address and downloads the file to a local
+    # directory, returning the local path. The download is skipped
+    # if the local file matches the size and ETag of the listing entry.
+    def s3tolocal(self, s3path, bkt, entry=None):
         # path formatting
         local_directory = str(self.inputs.local_directory)
         bucket_path = str(self.inputs.bucket_path)
@@ -1063,11 +1206,10 @@ class S3DataGrabber(LibraryBaseInterface, IOBase):
 
         localpath = s3path.replace(bucket_path, local_directory)
         localdir = os.path.split(localpath)[0]
-        if not os.path.exists(localdir):
-            os.makedirs(localdir)
-        k = boto.s3.key.Key(bkt)
-        k.key = s3path
-        k.get_contents_to_filename(localpath)
+        os.makedirs(localdir, exist_ok=True)
+        if entry is not None and _s3_unchanged(localpath, *entry):
+            return localpath
+        bkt.new_key(s3path).get_contents_to_filename(localpath)
         return localpath
 
 
@@ -2270,9 +2412,150 @@ def push_provenance():
     pass
 
 
+class SQLSinkService:
+    """Insert the rows of SQL sinks through pooled connections.
+
+    Each process keeps one connection per database. Rows are inserted with
+    ``executemany`` within a transaction, either right away or, for buffered
+    sinks, once ``flush_rows`` rows are pending, when a workflow finishes
+    running, and when the process (e.g., a worker of a plugin) exits.
+    """
+
+    def __init__(self, flush_rows=1000):
+        self.flush_rows = flush_rows
+        self._lock = threading.RLock()
+        self._forget()
+        mputil.register_after_fork(self, SQLSinkService._forget)
+
+    def _forget(self):
+        """Drop the state inherited from the parent process."""
+        self._connect = {}
+        self._connections = {}
+        self._pending = {}
+        mputil.Finalize(self, self.close, exitpriority=10)
+
+    def insert(self, key, connect, statement, rows, buffered=False):
+        """Insert ``rows`` with ``statement`` into the database ``key``.
+
+        ``connect`` opens a new connection to the database when needed.
+        """
+        with self._lock:
+            self._connect[key] = connect
+            self._pending.setdefault(key, []).append((statement, rows))
+            pending = sum(len(rows) for _, rows in self._pending[key])
+            if not buffered or pending >= self.flush_rows:
+                self._flush(key)
+
+    def flush(self):
+        """Insert all the pending rows."""
+        with self._lock:
+            errors = []
+            for key in list(self._pending):
+                try:
+                    self._flush(key)
+                except Exception as e:
+                    iflogger.error("Could not insert rows into %s: %s", key[1], e)
+                    errors.append(e)
+            if errors:
+                raise errors[0]
+
+    def close(self):
+        """Insert all the pending rows and close the connections."""
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                for conn in self._connections.values():
+                    conn.close()
+                self._connections = {}
+
+    def _flush(self, key):
+        batches = self._pending.pop(key, [])
+        if not batches:
+            return
+        conn = self._connection(key)
+        try:
+            self._execute(conn, batches)
+        except getattr(conn, "OperationalError", ()) as e:
+            # The server may have closed the pooled connection (e.g., after
+            # MySQL's wait_timeout): retry once over a new one
+            iflogger.warning("Reconnecting to %s: %s", key[1], e)
+            self._disconnect(key)
+            self._execute(self._connection(key), batches)
+
+    def _connection(self, key):
+        conn = self._connections.get(key)
+        if conn is None:
+            conn = self._connections[key] = self._connect[key]()
+        return conn
+
+    def _disconnect(self, key):
+        try:
+            self._connections.pop(key).close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _execute(conn, batches):
+        cursor = conn.cursor()
+        try:
+            for statement, rows in batches:
+                cursor.executemany(statement, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+sql_sinks = SQLSinkService()
+
+
+def _sink_rows(inputs, names, multiple_rows):
+    """Arrange the values of sink inputs into the rows to insert.
+
+    >>> from types import SimpleNamespace
+    >>> _sink_rows(SimpleNamespace(a=[1, 2], b='s'), ['a', 'b'], True)
+    [(1, 's'), (2, 's')]
+
+    """
+    values = [getattr(inputs, name) for name in names]
+    if not multiple_rows:
+        return [tuple(values)]
+    lengths = {len(value) for value in values if isinstance(value, (list, tuple))}
+    if len(lengths) > 1:
+        raise ValueError("List inputs must have the same length: %s" % names)
+    nrows = lengths.pop() if lengths else 1
+    columns = [
+        value if isinstance(value, (list, tuple)) else [value] * nrows
+        for value in values
+    ]
+    return list(zip(*columns))
+
+
+def _connect_sqlite(database_file):
+    import sqlite3
+
+    # Concurrent writers (e.g., plugin workers) wait for the database lock
+    return sqlite3.connect(database_file, timeout=60, check_same_thread=False)
+
+
 class SQLiteSinkInputSpec(DynamicTraitedSpec, BaseInterfaceInputSpec):
     database_file = File(exists=True, mandatory=True)
     table_name = Str(mandatory=True)
+    multiple_rows = traits.Bool(
+        False,
+        usedefault=True,
+        desc="Insert one row per item of the list inputs (which must have "
+        "the same length), repeating the values of the other inputs",
+    )
+    buffered = traits.Bool(
+        False,
+        usedefault=True,
+        desc="Buffer rows and insert them in batches, when enough rows are "
+        "pending, when the workflow finishes or when the process exits",
+    )
 
 
 class SQLiteSink(LibraryBaseInterface, IOBase):
@@ -2294,6 +2577,17 @@ class SQLiteSink(LibraryBaseInterface, IOBase):
     >>> sql.inputs.some_measurement = 11.4
     >>> sql.run() # doctest: +SKIP
 
+    Many rows (e.g., a measurement per ROI) can be inserted at once.
+
+    >>> sql = SQLiteSink(input_names=['subject_id', 'roi', 'some_measurement'])
+    >>> sql.inputs.database_file = 'my_database.db'
+    >>> sql.inputs.table_name = 'experiment_results'
+    >>> sql.inputs.multiple_rows = True
+    >>> sql.inputs.subject_id = 's1'
+    >>> sql.inputs.roi = [1, 2, 3]
+    >>> sql.inputs.some_measurement = [11.4, 9.1, 10.2]
+    >>> sql.run() # doctest: +SKIP
+
     """
 
     input_spec = SQLiteSinkInputSpec
@@ -2307,20 +2601,18 @@ class SQLiteSink(LibraryBaseInterface, IOBase):
 
     def _list_outputs(self):
         """Execute this module."""
-        import sqlite3
-
-        conn = sqlite3.connect(self.inputs.database_file, check_same_thread=False)
-        c = conn.cursor()
-        c.execute(
+        database_file = op.abspath(self.inputs.database_file)
+        sql_sinks.insert(
+            ("sqlite", database_file),
+            lambda: _connect_sqlite(database_file),
             "INSERT OR REPLACE INTO %s (" % self.inputs.table_name
             + ",".join(self._input_names)
             + ") VALUES ("
             + ",".join(["?"] * len(self._input_names))
             + ")",
-            [getattr(self.inputs, name) for name in self._input_names],
+            _sink_rows(self.inputs, self._input_names, self.inputs.multiple_rows),
+            buffered=self.inputs.buffered,
         )
-        conn.commit()
-        c.close()
         return None
 
 
@@ -2339,6 +2631,18 @@ class MySQLSinkInputSpec(DynamicTraitedSpec, BaseInterfaceInputSpec):
     table_name = Str(mandatory=True)
     username = Str()
     password = Str()
+    multiple_rows = traits.Bool(
+        False,
+        usedefault=True,
+        desc="Insert one row per item of the list inputs (which must have "
+        "the same length), repeating the values of the other inputs",
+    )
+    buffered = traits.Bool(
+        False,
+        usedefault=True,
+        desc="Buffer rows and insert them in batches, when enough rows are "
+        "pending, when the workflow finishes or when the process exits",
+    )
 
 
 class MySQLSink(IOBase):
@@ -2372,30 +2676,111 @@ class MySQLSink(IOBase):
         import MySQLdb
 
         if isdefined(self.inputs.config):
-            conn = MySQLdb.connect(
+            kwargs = dict(
                 db=self.inputs.database_name, read_default_file=self.inputs.config
             )
         else:
-            conn = MySQLdb.connect(
+            kwargs = dict(
                 host=self.inputs.host,
                 user=self.inputs.username,
                 passwd=self.inputs.password,
                 db=self.inputs.database_name,
             )
-        c = conn.cursor()
-        c.execute(
+        sql_sinks.insert(
+            ("mysql", "%s@%s" % (kwargs["db"], kwargs.get("host")), repr(kwargs)),
+            lambda: MySQLdb.connect(**kwargs),
             "REPLACE INTO %s (" % self.inputs.table_name
             + ",".join(self._input_names)
             + ") VALUES ("
             + ",".join(["%s"] * len(self._input_names))
             + ")",
-            [getattr(self.inputs, name) for name in self._input_names],
+            _sink_rows(self.inputs, self._input_names, self.inputs.multiple_rows),
+            buffered=self.inputs.buffered,
         )
-        conn.commit()
-        c.close()
         return None
 
 
+class SSHConnectionPool:
+    """Share SSH connections to the same server within a process.
+
+    Each process keeps one SSH connection per server and user, over which
+    SFTP sessions are opened (one per concurrent transfer) and reused, so
+    that the handshake happens only once. Remote directory listings are
+    cached for ``listing_ttl`` seconds.
+    """
+
+    def __init__(self, listing_ttl=60):
+        self.listing_ttl = listing_ttl
+        self._lock = threading.RLock()
+        self._forget()
+        mputil.register_after_fork(self, SSHConnectionPool._forget)
+
+    def _forget(self):
+        """Drop the connections inherited from the parent process."""
+        self._clients = {}
+        self._sessions = {}
+        self._listings = {}
+        mputil.Finalize(self, self.close, exitpriority=10)
+
+    @contextmanager
+    def sftp(self, key, connect):
+        """Borrow an SFTP session to the server ``key``.
+
+        ``connect`` opens a new SSH connection to the server when needed.
+        """
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or not _ssh_active(client):
+                if client is not None:
+                    self._close(key)
+                client = self._clients[key] = connect()
+            idle = self._sessions.setdefault(key, [])
+            session = idle.pop() if idle else client.open_sftp()
+        try:
+            yield session
+        except Exception:
+            session.close()
+            raise
+        with self._lock:
+            if self._clients.get(key) is client:
+                self._sessions[key].append(session)
+            else:
+                session.close()
+
+    def listdir(self, key, connect, path, cached=True):
+        """List the remote directory ``path`` on the server ``key``."""
+        now = time.monotonic()
+        with self._lock:
+            stamp, listing = self._listings.get((key, path), (None, None))
+        if cached and stamp is not None and now - stamp < self.listing_ttl:
+            return listing
+        with self.sftp(key, connect) as session:
+            listing = session.listdir(path)
+        with self._lock:
+            self._listings[(key, path)] = (now, listing)
+        return listing
+
+    def close(self):
+        """Close all the connections."""
+        with self._lock:
+            for key in list(self._clients):
+                self._close(key)
+            self._listings = {}
+
+    def _close(self, key):
+        for session in self._sessions.pop(key, []):
+            session.close()
+        self._clients.pop(key).close()
+
+
+def _ssh_active(client):
+    transport = client.get_transport()
+    return transport is not None and transport.is_active()
+
+
+ssh_connections = SSHConnectionPool()
+
+
 class SSHDataGrabberInputSpec(DataGrabberInputSpec):
     hostname = Str(mandatory=True, desc="Server hostname.")
     username = Str(desc="Server username.")
@@ -2416,6 +2801,16 @@ class SSHDataGrabberInputSpec(DataGrabberInputSpec):
     ssh_log_to_file = Str(
         "", usedefault=True, desc="If set SSH commands will be logged to the given file"
     )
+    num_threads = traits.Int(
+        4, usedefault=True, nohash=True, desc="number of files downloaded in parallel"
+    )
+    cache_listings = traits.Bool(
+        False,
+        usedefault=True,
+        nohash=True,
+        desc="Reuse remote directory listings made in the last minute by "
+        "this process",
+    )
 
 
 class SSHDataGrabber(LibraryBaseInterface, DataGrabber):
@@ -2425,6 +2820,8 @@ class SSHDataGrabber(LibraryBaseInterface, DataGrabber):
     not need user and password so an SSH agent must be active in
     where this module is being run.
 
+    Connections are shared by all the grabbers that run in a process, and
+    files are downloaded concurrently (see ``num_threads``).
 
     .. attention::
 
@@ -2515,17 +2912,21 @@ class SSHDataGrabber(LibraryBaseInterface, DataGrabber):
         ):
             self.inputs.template += "$"
 
-    def _get_files_over_ssh(self, template):
-        """Get the files matching template over an SSH connection."""
-        # Connect over SSH
-        client = self._get_ssh_client()
-        sftp = client.open_sftp()
-        sftp.chdir(self.inputs.base_directory)
+    def _get_files_over_ssh(self, template, downloads):
+        """Get the files matching template over an SSH connection.
 
+        The files to download are appended to ``downloads`` as pairs of
+        remote and local paths.
+        """
         # Get all files in the dir, and filter for desired files
         template_dir = os.path.dirname(template)
         template_base = os.path.basename(template)
-        every_file_in_dir = sftp.listdir(template_dir)
+        every_file_in_dir = ssh_connections.listdir(
+            self._ssh_key(),
+            self._get_ssh_client,
+            self._remote_path(template_dir),
+            cached=self.inputs.cache_listings,
+        )
         if self.inputs.template_expression == "fnmatch":
             outfiles = fnmatch.filter(every_file_in_dir, template_base)
         elif self.inputs.template_expression == "regexp":
@@ -2550,7 +2951,7 @@ class SSHDataGrabber(LibraryBaseInterface, DataGrabber):
             if self.inputs.sort_filelist:
                 outfiles = human_order_sorted(outfiles)
 
-            # actually download the files, if desired
+            # schedule the download of the files, if desired
             if self.inputs.download_files:
                 files_to_download = copy.copy(outfiles)  # make sure new list!
 
@@ -2566,21 +2967,62 @@ class SSHDataGrabber(LibraryBaseInterface, DataGrabber):
                     ]
                     files_to_download.extend(existing_related_not_downloading)
 
-                for f in files_to_download:
-                    try:
-                        sftp.get(os.path.join(template_dir, f), f)
-                    except OSError:
-                        iflogger.info("remote file %s not found" % f)
+                downloads.extend(
+                    (self._remote_path(os.path.join(template_dir, f)), f)
+                    for f in files_to_download
+                )
 
             # return value
             outfiles = simplify_list(outfiles)
 
         return outfiles
 
-    def _list_outputs(self):
-        import paramiko
+    def _download(self, downloads):
+        """Download the files concurrently over pooled SFTP sessions."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        key = self._ssh_key()
 
+        def _get(remote, local):
+            with ssh_connections.sftp(key, self._get_ssh_client) as sftp:
+                try:
+                    sftp.get(remote, local)
+                except OSError:
+                    iflogger.info("remote file %s not found" % remote)
+
+        # Files are saved under their base name, so each local file is only
+        # fetched once: from the last remote file saved there, as when
+        # downloading one file after the other
+        targets = {}
+        for remote, local in downloads:
+            if targets.get(local, remote) != remote:
+                iflogger.warning(
+                    "%s and %s are both downloaded to %s, keeping the latter",
+                    targets[local],
+                    remote,
+                    local,
+                )
+            targets[local] = remote
+        downloads = [(remote, local) for local, remote in targets.items()]
+        if self.inputs.num_threads > 1 and len(downloads) > 1:
+            with ThreadPoolExecutor(max_workers=self.inputs.num_threads) as pool:
+                for future in [pool.submit(_get, *pair) for pair in downloads]:
+                    future.result()
+        else:
+            for pair in downloads:
+                _get(*pair)
+
+    def _ssh_key(self):
+        username = self.inputs.username if isdefined(self.inputs.username) else None
+        return (self.inputs.hostname, username)
+
+    def _remote_path(self, path):
+        return posixpath.join(self.inputs.base_directory, path)
+
+    def _list_outputs(self):
         if len(self.inputs.ssh_log_to_file) > 0:
+            import paramiko
+
             paramiko.util.log_to_file(self.inputs.ssh_log_to_file)
         # infields are mandatory, however I could not figure out how to set 'mandatory' flag dynamically
         # hence manual check
@@ -2595,6 +3037,7 @@ class SSHDataGrabber(LibraryBaseInterface, DataGrabber):
                     raise ValueError(msg)
 
         outputs = {}
+        downloads = []
         for key, args in list(self.inputs.template_args.items()):
             outputs[key] = []
             template = self.inputs.template
@@ -2606,7 +3049,7 @@ class SSHDataGrabber(LibraryBaseInterface, DataGrabber):
                 template = self.inputs.field_template[key]
 
             if not args:
-                outputs[key] = self._get_files_over_ssh(template)
+                outputs[key] = self._get_files_over_ssh(template, downloads)
 
             for arglist in args:
                 maxlen = 1
@@ -2639,7 +3082,9 @@ class SSHDataGrabber(LibraryBaseInterface, DataGrabber):
                                 f"with args {tuple(argtuple)}"
                             )
 
-                    outputs[key].append(self._get_files_over_ssh(filledtemplate))
+                    outputs[key].append(
+                        self._get_files_over_ssh(filledtemplate, downloads)
+                    )
 
             # disclude where there was any invalid matches
             if None in outputs[key]:
@@ -2653,6 +3098,8 @@ class SSHDataGrabber(LibraryBaseInterface, DataGrabber):
             elif len(outputs[key]) == 1:
                 outputs[key] = outputs[key][0]
 
+        self._download(downloads)
+
         for k, v in list(outputs.items()):
             outputs[k] = os.path.join(os.getcwd(), v)
 
@@ -2838,6 +3285,84 @@ class JSONFileSink(IOBase):
         return outputs
 
 
+# BIDS layouts indexed by this process, by dataset and derivatives
+_bids_layouts = {}
+
+
+def _bids_signature(*roots):
+    """Summarize the state of directory trees without reading any file.
+
+    The modification times and sizes of all directories and files reveal
+    files being added, removed, renamed or edited in place (e.g., sidecar
+    JSON files), and only require listing the dataset.
+
+    >>> _bids_signature(".") == _bids_signature(".")
+    True
+
+    """
+    hashobj = md5()
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for path in [dirpath] + [op.join(dirpath, f) for f in sorted(filenames)]:
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    state = None
+                else:
+                    state = (info.st_mtime_ns, info.st_size)
+                hashobj.update(("%s:%s\n" % (path, state)).encode())
+    return hashobj.hexdigest()
+
+
+def _cached_bids_layout(base_dir, derivatives, extra_derivatives=None, cache_dir=None):
+    """Return a layout of ``base_dir``, indexing the dataset only if it changed.
+
+    Layouts are reused within the process and, when ``cache_dir`` is given,
+    saved there for other processes (e.g., workers of a plugin) to load.
+    """
+    from bids import BIDSLayout
+    from filelock import SoftFileLock
+
+    base_dir = op.abspath(base_dir)
+    extra_derivatives = [op.abspath(path) for path in extra_derivatives or []]
+    key = (base_dir, bool(derivatives), tuple(extra_derivatives))
+    signature = _bids_signature(base_dir, *extra_derivatives)
+    cached = _bids_layouts.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    layout = None
+    if cache_dir is None:
+        layout = BIDSLayout(base_dir, derivatives=derivatives)
+    else:
+        prefix = md5(("%s:%s" % key[:2]).encode()).hexdigest()
+        index = op.join(cache_dir, "%s-%s" % (prefix, _bids_signature(base_dir)))
+        os.makedirs(cache_dir, exist_ok=True)
+        with SoftFileLock("%s.lock" % index):
+            if op.isdir(index):
+                try:
+                    layout = BIDSLayout.load(index)
+                except Exception as e:
+                    iflogger.warning("Could not load BIDS layout %s: %s", index, e)
+                    shutil.rmtree(index, ignore_errors=True)
+            if layout is None:
+                iflogger.info("Indexing BIDS dataset %s", base_dir)
+                layout = BIDSLayout(base_dir, derivatives=derivatives)
+                tmpdir = "%s.%d.tmp" % (index, os.getpid())
+                layout.save(tmpdir)
+                os.replace(tmpdir, index)
+                # Indices of previous states of the dataset are stale
+                for stale in glob.glob(op.join(cache_dir, "%s-*" % prefix)):
+                    if stale != index and not stale.endswith((".lock", ".tmp")):
+                        shutil.rmtree(stale, ignore_errors=True)
+
+    if extra_derivatives:
+        layout.add_derivatives(extra_derivatives)
+    _bids_layouts[key] = (signature, layout)
+    return layout
+
+
 class BIDSDataGrabberInputSpec(DynamicTraitedSpec):
     base_dir = Directory(exists=True, desc="Path to BIDS Directory.", mandatory=True)
     output_query = traits.Dict(
@@ -2857,6 +3382,16 @@ class BIDSDataGrabberInputSpec(DynamicTraitedSpec):
     extra_derivatives = traits.List(
         Directory(exists=True), desc="Additional derivative directories to index"
     )
+    cache_layout = traits.Bool(
+        False,
+        usedefault=True,
+        desc="Index the dataset once, and reuse the index in other nodes and "
+        "processes for as long as the dataset is not modified",
+    )
+    layout_cache_dir = Directory(
+        desc="Directory where indices are shared across processes (default: "
+        "bids_layouts within the nipype configuration directory)"
+    )
 
 
 class BIDSDataGrabber(LibraryBaseInterface, IOBase):
@@ -2945,16 +3480,31 @@ class BIDSDataGrabber(LibraryBaseInterface, IOBase):
     def _list_outputs(self):
         from bids import BIDSLayout
 
+        extra_derivatives = None
+        if isdefined(self.inputs.extra_derivatives):
+            extra_derivatives = self.inputs.extra_derivatives
+
         # if load_layout is given load layout which is on some datasets much faster
         if isdefined(self.inputs.load_layout):
             layout = BIDSLayout.load(self.inputs.load_layout)
+        elif self.inputs.cache_layout:
+            cache_dir = self.inputs.layout_cache_dir
+            if not isdefined(cache_dir):
+                cache_dir = op.join(op.dirname(config.data_file), "bids_layouts")
+            layout = _cached_bids_layout(
+                self.inputs.base_dir,
+                self.inputs.index_derivatives,
+                extra_derivatives,
+                cache_dir,
+            )
+            extra_derivatives = None  # Already indexed
         else:
             layout = BIDSLayout(
                 self.inputs.base_dir, derivatives=self.inputs.index_derivatives
             )
 
-        if isdefined(self.inputs.extra_derivatives):
-            layout.add_derivatives(self.inputs.extra_derivatives)
+        if extra_derivatives:
+            layout.add_derivatives(extra_derivatives)
 
         # If infield is not given nm input value, silently ignore
         filters = {}
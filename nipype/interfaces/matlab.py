@@ -2,9 +2,16 @@
 # vi: set ft=python sts=4 ts=4 sw=4 et:
 """Interfaces to run MATLAB scripts."""
 
+import atexit
 import os
+import queue
+import shlex
+import subprocess as sp
+import threading
+from uuid import uuid4
 
-from .. import config
+from .. import config, logging
+from ..utils.filemanip import canonicalize_env, which
 from .base import (
     CommandLineInputSpec,
     InputMultiPath,
@@ -15,6 +22,8 @@ from .base import (
     Directory,
 )
 
+iflogger = logging.getLogger("nipype.interface")
+
 
 def get_matlab_command():
     """Determine whether Matlab is installed and can be executed."""
@@ -24,7 +33,167 @@ def get_matlab_command():
         return which(os.getenv("MATLABCMD", "matlab"))
 
 
-no_matlab = get_matlab_command() is None
+def __getattr__(name):
+    # ``no_matlab`` is resolved on first access, so that importing this module
+    # (e.g., through any SPM interface) does not search the PATH for MATLAB.
+    if name == "no_matlab":
+        globals()[name] = value = get_matlab_command() is None
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _matlab_str(value):
+    """Quote ``value`` as a MATLAB character array."""
+    return "'%s'" % value.replace("'", "''")
+
+
+def _enqueue_lines(stream, lines):
+    for line in iter(stream.readline, ""):
+        lines.put(line)
+    stream.close()
+    lines.put(None)
+
+
+class MatlabSession:
+    """A long-lived MATLAB (or Octave, MCR) interpreter.
+
+    The interpreter is started with ``command`` and must evaluate the lines it
+    reads from its standard input, as ``matlab -nodesktop -nosplash`` and
+    ``octave --no-gui`` do. Every call to :meth:`run` clears the workspace,
+    changes to the working directory of the job and evaluates its code.
+    Completion is signalled by a token written to both output streams.
+    """
+
+    def __init__(self, command, env=None):
+        self.command = command
+        self.env = env
+        self._token = "__nipype_session_%s__" % uuid4().hex
+        self._proc = sp.Popen(
+            command,
+            shell=True,
+            env=env,
+            stdin=sp.PIPE,
+            stdout=sp.PIPE,
+            stderr=sp.PIPE,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+        self._closed = False
+        self._lines = {}
+        for name in ("stdout", "stderr"):
+            self._lines[name] = queue.Queue()
+            threading.Thread(
+                target=_enqueue_lines,
+                args=(getattr(self._proc, name), self._lines[name]),
+                daemon=True,
+            ).start()
+
+    @property
+    def alive(self):
+        return not self._closed and self._proc.poll() is None
+
+    def _collect(self, name):
+        lines = []
+        while True:
+            line = self._lines[name].get()
+            if line is None:
+                # The interpreter exited
+                self._closed = True
+                break
+            if line.rstrip("\r\n") == self._token:
+                break
+            lines.append(line.rstrip("\r\n"))
+        # The token is preceded by a newline in case the output did not end
+        # with one
+        if lines and not lines[-1]:
+            lines.pop()
+        return "\n".join(lines)
+
+    def run(self, code, cwd):
+        """Evaluate ``code`` within ``cwd``.
+
+        Returns the exit code (0 unless the interpreter died), and the
+        standard output and error produced by the job.
+        """
+        flush = "fprintf(1, '\\n%s\\n'); fprintf(2, '\\n%s\\n');\n" % (
+            (self._token,) * 2
+        )
+        try:
+            self._proc.stdin.write("clear; cd(%s);\n" % _matlab_str(cwd))
+            self._proc.stdin.write(code + "\n")
+            self._proc.stdin.write(flush)
+            self._proc.stdin.flush()
+        except OSError:
+            # The interpreter exited; gather whatever it wrote
+            pass
+        stdout = self._collect("stdout")
+        stderr = self._collect("stderr")
+        returncode = self._proc.wait() if self._closed else 0
+        return returncode, stdout, stderr
+
+    def close(self, timeout=10):
+        if self.alive:
+            try:
+                self._proc.stdin.write("exit\n")
+                self._proc.stdin.close()
+                self._proc.wait(timeout)
+            except (OSError, sp.TimeoutExpired):
+                self._proc.kill()
+        self._proc.wait()
+
+
+class MatlabSessionPool:
+    """Idle :class:`MatlabSession` objects, indexed by their command and
+    environment.
+
+    Sessions are only shared within a process, and the execution plugins run
+    one node at a time per worker process (or thread), so at most ``n_procs``
+    sessions are started for each MATLAB command line and environment.
+    """
+
+    def __init__(self):
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, command, env=None):
+        with self._lock:
+            sessions = self._idle.get(self._key(command, env), [])
+            while sessions:
+                session = sessions.pop()
+                if session.alive:
+                    return session
+        iflogger.debug("Starting MATLAB session: %s", command)
+        return MatlabSession(command, env=env)
+
+    def release(self, session):
+        if session.alive:
+            with self._lock:
+                key = self._key(session.command, session.env)
+                self._idle.setdefault(key, []).append(session)
+
+    def close(self):
+        with self._lock:
+            sessions = [s for idle in self._idle.values() for s in idle]
+            self._idle = {}
+        for session in sessions:
+            session.close()
+
+    @staticmethod
+    def _key(command, env):
+        # Sessions keep the environment they were started with
+        return command, None if env is None else frozenset(env.items())
+
+    def _forget(self):
+        # Forked processes must not write into the sessions of their parent
+        self._idle = {}
+        self._lock = threading.Lock()
+
+
+session_pool = MatlabSessionPool()
+atexit.register(session_pool.close)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=session_pool._forget)
 
 
 class MatlabInputSpec(CommandLineInputSpec):
@@ -85,6 +254,10 @@ class MatlabCommand(CommandLine):
     >>> mlab = matlab.MatlabCommand(mfile=False)  # don't write script file
     >>> mlab.inputs.script = "which('who')"
     >>> out = mlab.run()  # doctest: +SKIP
+
+    When the ``matlab_sessions`` option of the ``execution`` section is
+    enabled, scripts are evaluated by persistent interpreters taken from
+    :data:`session_pool` instead of starting MATLAB for every run.
     """
 
     _cmd = "matlab"
@@ -153,17 +326,55 @@ class MatlabCommand(CommandLine):
 
     def _run_interface(self, runtime):
         self.terminal_output = "allatonce"
-        runtime = super()._run_interface(runtime)
-        try:
-            # Matlab can leave the terminal in a barbbled state
-            os.system("stty sane")
-        except:
-            # We might be on a system where stty doesn't exist
-            pass
+        if config.getboolean("execution", "matlab_sessions"):
+            runtime = self._run_session(runtime)
+        else:
+            runtime = super()._run_interface(runtime)
+            try:
+                # Matlab can leave the terminal in a barbbled state
+                os.system("stty sane")
+            except:
+                # We might be on a system where stty doesn't exist
+                pass
         if "MATLAB code threw an exception" in runtime.stderr:
             self.raise_exception(runtime)
         return runtime
 
+    def _run_session(self, runtime):
+        """Evaluate the script in an interpreter from the session pool."""
+        self._check_mandatory_inputs()
+        command = " ".join(
+            [self._cmd_prefix + self.cmd] + self._parse_inputs(skip=["script"])
+        )
+        executable_name = shlex.split(command)[0]
+        runtime.environ.update(self._get_environ())
+        runtime.command_path = which(executable_name, env=runtime.environ)
+        if runtime.command_path is None:
+            raise OSError(
+                'No command "%s" found on host %s. Please check that the '
+                "corresponding package is installed."
+                % (executable_name, runtime.hostname)
+            )
+
+        code = self._gen_matlab_command("%s", self.inputs.script)
+        if self.inputs.mfile or self.inputs.uses_mcr:
+            code = "run(%s);" % _matlab_str(
+                os.path.join(os.getcwd(), self.inputs.script_file)
+            )
+        runtime.cmdline = command
+        runtime.success_codes = (0,)
+        session = session_pool.acquire(command, env=canonicalize_env(runtime.environ))
+        try:
+            runtime.returncode, runtime.stdout, runtime.stderr = session.run(
+                code, os.getcwd()
+            )
+        finally:
+            session_pool.release(session)
+        runtime.merged = "\n".join(
+            out for out in (runtime.stdout, runtime.stderr) if out
+        )
+        return runtime
+
     def _format_arg(self, name, trait_spec, value):
         if name in ["script"]:
             argstr = trait_spec.argstr
@@ -25,6 +25,7 @@ import numpy as np
 # Local imports
 from ... import logging
 from ...utils import spm_docs as sd
+from ...utils.tool_cache import cached_probe
 from ..base import (
     BaseInterface,
     traits,
@@ -201,6 +202,27 @@ class Info(PackageInfo):
         ):
             return {"name": klass._name, "path": klass._path, "release": klass._version}
         logger.debug("matlab command or path has changed. recomputing version.")
+        out_dict = cached_probe(
+            "spm:%s|%s|%s" % (matlab_cmd, paths, bool(use_mcr)),
+            matlab_cmd,
+            lambda: klass._probe_spm(matlab_cmd, paths, use_mcr),
+        )
+        klass._command = matlab_cmd
+        klass._paths = paths
+        if out_dict is None:
+            klass._version = None
+            klass._path = None
+            klass._name = None
+            return None
+
+        klass._version = out_dict["release"]
+        klass._path = out_dict["path"]
+        klass._name = out_dict["name"]
+        return out_dict
+
+    @staticmethod
+    def _probe_spm(matlab_cmd, paths, use_mcr):
+        """Run MATLAB to locate SPM, returning ``None`` if not found"""
         mlab = MatlabCommand(matlab_cmd=matlab_cmd, resource_monitor=False)
         mlab.inputs.mfile = False
         if paths:
@@ -226,11 +248,6 @@ exit;
             # if no Matlab at all -- exception could be raised
             # No Matlab -- no spm
             logger.debug("%s", e)
-            klass._version = None
-            klass._path = None
-            klass._name = None
-            klass._command = matlab_cmd
-            klass._paths = paths
             return None
 
         out = sd._strip_header(out.runtime.stdout)
@@ -238,12 +255,6 @@ exit;
         for part in out.split("|"):
             key, val = part.split(":")
             out_dict[key] = val
-
-        klass._version = out_dict["release"]
-        klass._path = out_dict["path"]
-        klass._name = out_dict["name"]
-        klass._command = matlab_cmd
-        klass._paths = paths
         return out_dict
 
 
@@ -548,11 +559,16 @@ class SPMCommand(BaseInterface):
         [name, version] = spm('ver');
         fprintf('SPM version: %s Release: %s\\n',name, version);
         fprintf('SPM path: %s\\n', which('spm'));
-        spm('Defaults','fMRI');
-
-        if strcmp(name, 'SPM8') || strcmp(name(1:5), 'SPM12'),
-           spm_jobman('initcfg');
-           spm_get_defaults('cmdline', 1);
+        %% Persistent MATLAB sessions only initialise SPM once
+        global nipype_spm_initialised;
+        if isempty(nipype_spm_initialised),
+            spm('Defaults','fMRI');
+
+            if strcmp(name, 'SPM8') || strcmp(name(1:5), 'SPM12'),
+               spm_jobman('initcfg');
+               spm_get_defaults('cmdline', 1);
+            end
+            nipype_spm_initialised = true;
         end\n
         """
         if self.mlab.inputs.mfile:
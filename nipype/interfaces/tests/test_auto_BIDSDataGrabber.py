@@ -7,11 +7,15 @@ def test_BIDSDataGrabber_inputs():
         base_dir=dict(
             mandatory=True,
         ),
+        cache_layout=dict(
+            usedefault=True,
+        ),
         extra_derivatives=dict(),
         index_derivatives=dict(
             mandatory=True,
             usedefault=True,
         ),
+        layout_cache_dir=dict(),
         load_layout=dict(
             mandatory=False,
         ),
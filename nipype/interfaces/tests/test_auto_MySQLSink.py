@@ -4,6 +4,9 @@ from ..io import MySQLSink
 
 def test_MySQLSink_inputs():
     input_map = dict(
+        buffered=dict(
+            usedefault=True,
+        ),
         config=dict(
             extensions=None,
             mandatory=True,
@@ -18,6 +21,9 @@ def test_MySQLSink_inputs():
             usedefault=True,
             xor=["config"],
         ),
+        multiple_rows=dict(
+            usedefault=True,
+        ),
         password=dict(),
         table_name=dict(
             mandatory=True,
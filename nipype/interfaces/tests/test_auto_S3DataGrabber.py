@@ -13,7 +13,15 @@ def test_S3DataGrabber_inputs():
         bucket_path=dict(
             usedefault=True,
         ),
+        cache_listings=dict(
+            nohash=True,
+            usedefault=True,
+        ),
         local_directory=dict(),
+        num_threads=dict(
+            nohash=True,
+            usedefault=True,
+        ),
         raise_on_empty=dict(
             usedefault=True,
         ),
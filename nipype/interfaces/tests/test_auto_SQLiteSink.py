@@ -4,10 +4,16 @@ from ..io import SQLiteSink
 
 def test_SQLiteSink_inputs():
     input_map = dict(
+        buffered=dict(
+            usedefault=True,
+        ),
         database_file=dict(
             extensions=None,
             mandatory=True,
         ),
+        multiple_rows=dict(
+            usedefault=True,
+        ),
         table_name=dict(
             mandatory=True,
         ),
@@ -7,6 +7,10 @@ def test_SSHDataGrabber_inputs():
         base_directory=dict(
             mandatory=True,
         ),
+        cache_listings=dict(
+            nohash=True,
+            usedefault=True,
+        ),
         download_files=dict(
             usedefault=True,
         ),
@@ -16,6 +20,10 @@ def test_SSHDataGrabber_inputs():
         hostname=dict(
             mandatory=True,
         ),
+        num_threads=dict(
+            nohash=True,
+            usedefault=True,
+        ),
         password=dict(),
         raise_on_empty=dict(
             usedefault=True,
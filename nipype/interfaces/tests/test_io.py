@@ -4,7 +4,9 @@ import os
 import copy
 import simplejson
 import glob
+import re
 import os.path as op
+import shutil
 from subprocess import Popen
 import hashlib
 from collections import namedtuple
@@ -12,6 +14,7 @@ from collections import namedtuple
 import pytest
 import nipype
 import nipype.interfaces.io as nio
+import nipype.pipeline.engine as pe
 from nipype.interfaces.base.traits_extension import isdefined
 from nipype.interfaces.base import Undefined, TraitError
 from nipype.utils.filemanip import dist_is_editable
@@ -95,6 +98,98 @@ def test_s3datagrabber():
     assert dg.inputs.template_args == {"outfiles": []}
 
 
+class _LocalS3Key:
+    """boto key stand-in for a file of a local directory."""
+
+    def __init__(self, bucket, key):
+        self.bucket = bucket
+        self.key = key
+        path = os.path.join(bucket.root, key)
+        if os.path.exists(path):
+            self.size = os.path.getsize(path)
+            with open(path, "rb") as fobj:
+                self.etag = '"%s"' % hashlib.md5(fobj.read()).hexdigest()
+
+    def get_contents_to_filename(self, filename):
+        self.bucket.downloads.append(self.key)
+        shutil.copyfile(os.path.join(self.bucket.root, self.key), filename)
+
+
+class _LocalS3Bucket:
+    """boto bucket stand-in serving the files of a local directory."""
+
+    def __init__(self, root):
+        self.root = root
+        self.lists = 0
+        self.downloads = []
+
+    def list(self, prefix=""):
+        self.lists += 1
+        for dirpath, _, filenames in os.walk(self.root):
+            for fname in filenames:
+                key = os.path.relpath(os.path.join(dirpath, fname), self.root)
+                if key.startswith(prefix):
+                    yield _LocalS3Key(self, key)
+
+    def new_key(self, key):
+        return _LocalS3Key(self, key)
+
+
+def test_s3datagrabber_index(tmp_path, monkeypatch):
+    """Listings are indexed and shared, and unchanged files are not fetched."""
+    root = tmp_path / "bucket"
+    for sid in ("sub-01", "sub-02", "sub-10"):
+        (root / "ds" / sid / "anat").mkdir(parents=True)
+        (root / "ds" / sid / "anat" / ("%s_T1w.nii" % sid)).write_text(sid)
+    local_dir = tmp_path / "local"
+    local_dir.mkdir()
+
+    bucket = _LocalS3Bucket(str(root))
+    monkeypatch.setattr(nio.S3DataGrabber, "_get_bucket", lambda self: bucket)
+    monkeypatch.setattr(nio, "_s3_indices", {})
+
+    def _grab(subj_id, cache_listings=True):
+        dg = nio.S3DataGrabber(infields=["subj_id"], outfields=["anat"])
+        dg.inputs.cache_listings = cache_listings
+        dg.inputs.bucket = "bucket"
+        dg.inputs.bucket_path = "ds/"
+        dg.inputs.local_directory = str(local_dir)
+        dg.inputs.sort_filelist = True
+        dg.inputs.template = "%s/anat/.*_T1w.nii"
+        dg.inputs.subj_id = subj_id
+        return dg._list_outputs()["anat"]
+
+    assert _grab(["sub-01", "sub-02"]) == [
+        str(local_dir / sid / "anat" / ("%s_T1w.nii" % sid))
+        for sid in ("sub-01", "sub-02")
+    ]
+    assert _grab("sub-0[12]") == [
+        str(local_dir / sid / "anat" / ("%s_T1w.nii" % sid))
+        for sid in ("sub-01", "sub-02")
+    ]
+    assert bucket.lists == 1
+    assert sorted(bucket.downloads) == [
+        "ds/sub-01/anat/sub-01_T1w.nii",
+        "ds/sub-02/anat/sub-02_T1w.nii",
+    ]
+
+    # listings are only reused on request
+    _grab("sub-01", cache_listings=False)
+    assert bucket.lists == 2
+
+    # changed files are downloaded again
+    (local_dir / "sub-01" / "anat" / "sub-01_T1w.nii").write_text("old")
+    _grab("sub-01")
+    assert (local_dir / "sub-01" / "anat" / "sub-01_T1w.nii").read_text() == "sub-01"
+    assert len(bucket.downloads) == 3
+
+    # the index finds what scanning the listing does
+    index = nio._s3_indices[("bucket", "ds/", False)][1]
+    names = sorted(index.entries)
+    for pattern in ("ds/sub-0.*", "ds/sub-1?0", r"ds/sub-\d+/anat", "ds/x|ds/sub-10"):
+        assert index.match(pattern) == [n for n in names if re.match(pattern, n)]
+
+
 templates1 = {
     "model": "interfaces/{package}/model.py",
     "preprocess": "interfaces/{package}/pre*.py",
@@ -656,6 +751,228 @@ def test_bids_infields_outfields(tmpdir):
         assert outfield in bg._outputs().traits()
 
 
+def _make_database(database_file):
+    import sqlite3
+
+    conn = sqlite3.connect(database_file)
+    conn.execute("CREATE TABLE results (subject_id TEXT, roi INTEGER, value REAL)")
+    conn.commit()
+    conn.close()
+
+
+def _read_database(database_file):
+    import sqlite3
+
+    conn = sqlite3.connect(database_file)
+    rows = conn.execute("SELECT * FROM results ORDER BY roi").fetchall()
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.close()
+    return rows, journal_mode
+
+
+def test_SQLiteSink(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _make_database("results.db")
+
+    def _sink(**inputs):
+        sink = nio.SQLiteSink(
+            input_names=["subject_id", "roi", "value"],
+            database_file="results.db",
+            table_name="results",
+        )
+        sink.inputs.trait_set(**inputs)
+        return sink
+
+    _sink(subject_id="s1", roi=0, value=0.5).run()
+    _sink(subject_id="s1", roi=[1, 2], value=[1.5, 2.5], multiple_rows=True).run()
+    assert _read_database("results.db") == (
+        [("s1", 0, 0.5), ("s1", 1, 1.5), ("s1", 2, 2.5)],
+        "delete",
+    )
+    with pytest.raises(ValueError):
+        _sink(subject_id="s1", roi=[3, 4], value=[3.5], multiple_rows=True).run()
+
+    # Buffered rows are inserted once enough of them are pending
+    monkeypatch.setattr(nio.sql_sinks, "flush_rows", 3)
+    _sink(subject_id="s2", roi=3, value=3.5, buffered=True).run()
+    _sink(subject_id="s2", roi=4, value=4.5, buffered=True).run()
+    assert len(_read_database("results.db")[0]) == 3
+    _sink(subject_id="s2", roi=5, value=5.5, buffered=True).run()
+    assert len(_read_database("results.db")[0]) == 6
+    _sink(subject_id="s2", roi=6, value=6.5, buffered=True).run()
+    nio.sql_sinks.flush()
+    assert len(_read_database("results.db")[0]) == 7
+
+
+def test_SQLiteSink_workflow(tmp_path):
+    database_file = str(tmp_path / "results.db")
+    _make_database(database_file)
+    sink = pe.MapNode(
+        nio.SQLiteSink(input_names=["subject_id", "roi", "value"]),
+        iterfield=["roi", "value"],
+        name="sink",
+    )
+    sink.inputs.database_file = database_file
+    sink.inputs.table_name = "results"
+    sink.inputs.subject_id = "s1"
+    sink.inputs.roi = list(range(6))
+    sink.inputs.value = [roi / 2 for roi in range(6)]
+    sink.inputs.buffered = True
+    wf = pe.Workflow(name="sql", base_dir=str(tmp_path))
+    wf.add_nodes([sink])
+    wf.config["execution"]["poll_sleep_duration"] = 0.1
+    wf.run(plugin="MultiProc", plugin_args={"n_procs": 2})
+
+    # Rows buffered by the workers are inserted before they exit
+    assert _read_database(database_file)[0] == [
+        ("s1", roi, roi / 2) for roi in range(6)
+    ]
+
+
+def _fail():
+    raise RuntimeError("failing node")
+
+
+def test_SQLiteSink_workflow_failure(tmp_path):
+    from nipype.interfaces.utility import Function
+
+    database_file = str(tmp_path / "results.db")
+    _make_database(database_file)
+    sink = pe.Node(
+        nio.SQLiteSink(input_names=["subject_id", "roi", "value"]), name="sink"
+    )
+    sink.inputs.trait_set(
+        database_file=database_file,
+        table_name="results",
+        subject_id="s1",
+        roi=0,
+        value=0.5,
+        buffered=True,
+    )
+    wf = pe.Workflow(name="sql_failure", base_dir=str(tmp_path))
+    wf.add_nodes([sink, pe.Node(Function(function=_fail), name="fail")])
+    wf.config["execution"]["crashdump_dir"] = str(tmp_path)
+    with pytest.raises(RuntimeError):
+        wf.run(plugin="Linear")
+
+    # Buffered rows are inserted even if the workflow failed
+    assert _read_database(database_file)[0] == [("s1", 0, 0.5)]
+
+
+def test_SQLiteSink_workflow_flush_failure(tmp_path):
+    from nipype.interfaces.utility import Function
+
+    database_file = str(tmp_path / "results.db")
+    _make_database(database_file)
+    sink = pe.Node(nio.SQLiteSink(input_names=["subject_id"]), name="sink")
+    sink.inputs.trait_set(
+        database_file=database_file,
+        table_name="missing",
+        subject_id="s1",
+        buffered=True,
+    )
+    wf = pe.Workflow(name="sql_flush_failure", base_dir=str(tmp_path))
+    wf.add_nodes([sink, pe.Node(Function(function=_fail), name="fail")])
+    wf.config["execution"]["crashdump_dir"] = str(tmp_path)
+    # The failure of the workflow is not masked by that of the sink
+    with pytest.raises(RuntimeError, match="failing node"):
+        wf.run(plugin="Linear")
+
+
+def test_sql_sinks_reconnect(tmp_path):
+    import sqlite3
+
+    class _ClosedConnection:
+        OperationalError = sqlite3.OperationalError
+
+        def cursor(self):
+            raise sqlite3.OperationalError("server has gone away")
+
+        def close(self):
+            pass
+
+    database_file = str(tmp_path / "results.db")
+    _make_database(database_file)
+    connections = [_ClosedConnection(), nio._connect_sqlite(database_file)]
+    service = nio.SQLSinkService()
+    service.insert(
+        ("sqlite", database_file),
+        lambda: connections.pop(0),
+        "INSERT INTO results VALUES (?, ?, ?)",
+        [("s1", 0, 0.5)],
+    )
+    # The rows are inserted over a new connection
+    assert _read_database(database_file)[0] == [("s1", 0, 0.5)]
+    service.close()
+
+
+def _make_bids_tree(root, subjects):
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "dataset_description.json").write_text(
+        '{"Name": "synthetic", "BIDSVersion": "1.6.0"}'
+    )
+    for subject in subjects:
+        anat = root / ("sub-%s" % subject) / "anat"
+        anat.mkdir(parents=True)
+        (anat / ("sub-%s_T1w.nii.gz" % subject)).write_bytes(b"")
+
+
+def test_bids_signature(tmp_path):
+    root = tmp_path / "ds"
+    _make_bids_tree(root, ["01", "02"])
+    signature = nio._bids_signature(str(root))
+    assert nio._bids_signature(str(root)) == signature
+
+    # Adding files deep in the tree changes the signature
+    anat = root / "sub-02" / "anat"
+    (anat / "sub-02_T2w.nii.gz").write_bytes(b"")
+    os.utime(anat, ns=(0, 0))
+    assert nio._bids_signature(str(root)) != signature
+
+    # So does editing a sidecar in place
+    sidecar = anat / "sub-02_T2w.json"
+    sidecar.write_text('{"EchoTime": 0.1}')
+    os.utime(anat, ns=(0, 0))
+    signature = nio._bids_signature(str(root))
+    sidecar.write_text('{"EchoTime": 0.12}')
+    os.utime(anat, ns=(0, 0))
+    assert nio._bids_signature(str(root)) != signature
+
+
+@pytest.mark.skipif(not have_pybids, reason="Pybids is not installed")
+def test_bids_layout_cache(tmp_path, monkeypatch):
+    root = tmp_path / "ds"
+    _make_bids_tree(root, ["01", "02"])
+    cache_dir = tmp_path / "layouts"
+    monkeypatch.setattr(nio, "_bids_layouts", {})
+
+    results = {}
+    for subject in ("01", "02"):
+        bg = nio.BIDSDataGrabber(infields=["subject"])
+        bg.inputs.base_dir = str(root)
+        bg.inputs.subject = subject
+        bg.inputs.output_query = {"T1w": {"suffix": "T1w", "datatype": "anat"}}
+        bg.inputs.cache_layout = True
+        bg.inputs.layout_cache_dir = str(cache_dir)
+        results[subject] = bg.run().outputs.T1w
+    assert os.path.basename(results["02"][0]) == "sub-02_T1w.nii.gz"
+    assert len(nio._bids_layouts) == 1
+    assert len(list(cache_dir.glob("*-*"))) == 1
+    layout = list(nio._bids_layouts.values())[0][1]
+
+    # Other processes load the saved index
+    monkeypatch.setattr(nio, "_bids_layouts", {})
+    loaded = nio._cached_bids_layout(str(root), False, cache_dir=str(cache_dir))
+    assert loaded is not layout
+    assert len(loaded.get(suffix="T1w", return_type="file")) == 2
+
+    # Modifying the dataset invalidates indices
+    _make_bids_tree(root, ["03"])
+    layout = nio._cached_bids_layout(str(root), False, cache_dir=str(cache_dir))
+    assert len(layout.get(suffix="T1w", return_type="file")) == 3
+    assert len(list(cache_dir.glob("*-*"))) == 1
+
+
 @pytest.mark.skipif(no_paramiko, reason="paramiko library is not available")
 @pytest.mark.skipif(no_local_ssh, reason="SSH Server is not running")
 def test_SSHDataGrabber(tmpdir):
@@ -705,6 +1022,106 @@ def test_SSHDataGrabber(tmpdir):
     old_cwd.chdir()
 
 
+class _LocalSFTP:
+    """SFTP session stand-in serving the local filesystem."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def listdir(self, path):
+        self.calls.append(("listdir", path))
+        return os.listdir(path)
+
+    def get(self, remotepath, localpath):
+        self.calls.append(("get", remotepath))
+        shutil.copyfile(remotepath, localpath)
+
+    def close(self):
+        pass
+
+
+class _LocalSSHClient:
+    """SSH client stand-in whose SFTP sessions serve the local filesystem."""
+
+    def __init__(self, calls):
+        self.calls = calls
+        self.active = True
+
+    def get_transport(self):
+        return self
+
+    def is_active(self):
+        return self.active
+
+    def open_sftp(self):
+        self.calls.append(("open_sftp",))
+        return _LocalSFTP(self.calls)
+
+    def close(self):
+        self.active = False
+
+
+def test_SSHDataGrabber_pool(tmp_path, monkeypatch):
+    """Runs share one connection, listings, and download concurrently."""
+    source_dir = tmp_path / "source"
+    for sid in ("s1", "s2"):
+        (source_dir / sid).mkdir(parents=True)
+        for ext in (".hdr", ".img", ".txt"):
+            (source_dir / sid / ("data" + ext)).write_text(sid)
+
+    calls, clients = [], []
+
+    def _get_ssh_client(self):
+        clients.append(_LocalSSHClient(calls))
+        return clients[-1]
+
+    monkeypatch.setattr(nio.SSHDataGrabber, "_get_ssh_client", _get_ssh_client)
+    monkeypatch.setattr(nio, "ssh_connections", nio.SSHConnectionPool())
+    monkeypatch.chdir(tmp_path)
+
+    def _grab(sid, template="%s/data.hdr"):
+        dg = nio.SSHDataGrabber(infields=["sid"], outfields=["files"])
+        dg.inputs.hostname = "localhost"
+        dg.inputs.base_directory = str(source_dir)
+        dg.inputs.template = template
+        dg.inputs.template_args = dict(files=[["sid"]])
+        dg.inputs.sid = sid
+        dg.inputs.sort_filelist = True
+        dg.inputs.cache_listings = True
+        return dg._list_outputs()
+
+    assert _grab("s1")["files"] == str(tmp_path / "data.hdr")
+    assert (tmp_path / "data.img").read_text() == "s1"
+    _grab("s2")
+    assert (tmp_path / "data.img").read_text() == "s2"
+    _grab("s2", template="%s/data.txt")  # listing is reused
+    assert len(clients) == 1
+    assert sum(call[0] == "listdir" for call in calls) == 2
+    assert sum(call[0] == "get" for call in calls) == 5
+    # at most one SFTP session per concurrent transfer
+    assert sum(call[0] == "open_sftp" for call in calls) <= 2
+
+    # a dropped connection is replaced
+    clients[0].active = False
+    _grab("s1")
+    assert len(clients) == 2
+
+    # files saved under the same name are only downloaded once
+    del calls[:]
+    dg = nio.SSHDataGrabber(outfields=["first", "second"])
+    dg.inputs.hostname = "localhost"
+    dg.inputs.base_directory = str(source_dir)
+    dg.inputs.template = "*"
+    dg.inputs.field_template = dict(first="s1/data.txt", second="s2/data.txt")
+    dg.inputs.template_args = dict(first=[[]], second=[[]])
+    dg.inputs.sort_filelist = True
+    dg._list_outputs()
+    assert [call[1] for call in calls if call[0] == "get"] == [
+        str(source_dir / "s2" / "data.txt")
+    ]
+    assert (tmp_path / "data.txt").read_text() == "s2"
+
+
 def test_ExportFile(tmp_path):
     test_in = tmp_path / "in.txt"
     test_in.write_text("test string", encoding='utf-8')
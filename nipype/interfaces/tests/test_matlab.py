@@ -1,6 +1,9 @@
 # emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
 # vi: set ft=python sts=4 ts=4 sw=4 et:
 import os
+import re
+import shlex
+import sys
 
 import pytest
 import nipype.interfaces.matlab as mlab
@@ -124,3 +127,86 @@ def test_set_matlabcmd():
     assert not os.path.exists(default_script_file), "scriptfile should not exist."
     assert mi._default_matlab_cmd == "foo"
     mi.set_default_matlab_cmd(matlab_cmd)
+
+
+STUB_INTERPRETER = r"""
+import os
+import shlex
+import re
+import sys
+
+jobs = 0
+for line in sys.stdin:
+    if line.strip() == "exit":
+        break
+    for path in re.findall(r"cd\('(.*?)'\)", line):
+        os.chdir(path)
+    for path in re.findall(r"run\('(.*?)'\)", line):
+        jobs += 1
+        with open(path) as fobj:
+            code = fobj.read()
+        print("pid %d job %d in %s" % (os.getpid(), jobs, os.getcwd()), flush=True)
+        if "error(" in code:
+            print("MATLAB code threw an exception:", file=sys.stderr, flush=True)
+        if "exit;" in code:
+            sys.exit(3)
+    for token in re.findall(r"fprintf\(1, '\\n(\w+)\\n'\)", line):
+        print("\n" + token, flush=True)
+        print("\n" + token, file=sys.stderr, flush=True)
+"""
+
+
+@pytest.fixture
+def matlab_sessions(tmp_path):
+    from nipype import config
+
+    stub = tmp_path / "stub_matlab.py"
+    stub.write_text(STUB_INTERPRETER)
+    config.set("execution", "matlab_sessions", "true")
+    yield f"{sys.executable} {shlex.quote(str(stub))}"
+    config.set("execution", "matlab_sessions", "false")
+    mlab.session_pool.close()
+
+
+def _session_job(runtime):
+    pid, job, cwd = re.match(r"pid (\d+) job (\d+) in (.*)", runtime.stdout).groups()
+    return pid, int(job), cwd
+
+
+def test_matlab_sessions(tmp_path, monkeypatch, matlab_sessions):
+    pids = set()
+    for i in range(2):
+        cwd = tmp_path / f"run{i}"
+        cwd.mkdir()
+        monkeypatch.chdir(cwd)
+        res = mlab.MatlabCommand(matlab_cmd=matlab_sessions, script="a = 1;").run()
+        assert res.runtime.returncode == 0
+        assert res.runtime.cmdline.startswith(matlab_sessions)
+        pid, job, job_cwd = _session_job(res.runtime)
+        assert (job, job_cwd) == (i + 1, str(cwd))
+        pids.add(pid)
+    # Both scripts were evaluated by the same interpreter
+    assert len(pids) == 1
+
+    with pytest.raises(RuntimeError):
+        mlab.MatlabCommand(matlab_cmd=matlab_sessions, script="error('x');").run()
+
+    res = mlab.MatlabCommand(matlab_cmd=matlab_sessions, script="exit;").run(
+        ignore_exception=True
+    )
+    assert res.runtime.returncode == 3
+    # A new interpreter replaces the one that exited
+    res = mlab.MatlabCommand(matlab_cmd=matlab_sessions, script="a = 1;").run()
+    pid, job, _ = _session_job(res.runtime)
+    assert pid not in pids
+    assert job == 1
+
+    # Sessions are not shared across environments
+    res = mlab.MatlabCommand(
+        matlab_cmd=matlab_sessions, script="a = 1;", environ={"NIPYPE_TEST": "1"}
+    ).run()
+    other_pid, job, _ = _session_job(res.runtime)
+    assert other_pid != pid
+    assert job == 1
+    res = mlab.MatlabCommand(matlab_cmd=matlab_sessions, script="a = 1;").run()
+    assert _session_job(res.runtime)[:2] == (pid, 2)
@@ -56,6 +56,8 @@ class IdentityInterface(IOBase):
 
     input_spec = DynamicTraitedSpec
     output_spec = DynamicTraitedSpec
+    _lightweight = True
+    _fusible = True
 
     def __init__(self, fields=None, mandatory_inputs=True, **inputs):
         super().__init__(**inputs)
@@ -173,6 +175,8 @@ class Merge(IOBase):
 
     input_spec = MergeInputSpec
     output_spec = MergeOutputSpec
+    _lightweight = True
+    _fusible = True
 
     def __init__(self, numinputs=0, **inputs):
         super().__init__(**inputs)
@@ -271,6 +275,7 @@ class Rename(SimpleInterface, IOBase):
 
     input_spec = RenameInputSpec
     output_spec = RenameOutputSpec
+    _fusible = True
 
     def __init__(self, format_string=None, **inputs):
         super().__init__(**inputs)
@@ -341,6 +346,8 @@ class Split(IOBase):
 
     input_spec = SplitInputSpec
     output_spec = DynamicTraitedSpec
+    _lightweight = True
+    _fusible = True
 
     def _add_output_traits(self, base):
         undefined_traits = {}
@@ -404,6 +411,8 @@ class Select(IOBase):
 
     input_spec = SelectInputSpec
     output_spec = SelectOutputSpec
+    _lightweight = True
+    _fusible = True
 
     def _list_outputs(self):
         outputs = self._outputs().get()
@@ -42,6 +42,7 @@ class Function(IOBase):
 
     input_spec = FunctionInputSpec
     output_spec = DynamicTraitedSpec
+    _lightweight = True
 
     def __init__(
         self,
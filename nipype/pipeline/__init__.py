@@ -6,4 +6,16 @@ Package contains modules for generating pipelines using interfaces
 """
 
 __docformat__ = "restructuredtext"
-from .engine import Node, MapNode, JoinNode, Workflow
+
+from ..utils.imports import lazy_module_attrs as _lazy_module_attrs
+
+__getattr__, __dir__ = _lazy_module_attrs(
+    __name__,
+    {
+        "Node": ".engine",
+        "MapNode": ".engine",
+        "JoinNode": ".engine",
+        "Workflow": ".engine",
+    },
+    submodules=("engine", "plugins"),
+)
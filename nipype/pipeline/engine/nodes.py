@@ -63,6 +63,13 @@ from .base import EngineBase
 
 logger = logging.getLogger("nipype.workflow")
 
+# Results of the lightweight nodes run by this process, by results file
+_lightweight_results = {}
+# Number of dependent nodes yet to read each of those results
+_lightweight_consumers = {}
+# Results files of the lightweight nodes whose results were released
+_lightweight_released = set()
+
 
 class NodeExecutionError(RuntimeError):
     """A nipype-specific name for exceptions when executing a Node."""
@@ -101,7 +108,9 @@ class Node(EngineBase):
         needed_outputs=None,
         run_without_submitting=False,
         n_procs=None,
-        mem_gb=0.20,
+        mem_gb=None,
+        lightweight=False,
+        fusible=None,
         **kwargs,
     ):
         """
@@ -171,6 +180,31 @@ class Node(EngineBase):
             Run the node without submitting to a job engine or to a
             multiprocessing pool
 
+        lightweight : boolean
+            Run the node in memory, on the master process, without creating
+            its working directory unless its outputs contain files. Only
+            applies to pure-Python interfaces allowing it (Function, Merge,
+            Select, Split and IdentityInterface). Functions run this way
+            must not write files relative to the current directory.
+            Within a workflow, results are only kept until every dependent
+            node has read them, so the ``result`` of a lightweight node
+            whose outputs contain no files is not available once the
+            workflow ran (unless it is a leaf, or ``write_provenance`` is
+            enabled).
+
+        mem_gb : float
+            Memory (in GB) reserved to run the node by plugins managing
+            resources. By default, it is estimated from the inputs by the
+            interface's ``ram_estimator`` (e.g., from the slab size of
+            TSNR), or set to 0.2.
+
+        fusible : boolean
+            Allow distributed plugins to run the node in the same task as its
+            neighbours in a linear chain of fusible nodes (see the
+            ``fuse_nodes`` execution option). By default, only cheap utility
+            interfaces (e.g., IdentityInterface, Merge, Select or Rename) are
+            fusible.
+
         """
         # Make sure an interface is set, and that it is an Interface
         if interface is None:
@@ -192,10 +226,13 @@ class Node(EngineBase):
         self.overwrite = overwrite
         self.parameterization = []
         self.input_source = {}
+        self.n_dependents = 0
         self.plugin_args = {}
 
         self.run_without_submitting = run_without_submitting
-        self._mem_gb = mem_gb
+        self.lightweight = lightweight
+        self.fusible = fusible
+        self._mem_gb = 0.20 if mem_gb is None else mem_gb
         self._n_procs = n_procs
 
         # Downstream n_procs
@@ -209,8 +246,11 @@ class Node(EngineBase):
         self.needed_outputs = needed_outputs
         self.config = None
 
-        # Dynamic RAM estimator
-        self.ram_estimator = None
+        # Dynamic RAM estimator, by default that of the interface (if any)
+        # unless the memory is given
+        self.ram_estimator = (
+            None if mem_gb is not None else getattr(interface, "ram_estimator", None)
+        )
         self.ram_estimator_str = None
         self._ram_estimated = False
 
@@ -225,10 +265,43 @@ class Node(EngineBase):
     @property
     def result(self):
         """Get result from result file (do not hold it in memory)"""
-        return _load_resultfile(
-            op.join(self.output_dir(), "result_%s.pklz" % self.name)
+        results_fname = op.join(self.output_dir(), "result_%s.pklz" % self.name)
+        if results_fname in _lightweight_results:
+            return _lightweight_results[results_fname]
+        if results_fname in _lightweight_released and not op.exists(results_fname):
+            raise FileNotFoundError(
+                f'The results of lightweight node "{self.name}" were released '
+                "once its dependent nodes read them. Set lightweight=False to "
+                "keep them in its working directory."
+            )
+        return _load_resultfile(results_fname)
+
+    @property
+    def lightweight(self):
+        """Whether the node runs in memory, without a working directory"""
+        return (
+            self._lightweight
+            and self._interface.lightweight
+            and not isinstance(self, MapNode)
         )
 
+    @lightweight.setter
+    def lightweight(self, value):
+        self._lightweight = bool(value)
+
+    @property
+    def fusible(self):
+        """Whether the node can share a scheduled task with its neighbours"""
+        if isinstance(self, MapNode) or self.run_without_submitting:
+            return False
+        if self._fusible is None:
+            return self._interface.fusible
+        return self._fusible
+
+    @fusible.setter
+    def fusible(self, value):
+        self._fusible = value if value is None else bool(value)
+
     @property
     def inputs(self):
         """Return the inputs of the underlying interface"""
@@ -495,6 +568,9 @@ class Node(EngineBase):
             )
             return result
 
+        if self.lightweight and not updatehash:
+            return self._run_lightweight(updated=cached and updated)
+
         if cached and updated and not isinstance(self, MapNode):
             logger.debug('[Node] Rerunning cached, up-to-date node "%s"', self.fullname)
             if not force_run and str2bool(
@@ -562,6 +638,56 @@ directory. Please ensure no other concurrent workflows are racing""",
         write_node_report(self, result=result, is_mapnode=isinstance(self, MapNode))
         return result
 
+    def _run_lightweight(self, updated=False):
+        """
+        Execute the node in memory, without a working directory.
+
+        The result is kept by this process until its ``n_dependents`` nodes
+        have read it, and only written out (along with the hashfile) when the
+        outputs contain files or the interface failed.
+        """
+        outdir = self.output_dir()
+        results_fname = op.join(outdir, "result_%s.pklz" % self.name)
+        _lightweight_results.pop(results_fname, None)
+        _lightweight_consumers.pop(results_fname, None)
+        _lightweight_released.discard(results_fname)
+        # A stale working directory must not shadow the new results, but the
+        # results of a previous run with the same inputs are kept
+        if op.isdir(outdir) and not updated:
+            shutil.rmtree(outdir)
+
+        self._get_inputs()
+        logger.info(
+            f'[Node] Executing "{self.name}" <{self._interface.__module__}'
+            f".{self._interface.__class__.__name__}> in memory"
+        )
+        result = self._interface.run(ignore_exception=True)
+        exc_tb = getattr(result.runtime, "traceback", None)
+        if not exc_tb and not _contains_files(result.outputs):
+            _lightweight_results[results_fname] = result
+            # Provenance is written from the results of every node of the graph
+            if self.n_dependents and not str2bool(
+                self.config["execution"]["write_provenance"]
+            ):
+                _lightweight_consumers[results_fname] = self.n_dependents
+            return result
+
+        os.makedirs(outdir, exist_ok=True)
+        _save_resultfile(
+            result,
+            outdir,
+            self.name,
+            rebase=str2bool(self.config["execution"]["use_relative_paths"]),
+        )
+        if exc_tb:
+            raise _execution_error(self.name, result.runtime)
+
+        self._get_hashval()
+        _save_hashfile(
+            op.join(outdir, "_0x%s.json" % self._hashvalue), self._hashed_inputs
+        )
+        return result
+
     def _get_hashval(self):
         """Return a hash of the input state"""
         self._get_inputs()
@@ -603,10 +729,16 @@ directory. Please ensure no other concurrent workflows are racing""",
             len(prev_results),
         )
 
+        consumed = []
         for results_fname, connections in list(prev_results.items()):
             outputs = None
             try:
-                outputs = _load_resultfile(results_fname).outputs
+                result = _lightweight_results.get(results_fname)
+                if result is None:
+                    result = _load_resultfile(results_fname)
+                else:
+                    consumed.append(results_fname)
+                outputs = result.outputs
             except AttributeError as e:
                 logger.critical("%s", e)
 
@@ -648,6 +780,24 @@ Error populating the inputs of node "%s": the results file of the source node \
 
         # Successfully set inputs
         self._got_inputs = True
+        # Release the lightweight results every dependent has read
+        for results_fname in consumed:
+            if results_fname not in _lightweight_consumers:
+                continue
+            _lightweight_consumers[results_fname] -= 1
+            if not _lightweight_consumers[results_fname]:
+                del _lightweight_consumers[results_fname]
+                del _lightweight_results[results_fname]
+                _lightweight_released.add(results_fname)
+
+    def _get_lightweight_inputs(self):
+        """Retrieve the inputs connected to lightweight nodes of this process.
+
+        Their results are not available to other processes, so the inputs
+        must be set before the node is submitted.
+        """
+        if any(info[0] in _lightweight_results for info in self.input_source.values()):
+            self._get_inputs()
 
     def _update_hash(self):
         for outdatedhash in glob(op.join(self.output_dir(), "_0x*.json")):
@@ -766,25 +916,7 @@ Error populating the inputs of node "%s": the results file of the source node \
         )
 
         if exc_tb:
-            runtime = result.runtime
-
-            def _tab(text):
-                from textwrap import indent
-
-                if not text:
-                    return ""
-                return indent(text, '\t')
-
-            msg = f"Exception raised while executing Node {self.name}.\n\n"
-            if hasattr(runtime, 'cmdline'):
-                msg += (
-                    f"Cmdline:\n{_tab(runtime.cmdline)}\n"
-                    f"Stdout:\n{_tab(runtime.stdout)}\n"
-                    f"Stderr:\n{_tab(runtime.stderr)}\n"
-                )
-            # Always pass along the traceback
-            msg += f"Traceback:\n{_tab(runtime.traceback)}"
-            raise NodeExecutionError(msg)
+            raise _execution_error(self.name, result.runtime)
 
         return result
 
@@ -1194,7 +1326,7 @@ class MapNode(Node):
             return self._hashed_inputs, self._hashvalue
 
         self._check_iterfield()
-        hashinputs = deepcopy(self._interface.inputs)
+        hashinputs = self._interface.inputs.copy_spec()
         for name in self.iterfield:
             hashinputs.remove_trait(name)
             hashinputs.add_trait(
@@ -1231,14 +1363,28 @@ class MapNode(Node):
     def _make_nodes(self, cwd=None):
         if cwd is None:
             cwd = self.output_dir()
-        if self.nested:
-            nitems = len(flatten(ensure_list(getattr(self.inputs, self.iterfield[0]))))
-        else:
-            nitems = len(ensure_list(getattr(self.inputs, self.iterfield[0])))
+        fieldvals = {}
+        for field in self.iterfield:
+            if self.nested:
+                fieldvals[field] = flatten(ensure_list(getattr(self.inputs, field)))
+            else:
+                fieldvals[field] = ensure_list(getattr(self.inputs, field))
+        nitems = len(fieldvals[self.iterfield[0]])
+
+        # Inputs that are not iterated over are read once, and the
+        # values that cannot be modified in place are shared by all
+        # the subnodes (see ``BaseTraitedSpec.copy_spec``)
+        inputs = self._interface.inputs
+        shared_values = inputs.trait_get()
         for i in range(nitems):
             nodename = "_%s%d" % (self.name, i)
+            values = dict(shared_values)
+            for field in self.iterfield:
+                logger.debug("setting input %d %s %s", i, field, fieldvals[field][i])
+                values[field] = fieldvals[field][i]
+            memo = {id(inputs): inputs.copy_spec(values)}
             node = Node(
-                deepcopy(self._interface),
+                deepcopy(self._interface, memo),
                 n_procs=self._n_procs,
                 mem_gb=self._mem_gb,
                 overwrite=self.overwrite,
@@ -1248,18 +1394,8 @@ class MapNode(Node):
                 name=nodename,
             )
             node.plugin_args = self.plugin_args
-            node.interface.inputs.trait_set(
-                **deepcopy(self._interface.inputs.trait_get())
-            )
             node.interface.resource_monitor = self._interface.resource_monitor
             node.ram_estimator = self.ram_estimator
-            for field in self.iterfield:
-                if self.nested:
-                    fieldvals = flatten(ensure_list(getattr(self.inputs, field)))
-                else:
-                    fieldvals = ensure_list(getattr(self.inputs, field))
-                logger.debug("setting input %d %s %s", i, field, fieldvals[i])
-                setattr(node.inputs, field, fieldvals[i])
             node.config = self.config
             yield i, node
 
@@ -1429,3 +1565,146 @@ class MapNode(Node):
             shutil.rmtree(path)
 
         return result
+
+
+class FusedNode(EngineBase):
+    """
+    A linear chain of nodes scheduled as a single task.
+
+    The nodes run one after the other, each in its own working directory
+    and with its own caching and results file, as if they were scheduled
+    separately. The chain stands for its last node (e.g., for its results
+    and output directory) in the execution graph.
+    """
+
+    def __init__(self, nodes):
+        """
+        Parameters
+        ----------
+        nodes : list of Node
+            the chain of nodes, in execution order
+
+        """
+        tail = nodes[-1]
+        super().__init__(tail.name, tail.base_dir)
+        self.nodes = list(nodes)
+        self._id = tail._id
+        self._hierarchy = tail._hierarchy
+        self.config = tail.config
+        self.overwrite = tail.overwrite
+        self.plugin_args = tail.plugin_args
+        self.run_without_submitting = False
+        self.lightweight = False
+        self._current = None  # The node being (or last) run
+
+    @property
+    def interface(self):
+        """Return the interface of the last node"""
+        return self.nodes[-1].interface
+
+    @property
+    def inputs(self):
+        """Return the inputs of the first node"""
+        return self.nodes[0].inputs
+
+    @property
+    def outputs(self):
+        """Return the output fields of the last node"""
+        return self.nodes[-1].outputs
+
+    @property
+    def result(self):
+        """Get the result of the last node run (e.g., the one that failed)"""
+        return (self._current or self.nodes[-1]).result
+
+    @property
+    def mem_gb(self):
+        """Get estimated memory (GB) of the most demanding node"""
+        return max(node.mem_gb for node in self.nodes)
+
+    @property
+    def mem_gb_runtime(self):
+        """Get estimated memory (GB), updating it for the first node"""
+        return max(
+            [self.nodes[0].mem_gb_runtime] + [node.mem_gb for node in self.nodes[1:]]
+        )
+
+    @property
+    def n_procs(self):
+        """Get the number of processes/threads of the most demanding node"""
+        return max(node.n_procs for node in self.nodes)
+
+    def is_gpu_node(self):
+        return any(node.is_gpu_node() for node in self.nodes)
+
+    def output_dir(self):
+        """Return the location of the output directory of the last node"""
+        return self.nodes[-1].output_dir()
+
+    def is_cached(self, rm_outdated=False):
+        """Check whether all the nodes of the chain are cached and up-to-date"""
+        for node in self.nodes:
+            cached, updated = node.is_cached(rm_outdated=rm_outdated)
+            if not (cached and updated):
+                return cached, updated
+        return True, True
+
+    def run(self, updatehash=False):
+        """Execute the nodes of the chain, returning the result of the last"""
+        logger.info(
+            '[FusedNode] Running "%s" (%d nodes).',
+            " > ".join(node.fullname for node in self.nodes),
+            len(self.nodes),
+        )
+        for index, node in enumerate(self.nodes):
+            self._current = node
+            try:
+                result = node.run(updatehash=updatehash)
+            except Exception as exc:
+                # Tell the master which node failed, as it only gets the error
+                error = NodeExecutionError(
+                    f'Node "{node.fullname}" ({index + 1}/{len(self.nodes)}) '
+                    "of the fused chain failed."
+                )
+                error.node_index = index
+                raise error from exc
+        return result
+
+    def _get_lightweight_inputs(self):
+        # Only the first node takes inputs from outside the chain
+        self.nodes[0]._get_lightweight_inputs()
+
+
+def _execution_error(name, runtime):
+    """Build the error reporting the failure of a node's interface."""
+
+    def _tab(text):
+        from textwrap import indent
+
+        if not text:
+            return ""
+        return indent(text, '\t')
+
+    msg = f"Exception raised while executing Node {name}.\n\n"
+    if hasattr(runtime, 'cmdline'):
+        msg += (
+            f"Cmdline:\n{_tab(runtime.cmdline)}\n"
+            f"Stdout:\n{_tab(runtime.stdout)}\n"
+            f"Stderr:\n{_tab(runtime.stderr)}\n"
+        )
+    # Always pass along the traceback
+    msg += f"Traceback:\n{_tab(runtime.traceback)}"
+    return NodeExecutionError(msg)
+
+
+def _contains_files(value):
+    """Whether a value (e.g., interface outputs) refers to existing paths."""
+    if isinstance(value, (str, os.PathLike)):
+        return op.exists(value)
+    if hasattr(value, "trait_get"):
+        value = value.trait_get()
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple, set)):
+        return any(_contains_files(item) for item in value)
+    return False
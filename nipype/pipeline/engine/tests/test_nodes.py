@@ -8,6 +8,7 @@ from .... import config
 from ....interfaces import utility as niu
 from ....interfaces import base as nib
 from ... import engine as pe
+from ..nodes import _lightweight_results
 from ..utils import merge_dict
 from .test_base import EngineTestInterface
 from .test_utils import UtilsTestInterface
@@ -188,6 +189,31 @@ def test_mapnode_expansion(tmpdir):
             assert getattr(node, attr) == getattr(mapnode, attr)
 
 
+def test_mapnode_expansion_inputs(tmpdir):
+    tmpdir.chdir()
+    from nipype import MapNode, IdentityInterface
+
+    mapnode = MapNode(
+        IdentityInterface(fields=["in1", "shared", "nested"]),
+        iterfield="in1",
+        name="mapnode",
+        nested=True,
+    )
+    mapnode.inputs.in1 = [[1, 2], [3]]
+    mapnode.inputs.shared = ["a", "b"]
+    mapnode.inputs.nested = [[0]]
+
+    nodes = [node for _, node in mapnode._make_nodes()]
+    assert [node.inputs.in1 for node in nodes] == [1, 2, 3]
+    assert all(node.inputs.shared == ["a", "b"] for node in nodes)
+
+    # Subnodes do not share mutable values with the MapNode or each other
+    nodes[0].inputs.shared.append("c")
+    nodes[0].inputs.nested[0].append(1)
+    assert nodes[1].inputs.shared == mapnode.interface.inputs.shared == ["a", "b"]
+    assert nodes[1].inputs.nested == mapnode.interface.inputs.nested == [[0]]
+
+
 def test_node_hash(tmpdir):
     from nipype.interfaces.utility import Function
 
@@ -316,6 +342,89 @@ def test_outputmultipath_collapse(tmpdir):
     assert select_nd.result.outputs.out == [4]
 
 
+def _increment(x):
+    return x + 1
+
+
+def _write(x):
+    import os
+
+    out_file = os.path.abspath("value_%d.txt" % x)
+    with open(out_file, "w") as fobj:
+        fobj.write(str(x))
+    return out_file
+
+
+@pytest.mark.parametrize("plugin", ["Linear", "MultiProc"])
+def test_lightweight_nodes(tmp_path, monkeypatch, plugin):
+    monkeypatch.chdir(tmp_path)
+    wf = pe.Workflow(name="lightweight_%s" % plugin.lower(), base_dir=str(tmp_path))
+    first = pe.Node(niu.Function(function=_increment), name="first", lightweight=True)
+    first.inputs.x = 1
+    second = pe.Node(niu.Function(function=_increment), name="second", lightweight=True)
+    write = pe.Node(niu.Function(function=_write), name="write", lightweight=True)
+    # A regular node, submitted to the workers with MultiProc
+    third = pe.Node(niu.Function(function=_increment), name="third")
+    wf.connect(
+        [
+            (first, second, [("out", "x")]),
+            (second, write, [("out", "x")]),
+            (second, third, [("out", "x")]),
+        ]
+    )
+    assert first.lightweight
+    assert not pe.MapNode(
+        niu.Function(function=_increment),
+        iterfield=["x"],
+        name="mapnode",
+        lightweight=True,
+    ).lightweight
+    assert not pe.Node(nib.SimpleInterface(), name="base", lightweight=True).lightweight
+
+    nodes = {node.name: node for node in wf.run(plugin=plugin).nodes()}
+    wf_dir = tmp_path / wf.name
+
+    # Working directories are only created when outputs contain files
+    assert not (wf_dir / "first").exists()
+    assert not (wf_dir / "second").exists()
+    assert nodes["third"].result.outputs.out == 4
+    # Results are released once every dependent node has read them
+    assert str(wf_dir / "first" / "result_first.pklz") not in _lightweight_results
+    assert str(wf_dir / "second" / "result_second.pklz") not in _lightweight_results
+    with pytest.raises(FileNotFoundError, match='lightweight node "second"'):
+        nodes["second"].result
+    assert (wf_dir / "third" / "result_third.pklz").exists()
+    assert nodes["write"].result.outputs.out == str(tmp_path / "value_3.txt")
+    assert (wf_dir / "write" / "result_write.pklz").exists()
+    assert len(list((wf_dir / "write").glob("_0x*.json"))) == 1
+
+
+def test_lightweight_node_cache(tmp_path):
+    def make_node(x, **kwargs):
+        node = pe.Node(
+            niu.Function(function=_increment),
+            name="cached",
+            base_dir=str(tmp_path),
+            **kwargs,
+        )
+        node.inputs.x = x
+        return node
+
+    make_node(1).run()
+    results = tmp_path / "cached" / "result_cached.pklz"
+    assert results.exists()
+
+    # Rerunning in memory keeps the results of the same inputs
+    assert make_node(1, lightweight=True, overwrite=True).run().outputs.out == 2
+    assert results.exists()
+
+    # Outdated results are removed
+    node = make_node(2, lightweight=True)
+    assert node.run().outputs.out == 3
+    assert not results.exists()
+    assert node.result.outputs.out == 3
+
+
 @pytest.mark.timeout(30)
 def test_mapnode_single(tmpdir):
     tmpdir.chdir()
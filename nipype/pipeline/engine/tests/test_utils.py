@@ -10,11 +10,13 @@ from ... import engine as pe
 from ....interfaces import base as nib
 from ....interfaces import utility as niu
 from .... import config
+from ....utils.filemanip import loadpkl
 from ..utils import (
     clean_working_directory,
     write_workflow_prov,
     load_resultfile,
     format_node,
+    fuse_chains,
 )
 
 
@@ -339,3 +341,91 @@ def test_format_node():
     workspace = {"Node": pe.Node}
     exec("\n".join(serialized), workspace)
     assert workspace["node"].interface._fields == node.interface._fields
+
+
+def _increment(x):
+    return x + 1
+
+
+def test_fuse_chains(tmpdir):
+    tmpdir.chdir()
+    wf = pe.Workflow(name="fused", base_dir=tmpdir.strpath)
+    merge = pe.Node(niu.Merge(1), name="merge")
+    merge.inputs.in1 = 1
+    select = pe.Node(niu.Select(index=0), name="select")
+    merge2 = pe.Node(niu.Merge(1), name="merge2")
+    select2 = pe.Node(niu.Select(index=0), name="select2")
+    increment = pe.Node(niu.Function(function=_increment), name="increment")
+    unfused = pe.Node(niu.Merge(1), name="unfused", fusible=False)
+    wf.connect(
+        [
+            (merge, select, [("out", "inlist")]),
+            (select, merge2, [("out", "in1")]),
+            (merge2, select2, [("out", "inlist")]),
+            (select2, increment, [("out", "x")]),
+            (increment, unfused, [("out", "in1")]),
+        ]
+    )
+
+    graph = wf._create_flat_graph()
+    fused_graph = fuse_chains(graph)
+    assert len(graph) == 6
+    assert len(fused_graph) == 3
+    fused = [node for node in fused_graph.nodes() if hasattr(node, "nodes")]
+    assert len(fused) == 1
+    assert [node.name for node in fused[0].nodes] == [
+        "merge",
+        "select",
+        "merge2",
+        "select2",
+    ]
+    assert list(fused_graph.successors(fused[0]))[0].name == "increment"
+
+    wf.config["execution"]["fuse_nodes"] = True
+    wf.config["execution"]["poll_sleep_duration"] = 0.1
+    nodes = {node.name: node for node in wf.run(plugin="MultiProc").nodes()}
+    assert len(nodes) == 6
+    # Fused nodes keep their own working directory and results file
+    for name in ("merge", "select", "merge2", "select2"):
+        assert os.path.exists(
+            os.path.join(wf.base_dir, wf.name, name, "result_%s.pklz" % name)
+        )
+    assert nodes["unfused"].result.outputs.out == [2]
+
+
+def test_fuse_chains_crash(tmpdir):
+    tmpdir.chdir()
+    wf = pe.Workflow(name="fused_crash", base_dir=tmpdir.strpath)
+    merge = pe.Node(niu.Merge(1), name="merge")
+    merge.inputs.in1 = 1
+    select = pe.Node(niu.Select(index=5), name="select")
+    merge2 = pe.Node(niu.Merge(1), name="merge2")
+    wf.connect(
+        [
+            (merge, select, [("out", "inlist")]),
+            (select, merge2, [("out", "in1")]),
+        ]
+    )
+    wf.config["execution"]["fuse_nodes"] = True
+    wf.config["execution"]["poll_sleep_duration"] = 0.1
+    wf.config["execution"]["crashdump_dir"] = tmpdir.strpath
+
+    statuses = []
+    with pytest.raises(RuntimeError):
+        wf.run(
+            plugin="MultiProc",
+            plugin_args={
+                "status_callback": lambda node, status: statuses.append(
+                    (node.name, status)
+                )
+            },
+        )
+
+    # The failure is reported for the node of the chain that failed
+    assert ("select", "exception") in statuses
+    crashfiles = tmpdir.listdir("crash-*.pklz")
+    assert len(crashfiles) == 1
+    assert "-select-" in crashfiles[0].basename
+    crash = loadpkl(crashfiles[0].strpath)
+    assert crash["node"].name == "select"
+    assert "could not be found" not in "".join(crash["traceback"])
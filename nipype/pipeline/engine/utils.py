@@ -1172,6 +1172,81 @@ def generate_expanded_graph(graph_in):
     return _remove_nonjoin_identity_nodes(graph_in)
 
 
+def fuse_chains(graph_in):
+    """Replace the linear chains of fusible nodes with fused nodes.
+
+    Two fusible nodes are chained when the first is the only predecessor of
+    the second, and the second the only successor of the first. Each chain
+    of two or more nodes runs as a single :class:`.nodes.FusedNode` task.
+    Nodes are shared with the input graph, which is left untouched.
+
+    Parameters
+    ----------
+    graph_in : networkx.DiGraph
+        an execution graph, as generated by :func:`generate_expanded_graph`
+        and configured by the workflow
+
+    Returns
+    -------
+    graph_out : networkx.DiGraph
+        the scheduling graph, or ``graph_in`` if no chain was found
+
+    """
+    import networkx as nx
+    from .nodes import FusedNode
+
+    def _fusible(node):
+        return (
+            node.fusible
+            and not node.lightweight
+            and not node.overwrite
+            and not node.interface.always_run
+        )
+
+    def _chained(node, successor):
+        return (
+            graph_in.out_degree(node) == 1
+            and graph_in.in_degree(successor) == 1
+            and _fusible(node)
+            and _fusible(successor)
+        )
+
+    chains = []
+    for node in graph_in.nodes():
+        preds = list(graph_in.predecessors(node))
+        if len(preds) == 1 and _chained(preds[0], node):
+            continue  # Not the head of a chain
+        chain = [node]
+        while graph_in.out_degree(chain[-1]) == 1:
+            successor = next(iter(graph_in.successors(chain[-1])))
+            if not _chained(chain[-1], successor):
+                break
+            chain.append(successor)
+        if len(chain) > 1:
+            chains.append(chain)
+
+    if not chains:
+        return graph_in
+
+    task = {node: node for node in graph_in.nodes()}
+    for chain in chains:
+        logger.debug("Fusing chain of nodes: %s.", ", ".join(map(str, chain)))
+        fused = FusedNode(chain)
+        task.update((node, fused) for node in chain)
+
+    graph_out = nx.DiGraph()
+    graph_out.add_nodes_from(dict.fromkeys(task.values()))
+    for src, dest, data in graph_in.edges(data=True):
+        if task[src] is not task[dest]:
+            graph_out.add_edge(task[src], task[dest], **data)
+    logger.info(
+        "Fused %d nodes into %d tasks.",
+        sum(len(chain) for chain in chains),
+        len(chains),
+    )
+    return graph_out
+
+
 def _iterable_nodes(graph_in):
     """Returns the iterable nodes in the given graph and their join
     dependencies.
@@ -620,7 +620,19 @@ connected.
         self._configure_exec_nodes(execgraph)
         if str2bool(self.config["execution"]["create_report"]):
             self._write_report_info(self.base_dir, self.name, execgraph)
-        runner.run(execgraph, updatehash=updatehash, config=self.config)
+        # Insert the rows still buffered by SQL sinks run in this process
+        from ...interfaces.io import sql_sinks
+
+        try:
+            runner.run(execgraph, updatehash=updatehash, config=self.config)
+        except BaseException:
+            try:
+                sql_sinks.flush()
+            except Exception as e:
+                # Do not mask the failure of the workflow
+                logger.error("Could not insert the rows buffered by SQL sinks: %s", e)
+            raise
+        sql_sinks.flush()
         datestr = utcnow().strftime("%Y%m%dT%H%M%S")
         if str2bool(self.config["execution"]["write_provenance"]):
             prov_base = op.join(self.base_dir, "workflow_provenance_%s" % datestr)
@@ -729,6 +741,7 @@ connected.
     def _configure_exec_nodes(self, graph):
         """Ensure that each node knows where to get inputs from"""
         for node in graph.nodes():
+            node.n_dependents = graph.out_degree(node)
             node.input_source = {}
             for edge in graph.in_edges(node):
                 data = graph.get_edge_data(*edge)
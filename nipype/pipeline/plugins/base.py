@@ -15,7 +15,7 @@ import numpy as np
 
 from ... import logging
 from ...utils.misc import str2bool
-from ..engine.utils import topological_sort, load_resultfile
+from ..engine.utils import fuse_chains, topological_sort, load_resultfile
 from ..engine import MapNode
 from .tools import report_crash, report_nodes_not_run, create_pyscript
 
@@ -121,6 +121,18 @@ class DistributedPluginBase(PluginBase):
     def _postrun_check(self):
         """Stub method to close any open resources"""
 
+    def _run_on_master(self, jobid):
+        """Whether the job must run on the master process instead of a worker"""
+        node = self.procs[jobid]
+        if node.run_without_submitting or node.lightweight:
+            return True
+        try:
+            node._get_lightweight_inputs()
+        except Exception:
+            # Running the node on the master will report the error
+            return True
+        return False
+
     def run(self, graph, config, updatehash=False):
         """
         Executes a pre-defined pipeline using distributed approaches
@@ -131,6 +143,8 @@ class DistributedPluginBase(PluginBase):
         logger.info("Running in parallel.")
         self._config = config
         poll_sleep_secs = float(config["execution"]["poll_sleep_duration"])
+        if str2bool(config["execution"]["fuse_nodes"]):
+            graph = fuse_chains(graph)
 
         self._prerun_check(graph)
         # Generate appropriate structures for worker-manager model
@@ -247,15 +261,19 @@ class DistributedPluginBase(PluginBase):
     def _clean_queue(self, jobid, graph, result=None):
         logger.debug("Clearing %d from queue", jobid)
 
-        if self._status_callback:
-            self._status_callback(self.procs[jobid], "exception")
+        node = self.procs[jobid]
         if result is None:
             result = {
                 "result": None,
                 "traceback": "\n".join(format_exception(*sys.exc_info())),
             }
+        elif result.get("node_index") is not None:
+            # Report the node of the fused chain that failed
+            node = node.nodes[result["node_index"]]
 
-        crashfile = self._report_crash(self.procs[jobid], result=result)
+        if self._status_callback:
+            self._status_callback(node, "exception")
+        crashfile = self._report_crash(node, result=result)
         if str2bool(self._config["execution"]["stop_on_first_crash"]):
             raise RuntimeError("".join(result["traceback"]))
         if jobid in self.mapnodesubids:
@@ -347,7 +365,7 @@ class DistributedPluginBase(PluginBase):
                         self._status_callback(self.procs[jobid], "start")
 
                     if not self._local_hash_check(jobid, graph):
-                        if self.procs[jobid].run_without_submitting:
+                        if self._run_on_master(jobid):
                             logger.debug(
                                 "Running node %s on master thread", self.procs[jobid]
                             )
@@ -476,15 +494,19 @@ class DistributedPluginBase(PluginBase):
                     continue
                 if self.proc_done[idx] and (not self.proc_pending[idx]):
                     self.refidx[idx, idx] = -1
-                    outdir = self.procs[idx].output_dir()
-                    logger.info(
-                        (
-                            "[node dependencies finished] "
-                            "removing node: %s from directory %s"
+                    # Fused nodes stand for a chain of nodes
+                    for node in getattr(self.procs[idx], "nodes", [self.procs[idx]]):
+                        outdir = node.output_dir()
+                        if not os.path.isdir(outdir):  # e.g., lightweight nodes
+                            continue
+                        logger.info(
+                            (
+                                "[node dependencies finished] "
+                                "removing node: %s from directory %s"
+                            )
+                            % (node._id, outdir)
                         )
-                        % (self.procs[idx]._id, outdir)
-                    )
-                    shutil.rmtree(outdir)
+                        shutil.rmtree(outdir)
 
 
 class SGELikeBatchManagerBase(DistributedPluginBase):
@@ -556,6 +578,7 @@ class SGELikeBatchManagerBase(DistributedPluginBase):
             result_out["result"] = result_data["result"]
             result_out["traceback"] = result_data["traceback"]
             result_out["hostname"] = result_data["hostname"]
+            result_out["node_index"] = result_data.get("node_index")
             if results_file:
                 crash_file = os.path.join(node_dir, "crashstore.pklz")
                 os.rename(results_file, crash_file)
@@ -597,6 +620,8 @@ class GraphPluginBase(PluginBase):
         nodes = list(nx.topological_sort(graph))
         logger.debug("Creating executable python files for each node")
         for idx, node in enumerate(nodes):
+            # Results kept in memory would not reach the other jobs
+            node.lightweight = False
             pyfiles.append(
                 create_pyscript(node, updatehash=updatehash, store_exception=False)
             )
@@ -68,6 +68,8 @@ def run_node(node, updatehash, taskid):
     except:  # noqa: E722, intendedly catch all here
         result["traceback"] = format_exception(*sys.exc_info())
         result["result"] = node.result
+        # Which node of a fused chain failed
+        result["node_index"] = getattr(sys.exc_info()[1], "node_index", None)
 
     # Return the result dictionary
     return result
@@ -381,10 +383,8 @@ class MultiProcPlugin(DistributedPluginBase):
                 continue
 
             cached, updated = self.procs[jobid].is_cached()
-            # updatehash and run_without_submitting are also run locally
-            if (cached and updatehash and not updated) or self.procs[
-                jobid
-            ].run_without_submitting:
+            # updatehash, run_without_submitting and lightweight nodes are run locally
+            if (cached and updatehash and not updated) or self._run_on_master(jobid):
                 logger.debug("Running node %s on master thread", self.procs[jobid])
                 try:
                     self.procs[jobid].run(updatehash=updatehash)
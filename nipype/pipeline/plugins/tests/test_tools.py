@@ -2,14 +2,17 @@
 # vi: set ft=python sts=4 ts=4 sw=4 et:
 """Tests for the engine module"""
 
+import os
 import re
 
 from unittest import mock
 
 from nipype.pipeline.plugins.tools import report_crash
+from nipype.utils.filemanip import crash_summary_file
 
 
-def test_report_crash():
+@mock.patch("nipype.pipeline.plugins.tools.crash2json")  # do not write to the cwd
+def test_report_crash(mock_crash2json):
     with mock.patch("pickle.dump", mock.MagicMock()) as mock_pickle_dump:
         with mock.patch(
             "nipype.pipeline.plugins.tools.format_exception", mock.MagicMock()
@@ -29,6 +32,48 @@ def test_report_crash():
                 expected_crashfile.match(actual_crashfile).group() == actual_crashfile
             )
             assert mock_pickle_dump.call_count == 1
+            assert mock_crash2json.call_count == 1
+
+
+def test_report_crash_summary(tmp_path):
+    """Tracebacks are searched in the crash summaries, without unpickling."""
+    from nipype.scripts.crash_files import iter_tracebacks
+
+    traceback = ["Traceback (most recent call last):\n", "ValueError: sub-01\n"]
+    with mock.patch("pickle.dump", mock.MagicMock()):
+        mock_node = mock.MagicMock(name="mock_node")
+        mock_node._id = "an_id"
+        mock_node.config = {
+            "execution": {"crashdump_dir": str(tmp_path), "crashfile_format": "pklz"}
+        }
+        crashfiles = [
+            report_crash(mock_node, traceback=traceback, hostname="host")
+            for _ in range(3)
+        ]
+
+    expected = [(cf, "\n".join(traceback)) for cf in sorted(crashfiles)]
+    with mock.patch("nipype.scripts.crash_files.loadcrash", side_effect=AssertionError):
+        assert list(iter_tracebacks(str(tmp_path))) == expected
+        assert list(iter_tracebacks(str(tmp_path), n_jobs=2)) == expected
+
+    # failing to write the summary does not fail the crash report
+    with mock.patch("pickle.dump", mock.MagicMock()):
+        with mock.patch(
+            "nipype.pipeline.plugins.tools.crash2json", side_effect=OSError
+        ):
+            crashfile = report_crash(mock_node, traceback=traceback, hostname="host")
+    assert os.path.exists(crashfile)
+    os.remove(crashfile)
+
+    # crash files without summary are unpickled
+    for cf in crashfiles:
+        os.remove(crash_summary_file(cf))
+    with mock.patch(
+        "nipype.scripts.crash_files.loadcrash",
+        return_value=dict(traceback=traceback),
+    ) as mock_loadcrash:
+        assert list(iter_tracebacks(str(tmp_path), n_jobs=2)) == expected
+        assert mock_loadcrash.call_count == 3
 
 
 """
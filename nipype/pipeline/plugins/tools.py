@@ -11,7 +11,7 @@ from time import strftime
 from traceback import format_exception
 
 from ... import logging
-from ...utils.filemanip import savepkl, crash2txt
+from ...utils.filemanip import savepkl, crash2txt, crash2json
 
 logger = logging.getLogger("nipype.workflow")
 
@@ -65,6 +65,11 @@ another exception occurred:\n\n{}.""".format(exc).splitlines(keepends=True)
         crash2txt(crashfile, dict(node=node, traceback=traceback))
     else:
         savepkl(crashfile, dict(node=node, traceback=traceback), versioning=True)
+        try:
+            crash2json(crashfile, dict(node=name, host=host, traceback=traceback))
+        except Exception as exc:
+            # The crash file is complete, only searching it will be slower
+            logger.warning("Could not write the summary of %s: %s", crashfile, exc)
     return crashfile
 
 
@@ -142,6 +147,8 @@ try:
 except Exception as e:
     etype, eval, etr = sys.exc_info()
     traceback = format_exception(etype,eval,etr)
+    # Which node of a fused chain failed
+    node_index = getattr(eval, 'node_index', None)
     if info is None or not os.path.exists(info['node'].output_dir()):
         result = None
         resultsfile = os.path.join(batchdir, 'crashdump_%s.pklz')
@@ -153,7 +160,7 @@ except Exception as e:
     if store_exception:
         cmdstr += """
     savepkl(resultsfile, dict(result=result, hostname=gethostname(),
-                              traceback=traceback))
+                              traceback=traceback, node_index=node_index))
 """
     else:
         cmdstr += """
@@ -162,7 +169,10 @@ except Exception as e:
                               traceback=traceback))
     else:
         from nipype.pipeline.plugins.base import report_crash
-        report_crash(info['node'], traceback, gethostname())
+        node = info['node']
+        if node_index is not None:
+            node = node.nodes[node_index]
+        report_crash(node, traceback, gethostname())
     raise Exception(e)
 """
     cmdstr = cmdstr % (mpl_backend, pkl_file, batch_dir, node.config, suffix)
@@ -33,18 +33,26 @@ def cli():
     callback=check_not_none,
     help="Regular expression to be searched in each traceback.",
 )
-def search(logdir, regex):
+@click.option(
+    "-j",
+    "--jobs",
+    type=int,
+    default=8,
+    help="Number of crash files read concurrently.",
+)
+def search(logdir, regex, jobs):
     """Search for tracebacks content.
 
     Search for traceback inside a folder of nipype crash log files that match
-    a given regular expression.
+    a given regular expression. The tracebacks are read from the JSON
+    summaries of the crash files, when available.
 
     Examples:\n
     nipypecli search nipype/wd/log -r '.*subject123.*'
     """
     from .crash_files import iter_tracebacks
 
-    for file, trace in iter_tracebacks(logdir):
+    for file, trace in iter_tracebacks(logdir, n_jobs=jobs):
         if regex.search(trace):
             click.echo("-" * len(file))
             click.echo(file)
@@ -1,10 +1,11 @@
 """Utilities to manipulate and search through .pklz crash files."""
 
 import os.path as op
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
 
 from traits.trait_errors import TraitError
-from nipype.utils.filemanip import loadcrash
+from nipype.utils.filemanip import loadcrash, load_json, crash_summary_file
 
 
 def load_pklz_traceback(crash_filepath):
@@ -19,7 +20,16 @@ def load_pklz_traceback(crash_filepath):
         return "\n".join(data["traceback"])
 
 
-def iter_tracebacks(logdir):
+def load_traceback(crash_filepath):
+    """Return the traceback message in the given crash file, reading it
+    from the JSON summary of the crash file if there is one."""
+    try:
+        return "\n".join(load_json(crash_summary_file(crash_filepath))["traceback"])
+    except (OSError, ValueError, KeyError):
+        return load_pklz_traceback(crash_filepath)
+
+
+def iter_tracebacks(logdir, n_jobs=1):
     """Return an iterator over each file path and
     traceback field inside `logdir`.
     Parameters
@@ -27,8 +37,8 @@ def iter_tracebacks(logdir):
     logdir: str
         Path to the log folder.
 
-    field: str
-        Field name to be read from the crash file.
+    n_jobs: int
+        Number of crash files read concurrently.
 
     Yields
     ------
@@ -38,8 +48,12 @@ def iter_tracebacks(logdir):
     """
     crash_files = sorted(glob(op.join(logdir, "*.pkl*")))
 
-    for cf in crash_files:
-        yield cf, load_pklz_traceback(cf)
+    if n_jobs > 1 and len(crash_files) > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            yield from zip(crash_files, pool.map(load_traceback, crash_files))
+    else:
+        for cf in crash_files:
+            yield cf, load_traceback(cf)
 
 
 def display_crash_file(crashfile, rerun, debug, directory):
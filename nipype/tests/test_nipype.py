@@ -95,3 +95,70 @@ def test_no_et_multiproc(tmp_path, plugin, run_without_submitting):
         wf.add_nodes([n])
         res = wf.run(plugin=plugin, plugin_args={"n_procs": 1})
         assert next(iter(res.nodes)).result.outputs.out is expectation
+
+
+def _importtime(statement):
+    """Run ``statement`` in a fresh interpreter with ``-X importtime``.
+
+    Returns a dict mapping imported module names to their cumulative
+    import time in microseconds.
+    """
+    import subprocess
+    import sys
+
+    env = dict(os.environ, NIPYPE_NO_ET="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            modules[name.strip()] = int(cumulative)
+        except ValueError:  # header line
+            continue
+    return modules
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import nipype",
+        "from nipype import config, logging",
+        "import nipype.interfaces",
+        "import nipype.pipeline",
+    ],
+)
+def test_import_is_lazy(statement):
+    """Importing the top-level packages must not load the heavy machinery."""
+    modules = _importtime(statement)
+    heavy = {
+        "numpy",
+        "scipy",
+        "networkx",
+        "simplejson",
+        "nibabel",
+        "nipype.interfaces.base",
+        "nipype.interfaces.io",
+        "nipype.pipeline.engine",
+    }
+    assert not heavy.intersection(modules)
+
+
+def test_lazy_attributes():
+    import nipype
+    from nipype.pipeline.engine import Node, Workflow
+    from nipype.interfaces.utility import IdentityInterface
+
+    assert nipype.Node is Node
+    assert nipype.pipeline.Workflow is Workflow
+    assert nipype.interfaces.IdentityInterface is IdentityInterface
+    assert {"Node", "Workflow", "DataSink", "interfaces"} <= set(dir(nipype))
+    with pytest.raises(AttributeError):
+        nipype.NotAnAttribute
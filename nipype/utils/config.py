@@ -17,8 +17,6 @@ from warnings import warn
 from looseversion import LooseVersion
 import configparser
 
-from simplejson import load, dump
-
 from .misc import str2bool
 from filelock import SoftFileLock
 
@@ -51,6 +49,8 @@ remove_node_directories = false
 remove_unnecessary_outputs = true
 try_hard_link_datasink = true
 single_thread_matlab = true
+matlab_sessions = false
+fuse_nodes = false
 crashfile_format = pklz
 stop_on_first_crash = false
 stop_on_first_rerun = false
@@ -61,6 +61,7 @@ parameterize_dirs = true
 poll_sleep_duration = 2
 xvfb_max_wait = 10
 check_version = true
+tool_version_cache = false
 
 [monitoring]
 enabled = false
@@ -203,6 +204,8 @@ class NipypeConfig:
 
     def get_data(self, key):
         """Read options file"""
+        from simplejson import load
+
         if not os.path.exists(self.data_file):
             return None
         with SoftFileLock("%s.lock" % self.data_file):
@@ -214,6 +217,8 @@ class NipypeConfig:
 
     def save_data(self, key, value):
         """Store config file"""
+        from simplejson import load, dump
+
         datadict = {}
         if os.path.exists(self.data_file):
             with SoftFileLock("%s.lock" % self.data_file):
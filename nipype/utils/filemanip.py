@@ -19,7 +19,6 @@ import posixpath
 from pathlib import Path
 import simplejson as json
 from time import sleep, time
-import scipy.io as sio
 
 from .. import logging, config, __version__ as version
 from .misc import is_container
@@ -659,6 +658,34 @@ def crash2txt(filename, record):
         fp.write("".join(record["traceback"]))
 
 
+def crash_summary_file(crashfile):
+    """Return the path of the JSON summary of a pickled crash file
+
+    Summaries are kept in a hidden folder of the crash directory, apart
+    from the crash files.
+
+    >>> crash_summary_file('/tmp/crash-20200101-000000-user-node-1234.pklz')
+    '/tmp/.crash_summaries/crash-20200101-000000-user-node-1234.json'
+
+    """
+    crashdir, fname = op.split(crashfile)
+    return op.join(crashdir, ".crash_summaries", op.splitext(fname)[0] + ".json")
+
+
+def crash2json(crashfile, record):
+    """Write out the summary of a pickled crash file
+
+    The summary holds the name of the node, the host and the traceback, and
+    can be searched without unpickling (and importing) the crashed node.
+    """
+    summary = {key: str(value) for key, value in record.items()}
+    summary["traceback"] = [str(line) for line in record["traceback"]]
+    summary_file = crash_summary_file(crashfile)
+    os.makedirs(op.dirname(summary_file), exist_ok=True)
+    with open(summary_file, "w") as fp:
+        json.dump(summary, fp)
+
+
 def read_stream(stream, logger=None, encoding=None):
     """
     Robustly reads a stream, sending a warning to a logger
@@ -929,6 +956,8 @@ def indirectory(path):
 
 
 def load_spm_mat(spm_mat_file, **kwargs):
+    import scipy.io as sio
+
     try:
         mat = sio.loadmat(spm_mat_file, **kwargs)
     except NotImplementedError:
@@ -4,6 +4,7 @@ are avoided to keep namespace as clear as possible.
 """
 
 import inspect
+from functools import lru_cache
 from textwrap import dedent
 
 
@@ -22,7 +23,17 @@ def create_function_from_source(function_source, imports=None):
     imports : list of strings
         list of import statements in string form that allow the function
         to be executed in an otherwise empty namespace
+
+    Function objects are compiled once per process for each source and
+    imports, and shared by all the callers requesting them.
     """
+    if imports is not None:
+        imports = tuple(imports)
+    return _compile_function(function_source, imports)
+
+
+@lru_cache(maxsize=1024)
+def _compile_function(function_source, imports):
     ns = {}
     import_keys = []
 
@@ -1,6 +1,9 @@
 """Image manipulation utilities (mostly, NiBabel manipulations)."""
 
+import os.path as op
+
 import nibabel as nb
+import numpy as np
 
 
 def copy_header(header_file, in_file, keep_dtype=True):
@@ -17,3 +20,69 @@ def copy_header(header_file, in_file, keep_dtype=True):
 
     new_img.to_filename(in_file)
     return in_file
+
+
+def is_compressed(img):
+    """Whether reading the data of ``img`` requires decompressing a file.
+
+    Compressed files cannot be memory-mapped, and reading them in several
+    non-sequential pieces decompresses them over and over.
+    """
+    fname = getattr(img.dataobj, "file_like", None)
+    return isinstance(fname, str) and op.splitext(fname)[1] in (".gz", ".bz2", ".zst")
+
+
+def iter_volume_blocks(dataobj, slab=(), size=32):
+    """Iterate over the volumes of a 4D array (or proxy) in float32 blocks.
+
+    Parameters
+    ----------
+    dataobj : array-like
+        The 4D data (e.g., the ``dataobj`` of a NiBabel image).
+    slab : tuple of slices
+        Restricts the blocks to a spatial region (see :func:`map_slabs`).
+    size : int
+        Number of volumes per block.
+
+    Yields the slice of volumes and the corresponding block, so that the
+    whole series is never loaded at once.
+
+    >>> data = np.arange(2 * 2 * 2 * 5).reshape((2, 2, 2, 5))
+    >>> [(tslice.start, block.shape) for tslice, block in iter_volume_blocks(
+    ...     data, (slice(None), slice(None), slice(0, 1)), size=3)]
+    [(0, (2, 2, 1, 3)), (3, (2, 2, 1, 2))]
+
+    """
+    slab = tuple(slab) + (slice(None),) * (3 - len(slab))
+    timepoints = dataobj.shape[-1]
+    for t0 in range(0, timepoints, size):
+        tslice = slice(t0, min(t0 + size, timepoints))
+        yield tslice, np.asarray(dataobj[slab + (tslice,)], dtype=np.float32)
+
+
+def map_slabs(func, shape, slab_size=None, num_threads=1):
+    """Call ``func`` on the slabs that cover a volume of ``shape``.
+
+    Slabs are sets of ``slab_size`` consecutive slices along the third axis,
+    given to ``func`` as tuples of slices that index the spatial dimensions.
+    With ``num_threads > 1``, slabs are processed by a pool of threads, which
+    is effective when ``func`` spends its time in NumPy routines releasing the
+    GIL.
+
+    >>> map_slabs(lambda slab: slab[2], (4, 4, 5), slab_size=2)
+    [slice(0, 2, None), slice(2, 4, None), slice(4, 5, None)]
+
+    Returns the list of results, in order.
+    """
+    nslices = shape[2]
+    slab_size = slab_size or nslices
+    slabs = [
+        (slice(None), slice(None), slice(k0, min(k0 + slab_size, nslices)))
+        for k0 in range(0, nslices, slab_size)
+    ]
+    if num_threads > 1 and len(slabs) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=num_threads) as pool:
+            return list(pool.map(func, slabs))
+    return [func(slab) for slab in slabs]
@@ -0,0 +1,55 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Helpers to defer imports of heavy modules until they are first used."""
+
+from importlib import import_module
+
+
+def lazy_module_attrs(package, attrs, submodules=()):
+    """Build module-level ``__getattr__`` and ``__dir__`` for lazy loading.
+
+    Parameters
+    ----------
+    package : str
+        The ``__name__`` of the package that defines the lazy attributes.
+    attrs : dict
+        Maps public attribute names to the (relative) module that defines
+        them, e.g. ``{"Node": ".pipeline"}``.
+    submodules : iterable of str
+        Names of subpackages/submodules that should be importable through
+        plain attribute access (e.g. ``nipype.interfaces``).
+
+    Returns
+    -------
+    tuple
+        ``(__getattr__, __dir__)`` functions following :pep:`562`.
+        Resolved attributes are stored in the package namespace, so each
+        name is only looked up once.
+
+    Examples
+    --------
+    >>> __getattr__, __dir__ = lazy_module_attrs(
+    ...     "nipype", {"Workflow": ".pipeline"})
+    >>> __getattr__("Workflow").__name__
+    'Workflow'
+    >>> "Workflow" in __dir__()
+    True
+
+    """
+    submodules = frozenset(submodules)
+    module = import_module(package)
+
+    def __getattr__(name):
+        if name in attrs:
+            value = getattr(import_module(attrs[name], package), name)
+        elif name in submodules:
+            value = import_module("." + name, package)
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        setattr(module, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(module)) | set(attrs) | submodules)
+
+    return __getattr__, __dir__
@@ -10,8 +10,6 @@ from warnings import warn
 
 from looseversion import LooseVersion
 
-import numpy as np
-
 import textwrap
 
 
@@ -69,6 +67,8 @@ def trim(docstring, marker=None):
 
 def find_indices(condition):
     "Return the indices where ravel(condition) is true"
+    import numpy as np
+
     (res,) = np.nonzero(np.ravel(condition))
     return res
 
@@ -256,6 +256,8 @@ def normalize_mc_params(params, source):
         ry  Roll                (rad)
         rz  Yaw                 (rad)
     """
+    import numpy as np
+
     if source.upper() == "FSL":
         params = params[[3, 4, 5, 0, 1, 2]]
     elif source.upper() in ("AFNI", "FSFAST"):
@@ -224,3 +224,140 @@ class RamEstimator:
 
         estimator_string = " | ".join(debug_lines)
         return float(mem_gb), estimator_string
+
+
+class SlabRamEstimator(RamEstimator):
+    """
+    RAM estimator for interfaces that stream 4D images by spatial slabs.
+
+    Interfaces such as :class:`~nipype.algorithms.confounds.TSNR` and
+    :class:`~nipype.algorithms.misc.CalculateMedian` read their inputs
+    ``slab_size`` slices at a time (along the third axis), and process
+    ``num_threads`` slabs concurrently. The peak memory is then dominated by
+    those slabs, rather than by the full timeseries, plus the 3D maps
+    accumulated until they are written. These interfaces use this estimator
+    by default (see ``Node.ram_estimator``).
+
+    Examples
+    --------
+    ::
+
+        from nipype.algorithms.confounds import TSNR
+        from nipype.pipeline.engine import Node
+
+        tsnr = Node(TSNR(slab_size=8, num_threads=2), name="tsnr")
+        tsnr.ram_estimator = SlabRamEstimator(
+            inputs=("in_file",), bytes_per_voxel=8, n_outputs=3
+        )
+    """
+
+    def __init__(
+        self,
+        inputs=("in_file",),
+        bytes_per_voxel=8,
+        n_outputs=1,
+        sequential=False,
+        full_series=(),
+        overhead_gb=0.3,
+        min_gb=0.2,
+        max_gb=8.0,
+    ):
+        """
+        Parameters
+        ----------
+        inputs : tuple of str, optional
+            Names of the traits holding the (lists of) 4D images that are
+            streamed.
+
+        bytes_per_voxel : int, optional
+            Size of one sample of a slab, once read and cast for processing.
+
+        n_outputs : int, optional
+            Number of 3D float64 maps that are held in memory until written.
+
+        sequential : bool, optional
+            Whether the images are processed one after the other (otherwise,
+            the slabs of all images are held together).
+
+        full_series : tuple of str, optional
+            Names of the traits that, when defined, make the interface read
+            the full series instead of slabs.
+
+        overhead_gb, min_gb, max_gb : float, optional
+            See :class:`RamEstimator`.
+        """
+        super().__init__(overhead_gb=overhead_gb, min_gb=min_gb, max_gb=max_gb)
+        self.inputs = tuple(inputs)
+        self.bytes_per_voxel = bytes_per_voxel
+        self.n_outputs = n_outputs
+        self.sequential = sequential
+        self.full_series = tuple(full_series)
+
+    def __call__(self, inputs):
+        """
+        Estimate RAM usage from the image shapes and the slab settings.
+
+        Returns
+        -------
+        mem_gb : float
+            Estimated RAM in GB
+        estimator_string : str
+            Debug string for node report
+        """
+        traits = inputs.traits()
+        slab_size = getattr(inputs, "slab_size", None)
+        if not isdefined(slab_size) or any(
+            isdefined(getattr(inputs, name, None)) for name in self.full_series
+        ):
+            slab_size = None
+        num_threads = getattr(inputs, "num_threads", 1)
+        if not isdefined(num_threads) or num_threads < 1:
+            num_threads = 1
+
+        images = []
+        debug_lines = []
+        for attr in self.inputs:
+            if attr not in traits:
+                debug_lines.append(f"{attr}: trait not found")
+                continue
+            val = getattr(inputs, attr)
+            if not isdefined(val) or val is None:
+                debug_lines.append(f"{attr}: undefined")
+                continue
+            for path in [val] if isinstance(val, str) else val:
+                if not os.path.exists(path):
+                    continue
+                try:
+                    shape = nib.load(path).header.get_data_shape()
+                except Exception:
+                    continue
+                images.append((tuple(shape) + (1,) * (4 - len(shape)), path))
+
+        slabs_gb = []
+        output_gb = 0.0
+        for shape, path in images:
+            nslices = shape[2]
+            # Compressed images are read whole
+            if slab_size is not None and not path.endswith(".gz"):
+                nslices = min(slab_size, shape[2]) * num_threads
+            voxels = math.prod(shape[:2]) * min(nslices, shape[2])
+            slabs_gb.append(
+                voxels * math.prod(shape[3:]) * self.bytes_per_voxel / (1024**3)
+            )
+            output_gb = max(output_gb, math.prod(shape[:3]) * 8 / (1024**3))
+
+        slab_gb = (max if self.sequential else sum)(slabs_gb or [0.0])
+        output_gb *= self.n_outputs
+        debug_lines.append(
+            f"images={len(images)}, slab_size={slab_size}, "
+            f"num_threads={num_threads}, slabs={slab_gb:.3f} GB, "
+            f"outputs={output_gb:.3f} GB"
+        )
+
+        mem_gb = slab_gb + output_gb + self.overhead_gb
+        debug_lines.append(
+            f"Overhead={self.overhead_gb} GB, total estimated RAM={mem_gb:.3f} GB"
+        )
+        mem_gb = self.clamp(mem_gb, self.min_gb, self.max_gb)
+        debug_lines.append(f"Clamp={mem_gb:.3f} GB")
+        return float(mem_gb), " | ".join(debug_lines)
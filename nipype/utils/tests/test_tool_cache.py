@@ -0,0 +1,101 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+import os
+import stat
+
+import pytest
+
+from nipype import config
+from nipype.interfaces.base import PackageInfo
+from nipype.utils import tool_cache as tc
+
+
+@pytest.fixture
+def version_tool(tmp_path, monkeypatch):
+    """A fake tool that reports its version and counts invocations."""
+    counter = tmp_path / "calls"
+    script = tmp_path / "bin" / "faketool"
+    script.parent.mkdir()
+
+    def write(version):
+        script.write_text(
+            f"#!/bin/sh\necho x >> '{counter}'\necho 'faketool v{version}'\n"
+        )
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    write("1.0")
+    monkeypatch.setenv("PATH", str(script.parent), prepend=os.pathsep)
+    monkeypatch.setattr(tc.tool_cache, "_filename", str(tmp_path / "cache.json"))
+    config.set("execution", "tool_version_cache", "true")
+
+    class FakeInfo(PackageInfo):
+        version_cmd = "faketool --version"
+
+        @staticmethod
+        def parse_version(raw_info):
+            return raw_info.split("v")[-1].strip()
+
+    def ncalls():
+        return len(counter.read_text().splitlines()) if counter.exists() else 0
+
+    yield FakeInfo, write, ncalls
+    config.set("execution", "tool_version_cache", "false")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="requires a POSIX shell")
+def test_version_cache_shared(version_tool):
+    FakeInfo, write, ncalls = version_tool
+
+    assert FakeInfo.version() == "1.0"
+    assert ncalls() == 1
+
+    # A new process would start with an empty class-level cache
+    FakeInfo._version = None
+    assert FakeInfo.version() == "1.0"
+    assert ncalls() == 1
+
+    # Updating the executable invalidates the entry
+    mtime = os.stat(tc.tool_signature(FakeInfo.version_cmd)[0]).st_mtime_ns
+    write("2.0")
+    os.utime(
+        tc.tool_signature(FakeInfo.version_cmd)[0], ns=(mtime + 10**9, mtime + 10**9)
+    )
+    FakeInfo._version = None
+    assert FakeInfo.version() == "2.0"
+    assert ncalls() == 2
+
+    # Explicit invalidation
+    tc.tool_cache.clear()
+    FakeInfo._version = None
+    assert FakeInfo.version() == "2.0"
+    assert ncalls() == 3
+
+
+@pytest.mark.skipif(os.name == "nt", reason="requires a POSIX shell")
+def test_version_cache_disabled(version_tool):
+    FakeInfo, _, ncalls = version_tool
+    config.set("execution", "tool_version_cache", "false")
+
+    assert FakeInfo.version() == "1.0"
+    FakeInfo._version = None
+    assert FakeInfo.version() == "1.0"
+    assert ncalls() == 2
+    assert not os.path.exists(tc.tool_cache.filename)
+
+
+def test_missing_tool_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(tc.tool_cache, "_filename", str(tmp_path / "cache.json"))
+    config.set("execution", "tool_version_cache", "true")
+    try:
+        calls = []
+
+        def probe():
+            calls.append(None)
+            return "1.0"
+
+        assert tc.cached_probe("key", "nonexistent_nipype_tool", probe) == "1.0"
+        assert tc.cached_probe("key", "nonexistent_nipype_tool", probe) == "1.0"
+        assert len(calls) == 2
+        assert not os.path.exists(tc.tool_cache.filename)
+    finally:
+        config.set("execution", "tool_version_cache", "false")
@@ -0,0 +1,153 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Persistent cache of external tool probes (versions, installation paths).
+
+Probing an external package (e.g., running ``afni --version`` or starting
+MATLAB to locate SPM) may take from a fraction of a second to tens of seconds,
+and it is repeated by every new process. When the ``tool_version_cache``
+option of the ``execution`` section is enabled, the outcome of these probes is
+stored in a JSON file within the nipype configuration directory, shared by all
+processes.
+
+Entries are keyed by the probe (e.g., the version command) and validated
+against the resolved path and modification time of the executable, so
+upgrading or switching tools (e.g., by altering ``$PATH``) invalidates them.
+"""
+
+import json
+import os
+import shlex
+
+from filelock import SoftFileLock
+
+from .. import config, logging
+from .filemanip import which
+
+logger = logging.getLogger("nipype.utils")
+
+
+def tool_signature(command):
+    """Identify the executable that would be run by ``command``.
+
+    Returns the resolved path and modification time (in nanoseconds) of the
+    executable, or ``None`` if it cannot be found.
+
+    >>> tool_signature("nonexistent_nipype_command --version") is None
+    True
+
+    """
+    try:
+        exe = shlex.split(command)[0]
+    except (ValueError, IndexError):
+        return None
+    path = which(exe) if os.path.basename(exe) == exe else exe
+    if not path:
+        return None
+    try:
+        path = os.path.realpath(path)
+        return [path, os.stat(path).st_mtime_ns]
+    except OSError:
+        return None
+
+
+class ToolCache:
+    """A JSON-backed store of tool probes that can be shared by processes.
+
+    >>> cache = ToolCache("tool_cache.json")
+    >>> cache.set("cmd", ["/usr/bin/cmd", 1], "1.0")
+    >>> cache.get("cmd", ["/usr/bin/cmd", 1])
+    '1.0'
+    >>> cache.get("cmd", ["/usr/bin/cmd", 2]) is None
+    True
+    >>> cache.clear()
+    >>> cache.get("cmd", ["/usr/bin/cmd", 1]) is None
+    True
+
+    """
+
+    def __init__(self, filename=None):
+        self._filename = filename
+
+    @property
+    def filename(self):
+        if self._filename is not None:
+            return self._filename
+        return os.path.join(os.path.dirname(config.data_file), "tool_cache.json")
+
+    def _load(self):
+        try:
+            with open(self.filename) as fobj:
+                return json.load(fobj)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key, signature):
+        """Return the cached value of ``key`` if ``signature`` is still valid."""
+        entry = self._load().get(key)
+        if entry is None or entry.get("signature") != signature:
+            return None
+        return entry.get("value")
+
+    def set(self, key, signature, value):
+        """Store ``value`` for ``key``, bound to ``signature``."""
+        dirname = os.path.dirname(self.filename)
+        try:
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            with SoftFileLock("%s.lock" % self.filename):
+                data = self._load()
+                data[key] = {"signature": signature, "value": value}
+                tmpfile = "%s.%d.tmp" % (self.filename, os.getpid())
+                with open(tmpfile, "w") as fobj:
+                    json.dump(data, fobj, sort_keys=True, indent=1)
+                os.replace(tmpfile, self.filename)
+        except OSError as e:
+            logger.debug("Could not update tool cache %s: %s", self.filename, e)
+
+    def clear(self, key=None):
+        """Remove ``key`` (or all the entries) from the cache."""
+        if not os.path.exists(self.filename):
+            return
+        with SoftFileLock("%s.lock" % self.filename):
+            if key is None:
+                os.remove(self.filename)
+                return
+            data = self._load()
+            if data.pop(key, None) is not None:
+                with open(self.filename, "w") as fobj:
+                    json.dump(data, fobj, sort_keys=True, indent=1)
+
+
+tool_cache = ToolCache()
+
+
+def cached_probe(key, command, probe):
+    """Return ``probe()``, reusing a previous result stored on disk.
+
+    Parameters
+    ----------
+    key : str
+        Identifies the probe within the cache.
+    command : str
+        The command line whose executable validates the cached entry.
+    probe : callable
+        Computes the (JSON-serializable) value. Results that are ``None`` are
+        never cached.
+
+    """
+    if not config.getboolean("execution", "tool_version_cache"):
+        return probe()
+
+    signature = tool_signature(command)
+    if signature is None:
+        return probe()
+
+    value = tool_cache.get(key, signature)
+    if value is not None:
+        logger.debug("Using cached probe for %s", key)
+        return value
+
+    value = probe()
+    if value is not None:
+        tool_cache.set(key, signature, value)
+    return value
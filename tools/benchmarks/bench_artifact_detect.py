@@ -0,0 +1,127 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare the global intensity computation of ArtifactDetect with the old loops
+
+``--runs`` runs of ``--timepoints`` volumes are written to a
+temporary directory, and the global signal of each run is computed for every
+``mask_type`` both by :func:`nipype.algorithms.rapidart._global_intensity`
+and by the volume-by-volume loops it replaced, which loaded the whole series
+with ``get_fdata``.
+
+Usage::
+
+    python tools/benchmarks/bench_artifact_detect.py --runs 4 --timepoints 600 \\
+        --ext .nii
+"""
+import argparse
+import os
+import os.path as op
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nibabel as nb  # noqa: E402
+import numpy as np  # noqa: E402
+
+from nipype.algorithms.rapidart import _global_intensity  # noqa: E402
+
+SETTINGS = [
+    ("spm_global", {"intersect_mask": True}),
+    ("spm_global", {"intersect_mask": False}),
+    ("thresh", {"mask_threshold": 500}),
+]
+
+
+def reference_global_intensity(
+    nim, mask_type, global_threshold=8.0, intersect_mask=True, mask_threshold=None
+):
+    """The volume-by-volume loops replaced by ``_global_intensity``."""
+    x, y, z, timepoints = nim.shape
+    data = nim.get_fdata(dtype=np.float32)
+    g = np.zeros((timepoints, 1))
+    if mask_type == "spm_global":
+        if intersect_mask:
+            mask = np.ones((x, y, z), dtype=bool)
+            for t0 in range(timepoints):
+                vol = data[:, :, :, t0]
+                mask = mask * (vol > (np.nanmean(vol) / global_threshold))
+            for t0 in range(timepoints):
+                g[t0] = np.nanmean(data[:, :, :, t0][mask])
+        else:
+            mask = np.zeros((x, y, z, timepoints))
+            for t0 in range(timepoints):
+                vol = data[:, :, :, t0]
+                mask_tmp = vol > (np.nanmean(vol) / global_threshold)
+                mask[:, :, :, t0] = mask_tmp
+                g[t0] = np.nansum(vol * mask_tmp) / np.nansum(mask_tmp)
+    else:
+        for t0 in range(timepoints):
+            vol = data[:, :, :, t0]
+            mask = vol > mask_threshold
+            g[t0] = np.nanmean(vol[mask])
+    return g, mask, nim.affine
+
+
+def make_runs(runs, timepoints, shape, base_dir, ext):
+    rng = np.random.default_rng(0)
+    brain = np.zeros(shape, dtype=np.float32)
+    brain[tuple(slice(s // 4, 3 * s // 4) for s in shape)] = 900
+    fnames = []
+    for i in range(runs):
+        data = brain[..., np.newaxis] + rng.uniform(
+            0, 100, shape + (timepoints,)
+        ).astype(np.float32)
+        fnames.append(op.join(base_dir, "run-%02d%s" % (i, ext)))
+        nb.Nifti1Image(data, np.eye(4)).to_filename(fnames[-1])
+    return fnames
+
+
+def bench(func, fnames, load_kwargs, *args, **kwargs):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    results = [func(nb.load(f, **load_kwargs), *args, **kwargs)[0] for f in fnames]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return results, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timepoints", type=int, default=300)
+    parser.add_argument("--shape", type=int, nargs=3, default=[64, 64, 36])
+    parser.add_argument("--ext", choices=[".nii.gz", ".nii"], default=".nii.gz")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        fnames = make_runs(
+            args.runs, args.timepoints, tuple(args.shape), base_dir, args.ext
+        )
+        for mask_type, kwargs in SETTINGS:
+            label = "%s %s" % (mask_type, kwargs)
+            expected, elapsed, peak = bench(
+                reference_global_intensity, fnames, {}, mask_type, **kwargs
+            )
+            print(
+                "%-45s loops    time=%.2fs peak=%.1fMB" % (label, elapsed, peak / 2**20)
+            )
+            result, elapsed, peak = bench(
+                _global_intensity,
+                fnames,
+                {"keep_file_open": True},
+                mask_type,
+                **kwargs,
+            )
+            error = max(
+                np.max(np.abs(r - e) / np.abs(e)) for r, e in zip(result, expected)
+            )
+            print(
+                "%-45s blocks   time=%.2fs peak=%.1fMB max-rel-err=%.1e"
+                % (label, elapsed, peak / 2**20, error)
+            )
+
+
+if __name__ == "__main__":
+    main()
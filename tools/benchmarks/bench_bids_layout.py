@@ -0,0 +1,90 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare BIDSDataGrabber queries with and without the shared layout cache
+
+A synthetic BIDS dataset of ``--subjects`` subjects (each with an anatomical
+and ``--runs`` functional runs) is written to a temporary directory, and one
+:class:`~nipype.interfaces.io.BIDSDataGrabber` per subject is run, first
+indexing the dataset every time and then with ``cache_layout`` enabled.
+Requires pybids.
+
+Usage::
+
+    python tools/benchmarks/bench_bids_layout.py --subjects 100 --runs 4
+"""
+import argparse
+import json
+import os
+import os.path as op
+import tempfile
+import time
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+from nipype.interfaces.io import BIDSDataGrabber  # noqa: E402
+
+
+def make_dataset(root, subjects, runs):
+    os.makedirs(root)
+    with open(op.join(root, "dataset_description.json"), "w") as fobj:
+        json.dump({"Name": "synthetic", "BIDSVersion": "1.6.0"}, fobj)
+    for i in range(subjects):
+        sub = "sub-%03d" % i
+        os.makedirs(op.join(root, sub, "anat"))
+        os.makedirs(op.join(root, sub, "func"))
+        open(op.join(root, sub, "anat", "%s_T1w.nii.gz" % sub), "w").close()
+        for run in range(runs):
+            prefix = op.join(
+                root, sub, "func", "%s_task-rest_run-%02d_bold" % (sub, run)
+            )
+            open(prefix + ".nii.gz", "w").close()
+            with open(prefix + ".json", "w") as fobj:
+                json.dump({"RepetitionTime": 2.0, "TaskName": "rest"}, fobj)
+
+
+def bench(root, subjects, cache_layout, cache_dir):
+    outputs = []
+    tic = time.perf_counter()
+    for i in range(subjects):
+        bg = BIDSDataGrabber(infields=["subject"])
+        bg.inputs.base_dir = root
+        bg.inputs.subject = "%03d" % i
+        bg.inputs.cache_layout = cache_layout
+        bg.inputs.layout_cache_dir = cache_dir
+        result = bg.run()
+        outputs.append((result.outputs.T1w, result.outputs.bold))
+    return outputs, time.perf_counter() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subjects", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=2)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as base_dir:
+        os.chdir(base_dir)
+        try:
+            root = op.join(base_dir, "ds")
+            cache_dir = op.join(base_dir, "layouts")
+            make_dataset(root, args.subjects, args.runs)
+            expected, elapsed = bench(root, args.subjects, False, cache_dir)
+            print(
+                "cache_layout=False subjects=%d time=%.2fs" % (args.subjects, elapsed)
+            )
+            result, elapsed = bench(root, args.subjects, True, cache_dir)
+            print(
+                "cache_layout=True  subjects=%d time=%.2fs mismatches=%d"
+                % (
+                    args.subjects,
+                    elapsed,
+                    sum(r != e for r, e in zip(result, expected)),
+                )
+            )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
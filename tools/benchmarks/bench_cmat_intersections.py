@@ -0,0 +1,127 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare the region intersection counting of CreateMatrix with the old loops
+
+``--fibers`` random-walk streamlines of ``--points`` points are traced in a
+parcellation of ``--rois`` regions, and the intersection connectivity matrix
+is computed by :func:`nipype.interfaces.cmtk.cmtk.create_allpoints_cmat` and
+by the per-point loops it replaced (on the first ``--reference-fibers``
+fibers only, they are slow).
+
+Usage::
+
+    python tools/benchmarks/bench_cmat_intersections.py --fibers 1000000 \\
+        --chunk-size 100000 --n-procs 4
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import numpy as np  # noqa: E402
+
+from nipype.interfaces.cmtk.cmtk import create_allpoints_cmat  # noqa: E402
+
+
+def reference_allpoints_cmat(streamlines, roiData, voxelSize, n_rois):
+    """The per-point and per-pair loops that ``create_allpoints_cmat`` replaced."""
+    connectivity_matrix = np.zeros((n_rois, n_rois), dtype=np.uint)
+    final_fiber_ids = []
+    for i, fiber in enumerate(streamlines):
+        rois_crossed = []
+        for point in fiber[0]:
+            x = int(point[0] / float(voxelSize[0]))
+            y = int(point[1] / float(voxelSize[1]))
+            z = int(point[2] / float(voxelSize[2]))
+            if roiData[x, y, z] != 0:
+                rois_crossed.append(roiData[x, y, z])
+        rois_crossed = list(dict.fromkeys(rois_crossed).keys())
+        if rois_crossed:
+            final_fiber_ids.append(i)
+        for idx_i, roi_i in enumerate(rois_crossed):
+            for idx_j, roi_j in enumerate(rois_crossed):
+                if idx_i > idx_j and roi_i != roi_j:
+                    connectivity_matrix[roi_i - 1, roi_j - 1] += 1
+    return connectivity_matrix + connectivity_matrix.T, final_fiber_ids
+
+
+def make_data(fibers, points, rois, shape=(128, 128, 80)):
+    rng = np.random.default_rng(0)
+    voxelSize = (1.5, 1.5, 1.5)
+    roiData = np.zeros(shape, dtype=np.int16)
+    blocks = np.ceil(rois ** (1 / 3)).astype(int)
+    labels = np.arange(1, blocks**3 + 1) % (rois + 1)
+    idx = np.indices(shape) * blocks // np.array(shape)[:, None, None, None]
+    roiData[:] = labels[np.ravel_multi_index(tuple(idx), (blocks,) * 3)]
+    extent = np.array(shape) * voxelSize - 1e-3
+    starts = rng.uniform(0, extent, (fibers, 1, 3))
+    walks = np.cumsum(rng.normal(0, 1, (fibers, points, 3)), axis=1)
+    tracks = np.clip(starts + walks, 0, extent).astype(np.float32)
+    return [(track, None, None) for track in tracks], roiData, voxelSize
+
+
+def bench(func, *args, **kwargs):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    result = func(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fibers", type=int, default=100000)
+    parser.add_argument("--points", type=int, default=60)
+    parser.add_argument("--rois", type=int, default=83)
+    parser.add_argument("--reference-fibers", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--n-procs", type=int, default=1)
+    args = parser.parse_args()
+
+    streamlines, roiData, voxelSize = make_data(args.fibers, args.points, args.rois)
+    subset = streamlines[: args.reference_fibers]
+    expected, elapsed, peak = bench(
+        reference_allpoints_cmat, subset, roiData, voxelSize, args.rois
+    )
+    print(
+        "loops      fibers=%-8d time=%.2fs peak=%.1fMB"
+        % (len(subset), elapsed, peak / 2**20)
+    )
+    result, elapsed, peak = bench(
+        create_allpoints_cmat, subset, roiData, voxelSize, args.rois
+    )
+    print(
+        "vectorized fibers=%-8d time=%.2fs peak=%.1fMB max-err=%d"
+        % (
+            len(subset),
+            elapsed,
+            peak / 2**20,
+            np.abs(result[0].astype(int) - expected[0].astype(int)).max(),
+        )
+    )
+    result, elapsed, peak = bench(
+        create_allpoints_cmat,
+        streamlines,
+        roiData,
+        voxelSize,
+        args.rois,
+        chunk_size=args.chunk_size,
+        n_procs=args.n_procs,
+    )
+    print(
+        "vectorized fibers=%-8d time=%.2fs peak=%.1fMB chunk=%s n_procs=%d"
+        % (
+            len(streamlines),
+            elapsed,
+            peak / 2**20,
+            args.chunk_size,
+            args.n_procs,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
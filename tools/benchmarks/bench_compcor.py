@@ -0,0 +1,96 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare the decompositions available to extract CompCor noise components
+
+A synthetic series of ``--voxels`` voxels and ``--timepoints`` volumes,
+mixing ``--components`` temporal sources, is decomposed with every
+``svd_method``. The reported error is the largest difference between the
+retained components and those of the full SVD (up to sign).
+
+Usage::
+
+    python tools/benchmarks/bench_compcor.py --voxels 100000 --timepoints 600 \\
+        --components 5 --chunk-size 10000
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nibabel as nb  # noqa: E402
+import numpy as np  # noqa: E402
+
+from nipype.algorithms.confounds import compute_noise_components  # noqa: E402
+
+
+def make_data(voxels, timepoints, sources):
+    rng = np.random.default_rng(0)
+    signals = rng.standard_normal((sources, timepoints))
+    weights = rng.standard_normal((voxels, sources)) * np.linspace(5, 1, sources)
+    data = weights.dot(signals) + rng.standard_normal((voxels, timepoints))
+    data = (1000 + data).astype(np.float32).reshape((voxels, 1, 1, timepoints))
+    mask = nb.Nifti1Image(np.ones((voxels, 1, 1), dtype=np.uint8), np.eye(4))
+    return data, mask
+
+
+def bench(data, mask, components, svd_method, chunk_size):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    result = compute_noise_components(
+        data,
+        [mask],
+        components,
+        filter_type="polynomial",
+        degree=1,
+        svd_method=svd_method,
+        chunk_size=chunk_size,
+    )[0]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--voxels", type=int, default=50000)
+    parser.add_argument("--timepoints", type=int, default=400)
+    parser.add_argument("--components", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    data, mask = make_data(args.voxels, args.timepoints, args.components)
+    expected = None
+    for svd_method, chunk_size in (
+        ("full", None),
+        ("gram", None),
+        ("gram", args.chunk_size),
+        ("randomized", None),
+        ("randomized", args.chunk_size),
+    ):
+        components, elapsed, peak = bench(
+            data, mask, args.components, svd_method, chunk_size
+        )
+        if expected is None:
+            expected = components
+        error = np.max(
+            np.minimum(np.abs(components - expected), np.abs(components + expected))
+        )
+        print(
+            "%-10s chunk=%-6s voxels=%d timepoints=%d time=%.2fs peak=%.1fMB "
+            "max-err=%.1e"
+            % (
+                svd_method,
+                chunk_size,
+                args.voxels,
+                args.timepoints,
+                elapsed,
+                peak / 2**20,
+                error,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
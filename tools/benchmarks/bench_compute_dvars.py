@@ -0,0 +1,137 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare the time and memory of compute_dvars with the per-voxel version
+
+A synthetic AR(1) timeseries of ``--voxels`` voxels and ``--timepoints``
+volumes is written to a temporary NIfTI file. The reference implementation
+fits the Yule-Walker equations voxel by voxel (as nitime's ``AR_est_YW``
+did before the estimate was batched) and is skipped with ``--no-reference``.
+
+Usage::
+
+    python tools/benchmarks/bench_compute_dvars.py --voxels 200000 \\
+        --timepoints 1000 --chunk-size 20000
+"""
+import argparse
+import os
+import os.path as op
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nibabel as nb  # noqa: E402
+import numpy as np  # noqa: E402
+
+from nipype.algorithms.confounds import compute_dvars, regress_poly  # noqa: E402
+
+
+def _yule_walker_ar1(x):
+    x = x - x.mean()
+    rxx = np.correlate(x, x, mode="full")[len(x) - 1 :] / len(x)
+    rxx = rxx / rxx[0]
+    return np.linalg.solve(np.atleast_2d(rxx[0]), rxx[1:2])
+
+
+def reference_dvars(in_file, in_mask, intensity_normalization=1000):
+    """The implementation that ``compute_dvars`` replaced."""
+    func = np.float32(nb.load(in_file).dataobj)
+    mask = np.bool_(nb.load(in_mask).dataobj)
+    mfunc = func[mask]
+    if intensity_normalization != 0:
+        mfunc = (mfunc / np.median(mfunc)) * intensity_normalization
+    func_sd = (
+        np.percentile(mfunc, 75, axis=1, method="lower")
+        - np.percentile(mfunc, 25, axis=1, method="lower")
+    ) / 1.349
+    ar1 = np.apply_along_axis(
+        _yule_walker_ar1,
+        1,
+        regress_poly(0, mfunc, remove_mean=True)[0].astype(np.float32),
+    )
+    diff_sdhat = np.squeeze(np.sqrt(((1 - ar1) * 2).tolist())) * func_sd
+    diff_sd_mean = diff_sdhat.mean()
+    func_diff = np.diff(mfunc, axis=1)
+    dvars_nstd = np.sqrt(np.square(func_diff).mean(axis=0))
+    dvars_stdz = dvars_nstd / diff_sd_mean
+    with warnings.catch_warnings():
+        warnings.filterwarnings("error")
+        diff_vx_stdz = np.square(
+            func_diff / np.array([diff_sdhat] * func_diff.shape[-1]).T
+        )
+        dvars_vx_stdz = np.sqrt(diff_vx_stdz.mean(axis=0))
+    return (dvars_stdz, dvars_nstd, dvars_vx_stdz)
+
+
+def make_data(voxels, timepoints, base_dir):
+    rng = np.random.default_rng(0)
+    side = int(np.ceil(voxels ** (1 / 3)))
+    data = rng.standard_normal((side**3, timepoints)).astype(np.float32)
+    for t in range(1, timepoints):
+        data[:, t] += 0.3 * data[:, t - 1]
+    data = 1000 + 10 * data
+    mask = np.zeros(side**3, dtype=np.uint8)
+    mask[:voxels] = 1
+
+    in_file = op.join(base_dir, "func.nii")
+    in_mask = op.join(base_dir, "mask.nii")
+    nb.Nifti1Image(data.reshape((side,) * 3 + (timepoints,)), np.eye(4)).to_filename(
+        in_file
+    )
+    nb.Nifti1Image(mask.reshape((side,) * 3), np.eye(4)).to_filename(in_mask)
+    return in_file, in_mask
+
+
+def bench(func, *args, **kwargs):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    result = func(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--voxels", type=int, default=50000)
+    parser.add_argument("--timepoints", type=int, default=300)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--no-reference", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        in_file, in_mask = make_data(args.voxels, args.timepoints, base_dir)
+
+        runs = [
+            ("batched", compute_dvars, {}),
+            ("chunked", compute_dvars, {"chunk_size": args.chunk_size}),
+        ]
+        if not args.no_reference:
+            runs.insert(0, ("per-voxel", reference_dvars, {}))
+
+        expected = None
+        for label, func, kwargs in runs:
+            result, elapsed, peak = bench(func, in_file, in_mask, **kwargs)
+            if expected is None:
+                expected = result
+            print(
+                "%-10s voxels=%d timepoints=%d time=%.2fs peak=%.1fMB "
+                "max-rel-err=%.1e"
+                % (
+                    label,
+                    args.voxels,
+                    args.timepoints,
+                    elapsed,
+                    peak / 2**20,
+                    max(
+                        np.max(np.abs(r - e) / np.abs(e))
+                        for r, e in zip(result, expected)
+                    ),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare searching crash files through their JSON summaries and pickles
+
+A crash file of a :class:`~nipype.interfaces.utility.Function` node is
+written ``--files`` times (with different tracebacks) by
+:func:`~nipype.pipeline.plugins.tools.report_crash`, and the tracebacks are
+searched as ``nipypecli search`` does, first unpickling every crash file, one
+after the other (the summaries are hidden), and then reading the summaries
+with ``--jobs`` threads.
+
+Usage::
+
+    python tools/benchmarks/bench_crash_search.py --files 10000 --jobs 8
+"""
+import argparse
+import logging
+import os
+import os.path as op
+import re
+import tempfile
+import time
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nipype.pipeline.engine as pe  # noqa: E402
+from nipype.interfaces.utility import Function  # noqa: E402
+from nipype.pipeline.plugins.tools import report_crash  # noqa: E402
+from nipype.scripts.crash_files import iter_tracebacks  # noqa: E402
+
+
+def segment(in_file, threshold):
+    return in_file
+
+
+def make_crash_files(crashdir, files):
+    node = pe.Node(
+        Function(function=segment, input_names=["in_file", "threshold"]),
+        name="segment",
+        base_dir=crashdir,
+    )
+    node.inputs.threshold = 0.5
+    node.config = {"execution": {"crashdump_dir": crashdir, "crashfile_format": "pklz"}}
+    for i in range(files):
+        report_crash(node, traceback=["ValueError: sub-%05d\n" % i])
+
+
+def bench(crashdir, n_jobs, regex):
+    tic = time.perf_counter()
+    found = [
+        cf for cf, trace in iter_tracebacks(crashdir, n_jobs) if regex.search(trace)
+    ]
+    return found, time.perf_counter() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.getLogger("nipype.workflow").setLevel(logging.CRITICAL)
+    regex = re.compile("sub-0000[0-9]")
+    with tempfile.TemporaryDirectory() as crashdir:
+        make_crash_files(crashdir, args.files)
+        summaries = op.join(crashdir, ".crash_summaries")
+        os.rename(summaries, summaries + ".hidden")
+        expected, elapsed = bench(crashdir, 1, regex)
+        print("pickles   files=%d time=%.2fs" % (args.files, elapsed))
+        os.rename(summaries + ".hidden", summaries)
+        result, elapsed = bench(crashdir, args.jobs, regex)
+        print(
+            "summaries files=%d time=%.2fs found=%d mismatches=%d"
+            % (args.files, elapsed, len(result), len(set(result) ^ set(expected)))
+        )
+
+
+if __name__ == "__main__":
+    main()
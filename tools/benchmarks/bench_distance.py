@@ -0,0 +1,126 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare the KD-tree surface distances of Distance with dense cdist matrices
+
+Two label maps of ``--shape`` voxels at 0.5mm resolution, each holding
+``--labels`` spheres of radius ``--radius`` voxels, are written to a
+temporary directory. The distances of every label are computed in one run
+of :class:`~nipype.algorithms.metrics.Distance` with ``multilabel=True``,
+and label by label with the dense ``cdist`` matrices it replaced (skipped
+with ``--no-reference``, they need O(N x M) memory).
+
+Usage::
+
+    python tools/benchmarks/bench_distance.py --shape 256 256 256 \\
+        --radius 30 --method eucl_max
+"""
+import argparse
+import os
+import os.path as op
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nibabel as nb  # noqa: E402
+import numpy as np  # noqa: E402
+from scipy.ndimage import binary_erosion  # noqa: E402
+from scipy.spatial.distance import cdist  # noqa: E402
+
+from nipype.algorithms.metrics import Distance  # noqa: E402
+
+
+def _border(data, affine):
+    border = data & ~binary_erosion(data)
+    return nb.affines.apply_affine(affine, np.argwhere(border))
+
+
+def reference_distance(fname1, fname2, method):
+    """The dense distance matrices used before, one label at a time."""
+    nii1 = nb.load(fname1)
+    nii2 = nb.load(fname2)
+    data1 = np.asanyarray(nii1.dataobj)
+    data2 = np.asanyarray(nii2.dataobj)
+    distances = []
+    for label in np.unique(data1[data1 > 0]):
+        set1 = _border(data1 == label, nii1.affine)
+        set2 = _border(data2 == label, nii2.affine)
+        dist_matrix = cdist(set1, set2)
+        if method == "eucl_min":
+            distances.append(dist_matrix.min())
+        else:
+            distances.append(
+                max(dist_matrix.min(axis=0).max(), dist_matrix.min(axis=1).max())
+            )
+    return np.array(distances)
+
+
+def make_labels(shape, labels, radius, base_dir):
+    rng = np.random.default_rng(0)
+    grid = np.ogrid[tuple(slice(0, s) for s in shape)]
+    affine = np.diag([0.5, 0.5, 0.5, 1])
+    fnames = []
+    centers = rng.uniform(radius + 2, np.array(shape) - radius - 2, (labels, 3))
+    for i in range(2):
+        data = np.zeros(shape, dtype=np.int16)
+        for label, center in enumerate(centers, 1):
+            center = center + rng.normal(0, 1, 3) * i
+            dist2 = sum((g - c) ** 2 for g, c in zip(grid, center))
+            data[dist2 <= radius**2] = label
+        fnames.append(op.join(base_dir, "labels%d.nii" % i))
+        nb.Nifti1Image(data, affine).to_filename(fnames[-1])
+    return fnames
+
+
+def bench(func, *args):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shape", type=int, nargs=3, default=[160, 160, 160])
+    parser.add_argument("--labels", type=int, default=4)
+    parser.add_argument("--radius", type=int, default=20)
+    parser.add_argument(
+        "--method", choices=["eucl_min", "eucl_max"], default="eucl_max"
+    )
+    parser.add_argument("--no-reference", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        fnames = make_labels(tuple(args.shape), args.labels, args.radius, base_dir)
+
+        def run_interface(fname1, fname2, method):
+            cwd = os.getcwd()
+            os.chdir(base_dir)
+            try:
+                res = Distance(
+                    volume1=fname1, volume2=fname2, method=method, multilabel=True
+                ).run()
+            finally:
+                os.chdir(cwd)
+            return np.array(res.outputs.label_distances)
+
+        expected = None
+        if not args.no_reference:
+            expected, elapsed, peak = bench(reference_distance, *fnames, args.method)
+            print(
+                "cdist   %s labels=%d time=%.2fs peak=%.1fMB"
+                % (args.method, args.labels, elapsed, peak / 2**20)
+            )
+        result, elapsed, peak = bench(run_interface, *fnames, args.method)
+        error = np.nan if expected is None else np.max(np.abs(result - expected))
+        print(
+            "kd-tree %s labels=%d time=%.2fs peak=%.1fMB max-err=%.1e"
+            % (args.method, args.labels, elapsed, peak / 2**20, error)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare running chains of Function nodes with and without lightweight mode
+
+A workflow chaining ``--nodes`` trivial :class:`~nipype.interfaces.utility.Function`
+nodes is run with the ``--plugin``, first materializing the working directory
+of every node and then with all of them in lightweight mode, which keeps the
+results in memory.
+
+Usage::
+
+    python tools/benchmarks/bench_function_nodes.py --nodes 10000 \\
+        --plugin Linear
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nipype.pipeline.engine as pe  # noqa: E402
+from nipype.interfaces.utility import Function  # noqa: E402
+
+
+def increment(x):
+    return x + 1
+
+
+def make_workflow(nodes, lightweight, base_dir):
+    wf = pe.Workflow(name="chain", base_dir=base_dir)
+    previous = None
+    for i in range(nodes):
+        node = pe.Node(
+            Function(function=increment),
+            name="increment%05d" % i,
+            lightweight=lightweight,
+        )
+        if previous is None:
+            node.inputs.x = 0
+        else:
+            wf.connect(previous, "out", node, "x")
+        previous = node
+    return wf, previous.name
+
+
+def bench(nodes, lightweight, plugin, base_dir):
+    tic = time.perf_counter()
+    wf, last = make_workflow(nodes, lightweight, base_dir)
+    execgraph = wf.run(plugin=plugin)
+    elapsed = time.perf_counter() - tic
+    result = [node for node in execgraph.nodes() if node.name == last][0].result
+    return result.outputs.out, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--plugin", default="Linear")
+    args = parser.parse_args()
+
+    logging.getLogger("nipype.workflow").setLevel(logging.WARNING)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as base_dir:
+        os.chdir(base_dir)
+        try:
+            for lightweight in (False, True):
+                out, elapsed = bench(
+                    args.nodes,
+                    lightweight,
+                    args.plugin,
+                    os.path.join(base_dir, str(lightweight)),
+                )
+                print(
+                    "lightweight=%-5s nodes=%d time=%.2fs per-node=%.2fms "
+                    "output-ok=%s"
+                    % (
+                        lightweight,
+                        args.nodes,
+                        elapsed,
+                        1e3 * elapsed / args.nodes,
+                        out == args.nodes,
+                    )
+                )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare BaseTraitedSpec.get_hashval with the metadata walk it replaced
+
+The inputs of every interface found in the ``--packages`` are filled with
+files, numbers and strings (the first value each trait accepts), and hashed
+``--repeat`` times both by :meth:`BaseTraitedSpec.get_hashval`, which follows
+the per-class hash plan, and by the implementation it replaced, which queried
+the metadata of every trait and walked every value twice.
+
+Usage::
+
+    python tools/benchmarks/bench_hashval.py --repeat 50 --packages fsl afni
+"""
+import argparse
+import importlib
+import inspect
+import os
+import tempfile
+import time
+import warnings
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+from nipype.interfaces.base import BaseInterface, isdefined  # noqa: E402
+from nipype.utils.filemanip import md5  # noqa: E402
+
+PACKAGES = ["afni", "ants", "freesurfer", "fsl", "mrtrix3", "spm", "utility"]
+VALUES = [
+    "in_file.nii",
+    ["in_file.nii", "other_file.nii"],
+    3,
+    2.5,
+    True,
+    (1.0, 2.0, 3.0),
+    "some string",
+]
+
+
+def reference_get_hashval(spec, hash_method=None):
+    """``BaseTraitedSpec.get_hashval`` before hash plans."""
+    list_withhash = []
+    list_nofilename = []
+    for name, val in sorted(spec.trait_get().items()):
+        if not isdefined(val) or spec.has_metadata(name, "nohash", True):
+            continue
+        hash_files = not spec.has_metadata(
+            name, "hash_files", False
+        ) and not spec.has_metadata(name, "name_source")
+        list_nofilename.append(
+            (
+                name,
+                spec._get_sorteddict(
+                    val, hash_method=hash_method, hash_files=hash_files
+                ),
+            )
+        )
+        list_withhash.append(
+            (
+                name,
+                spec._get_sorteddict(
+                    val, True, hash_method=hash_method, hash_files=hash_files
+                ),
+            )
+        )
+    return list_withhash, md5(str(list_nofilename).encode()).hexdigest()
+
+
+def collect_specs(packages):
+    specs = []
+    for package in packages:
+        try:
+            module = importlib.import_module("nipype.interfaces.%s" % package)
+        except ImportError:
+            continue
+        for _, klass in inspect.getmembers(module, inspect.isclass):
+            if not issubclass(klass, BaseInterface) or klass.input_spec is None:
+                continue
+            try:
+                spec = klass.input_spec()
+            except Exception:
+                continue
+            for name in spec.copyable_trait_names():
+                for value in VALUES:
+                    try:
+                        setattr(spec, name, value)
+                        break
+                    except Exception:
+                        pass
+            specs.append(spec)
+    return specs
+
+
+def bench(func, specs, repeat):
+    tic = time.perf_counter()
+    for _ in range(repeat):
+        results = [func(spec, "timestamp") for spec in specs]
+    return results, time.perf_counter() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--packages", nargs="+", default=PACKAGES)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as base_dir, warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        os.chdir(base_dir)
+        try:
+            for fname in ("in_file.nii", "other_file.nii"):
+                with open(fname, "w") as fobj:
+                    fobj.write(fname)
+            specs = collect_specs(args.packages)
+            expected, elapsed = bench(reference_get_hashval, specs, args.repeat)
+            print("metadata specs=%d time=%.2fs" % (len(specs), elapsed))
+            result, elapsed = bench(
+                lambda spec, hash_method: spec.get_hashval(hash_method),
+                specs,
+                args.repeat,
+            )
+            print(
+                "plan     specs=%d time=%.2fs mismatches=%d"
+                % (
+                    len(specs),
+                    elapsed,
+                    sum(r != e for r, e in zip(result, expected)),
+                )
+            )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
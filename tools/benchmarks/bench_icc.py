@@ -0,0 +1,114 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare the ICC interface with the per-voxel ICC_rep_anova loop
+
+A synthetic dataset of ``--subjects`` x ``--sessions`` 3D maps with
+``--voxels`` voxels is written to a temporary directory and processed both by
+the :class:`~nipype.algorithms.icc.ICC` interface and by the implementation it
+replaced, which loaded every image with ``get_fdata()`` and called
+``ICC_rep_anova`` voxel by voxel.
+
+Usage::
+
+    python tools/benchmarks/bench_icc.py --voxels 200000 --chunk-size 50000
+"""
+import argparse
+import os
+import os.path as op
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nibabel as nb  # noqa: E402
+import numpy as np  # noqa: E402
+
+from nipype.algorithms.icc import ICC, ICC_rep_anova  # noqa: E402
+
+
+def reference_icc(subjects_sessions, mask):
+    """The per-voxel loop that the ICC interface replaced."""
+    maskdata = nb.load(mask).get_fdata()
+    maskdata = np.logical_not(np.logical_or(maskdata == 0, np.isnan(maskdata)))
+    session_datas = [
+        [nb.load(fname).get_fdata()[maskdata].reshape(-1, 1) for fname in sessions]
+        for sessions in subjects_sessions
+    ]
+    all_data = np.hstack([np.dstack(session_data) for session_data in session_datas])
+    icc = np.zeros(all_data.shape[0])
+    for x in range(icc.shape[0]):
+        icc[x] = ICC_rep_anova(all_data[x, :, :])[0]
+    new_data = np.zeros(maskdata.shape)
+    new_data[maskdata] = icc
+    return new_data
+
+
+def make_data(voxels, subjects, sessions, base_dir):
+    rng = np.random.default_rng(0)
+    side = int(np.ceil(voxels ** (1 / 3)))
+    shape = (side,) * 3
+    subjects_sessions = []
+    for i in range(subjects):
+        effect = rng.standard_normal(shape)
+        subjects_sessions.append([])
+        for j in range(sessions):
+            fname = op.join(base_dir, f"sub-{i:02d}_ses-{j}.nii")
+            data = (effect + rng.standard_normal(shape)).astype(np.float32)
+            nb.Nifti1Image(data, np.eye(4)).to_filename(fname)
+            subjects_sessions[-1].append(fname)
+    mask = np.zeros(side**3, dtype=np.uint8)
+    mask[:voxels] = 1
+    mask_file = op.join(base_dir, "mask.nii")
+    nb.Nifti1Image(mask.reshape(shape), np.eye(4)).to_filename(mask_file)
+    return subjects_sessions, mask_file
+
+
+def bench(func, *args):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--voxels", type=int, default=50000)
+    parser.add_argument("--subjects", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        subjects_sessions, mask = make_data(
+            args.voxels, args.subjects, args.sessions, base_dir
+        )
+
+        def run_interface():
+            icc = ICC(subjects_sessions=subjects_sessions, mask=mask)
+            if args.chunk_size:
+                icc.inputs.chunk_size = args.chunk_size
+            cwd = os.getcwd()
+            os.chdir(base_dir)
+            try:
+                res = icc.run()
+            finally:
+                os.chdir(cwd)
+            return nb.load(res.outputs.icc_map).get_fdata()
+
+        expected, elapsed, peak = bench(reference_icc, subjects_sessions, mask)
+        print(
+            "per-voxel voxels=%d time=%.2fs peak=%.1fMB"
+            % (args.voxels, elapsed, peak / 2**20)
+        )
+        result, elapsed, peak = bench(run_interface)
+        print(
+            "batched   voxels=%d time=%.2fs peak=%.1fMB max-err=%.1e"
+            % (args.voxels, elapsed, peak / 2**20, np.max(np.abs(result - expected)))
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Measure the time and memory needed to expand a MapNode into subnodes
+
+The MapNode iterates over ``--items`` values, and also receives a list of
+``--list-size`` strings that is shared by all the subnodes.
+
+Usage::
+
+    python tools/benchmarks/bench_mapnode_expansion.py --items 10000
+"""
+import argparse
+import os
+from copy import deepcopy
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+from nipype import config  # noqa: E402
+from nipype.pipeline import engine as pe  # noqa: E402
+from nipype.interfaces import utility as niu  # noqa: E402
+from nipype.interfaces.base import (  # noqa: E402
+    BaseInterface,
+    BaseInterfaceInputSpec,
+    TraitedSpec,
+    traits,
+)
+
+
+class _BenchInputSpec(BaseInterfaceInputSpec):
+    item = traits.Int()
+    shared = traits.List(traits.Str)
+    nested = traits.List(traits.List(traits.Float))
+
+
+class _BenchOutputSpec(TraitedSpec):
+    out = traits.Int()
+
+
+class BenchInterface(BaseInterface):
+    input_spec = _BenchInputSpec
+    output_spec = _BenchOutputSpec
+
+    def _run_interface(self, runtime):
+        return runtime
+
+
+def make_mapnode(interface, items, list_size, base_dir):
+    node = pe.MapNode(interface, iterfield=["item"], name="bench", base_dir=base_dir)
+    node.config = deepcopy(config._sections)
+    node.inputs.item = list(range(items))
+    node.inputs.shared = ["/data/sub-%05d.nii.gz" % i for i in range(list_size)]
+    if "nested" in node.inputs.copyable_trait_names():
+        node.inputs.nested = [[1.0] * 10] * 50
+    return node
+
+
+def bench(interface, items, list_size, base_dir):
+    node = make_mapnode(interface, items, list_size, base_dir)
+    tic = time.perf_counter()
+    node._get_hashval()
+    hash_time = time.perf_counter() - tic
+    tic = time.perf_counter()
+    subnodes = [subnode for _, subnode in node._make_nodes()]
+    expand_time = time.perf_counter() - tic
+    assert len(subnodes) == items
+    del subnodes
+
+    node = make_mapnode(interface, items, list_size, base_dir)
+    tracemalloc.start()
+    # Keep the subnodes alive, so that the peak includes all of them
+    subnodes = [subnode for _, subnode in node._make_nodes()]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert len(subnodes) == items
+    return hash_time, expand_time, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--list-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        for interface in (
+            BenchInterface(),
+            niu.IdentityInterface(fields=["item", "shared"]),
+        ):
+            hash_time, expand_time, peak = bench(
+                interface, args.items, args.list_size, base_dir
+            )
+            print(
+                "%-18s items=%d hash=%.3fs expand=%.2fs (%.2fms/subnode) "
+                "peak=%.1fMB"
+                % (
+                    type(interface).__name__,
+                    args.items,
+                    hash_time,
+                    expand_time,
+                    1e3 * expand_time / args.items,
+                    peak / 2**20,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
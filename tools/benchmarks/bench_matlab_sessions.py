@@ -0,0 +1,70 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare running MATLAB scripts in new processes and in persistent sessions
+
+``--jobs`` scripts are run one after the other by
+:class:`~nipype.interfaces.matlab.MatlabCommand`, first starting a new
+interpreter for each of them and then with the ``matlab_sessions`` option
+enabled. Any interpreter reading code from its standard input can be used.
+
+Usage::
+
+    python tools/benchmarks/bench_matlab_sessions.py --jobs 10 \\
+        --matlab-cmd "octave --no-gui --quiet"
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+from nipype import config  # noqa: E402
+from nipype.interfaces.matlab import MatlabCommand, session_pool  # noqa: E402
+
+
+def bench(matlab_cmd, jobs, script, base_dir):
+    tic = time.perf_counter()
+    for i in range(jobs):
+        cwd = os.path.join(base_dir, "job%03d" % i)
+        os.makedirs(cwd)
+        os.chdir(cwd)
+        MatlabCommand(
+            matlab_cmd=matlab_cmd,
+            script=script,
+            single_comp_thread=False,
+            nodesktop=False,
+            nosplash=False,
+        ).run()
+    return time.perf_counter() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matlab-cmd", default="matlab -nodesktop -nosplash")
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--script", default="a = magic(4);")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as base_dir:
+        try:
+            for sessions in ("false", "true"):
+                config.set("execution", "matlab_sessions", sessions)
+                elapsed = bench(
+                    args.matlab_cmd,
+                    args.jobs,
+                    args.script,
+                    os.path.join(base_dir, sessions),
+                )
+                print(
+                    "sessions=%-5s jobs=%d time=%.2fs per-job=%.2fs"
+                    % (sessions, args.jobs, elapsed, elapsed / args.jobs)
+                )
+        finally:
+            os.chdir(cwd)
+            session_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare the vertex area weighting of ComputeMeshWarp with the per-vertex loop
+
+An icosphere is built by ``--subdivisions`` loop subdivisions of an
+icosahedron (6 gives 40962 vertices, 7 gives 163842 vertices, the size of a
+FreeSurfer hemisphere). The area weights are computed with
+:func:`nipype.algorithms.mesh.vertex_areas`, and with the loop it replaced,
+which scanned all faces for every vertex, on an icosphere of
+``--reference-subdivisions`` (the loop is quadratic in the number of vertices).
+
+Usage::
+
+    python tools/benchmarks/bench_mesh_areas.py --subdivisions 7 \\
+        --reference-subdivisions 4
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import numpy as np  # noqa: E402
+from numpy import linalg as nla  # noqa: E402
+
+from nipype.algorithms.mesh import vertex_areas  # noqa: E402
+
+
+def _triangle_area(A, B, C):
+    ABxAC = nla.norm(A - B) * nla.norm(A - C)
+    prod = np.dot(B - A, C - A)
+    angle = np.arccos(prod / ABxAC)
+    return 0.5 * ABxAC * np.sin(angle)
+
+
+def reference_vertex_areas(points, faces):
+    """The per-vertex loop that ``vertex_areas`` replaced."""
+    weights = np.ones(len(points))
+    for i in range(len(points)):
+        w = 0.0
+        for idset in faces[(faces[:, :] == i).any(axis=1)]:
+            w += _triangle_area(*points[idset])
+        weights[i] = w
+    return weights
+
+
+def icosphere(subdivisions):
+    t = (1 + np.sqrt(5)) / 2
+    points = np.array(
+        [
+            [-1, t, 0], [1, t, 0], [-1, -t, 0], [1, -t, 0],
+            [0, -1, t], [0, 1, t], [0, -1, -t], [0, 1, -t],
+            [t, 0, -1], [t, 0, 1], [-t, 0, -1], [-t, 0, 1],
+        ],
+        dtype=float,
+    )  # fmt: skip
+    faces = np.array(
+        [
+            [0, 11, 5], [0, 5, 1], [0, 1, 7], [0, 7, 10], [0, 10, 11],
+            [1, 5, 9], [5, 11, 4], [11, 10, 2], [10, 7, 6], [7, 1, 8],
+            [3, 9, 4], [3, 4, 2], [3, 2, 6], [3, 6, 8], [3, 8, 9],
+            [4, 9, 5], [2, 4, 11], [6, 2, 10], [8, 6, 7], [9, 8, 1],
+        ]
+    )  # fmt: skip
+    for _ in range(subdivisions):
+        edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+        edges, midpoint = np.unique(edges, axis=0, return_inverse=True)
+        midpoint = midpoint.reshape(-1, 3) + len(points)
+        points = np.vstack([points, points[edges].mean(axis=1)])
+        a, b, c = faces.T
+        ab, bc, ca = midpoint.T
+        faces = np.vstack(
+            [
+                np.column_stack([a, ab, ca]),
+                np.column_stack([b, bc, ab]),
+                np.column_stack([c, ca, bc]),
+                np.column_stack([ab, bc, ca]),
+            ]
+        )
+    return points / nla.norm(points, axis=1)[:, np.newaxis], faces
+
+
+def bench(func, *args):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subdivisions", type=int, default=7)
+    parser.add_argument("--reference-subdivisions", type=int, default=4)
+    args = parser.parse_args()
+
+    points, faces = icosphere(args.reference_subdivisions)
+    expected, elapsed, peak = bench(reference_vertex_areas, points, faces)
+    print(
+        "per-vertex  vertices=%-7d time=%.2fs peak=%.1fMB"
+        % (len(points), elapsed, peak / 2**20)
+    )
+    result, elapsed, peak = bench(vertex_areas, points, faces)
+    print(
+        "vectorized  vertices=%-7d time=%.4fs peak=%.1fMB max-err=%.1e"
+        % (len(points), elapsed, peak / 2**20, np.max(np.abs(result - expected)))
+    )
+
+    points, faces = icosphere(args.subdivisions)
+    result, elapsed, peak = bench(vertex_areas, points, faces)
+    print(
+        "vectorized  vertices=%-7d time=%.4fs peak=%.1fMB total-area=%.4f"
+        % (len(points), elapsed, peak / 2**20, result.sum() / 3)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare scheduling chains of utility nodes with and without node fusion
+
+A workflow of ``--branches`` parallel chains, each alternating ``--length``
+:class:`~nipype.interfaces.utility.Merge` and
+:class:`~nipype.interfaces.utility.Select` nodes, is run with the
+``--plugin``, first scheduling every node as a separate task and then with
+the ``fuse_nodes`` execution option enabled.
+
+Usage::
+
+    python tools/benchmarks/bench_node_fusion.py --branches 20 --length 10 \\
+        --plugin MultiProc --n-procs 4
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nipype.pipeline.engine as pe  # noqa: E402
+from nipype.interfaces.utility import Merge, Select  # noqa: E402
+
+
+def make_workflow(branches, length, base_dir):
+    wf = pe.Workflow(name="branches", base_dir=base_dir)
+    tails = []
+    for branch in range(branches):
+        previous = pe.Node(Merge(1), name="merge%03d_000" % branch)
+        previous.inputs.in1 = branch
+        for i in range(1, length):
+            if i % 2:
+                node = pe.Node(Select(index=0), name="select%03d_%03d" % (branch, i))
+                wf.connect(previous, "out", node, "inlist")
+            else:
+                node = pe.Node(Merge(1), name="merge%03d_%03d" % (branch, i))
+                wf.connect(previous, "out", node, "in1")
+            previous = node
+        tails.append(previous.name)
+    return wf, tails
+
+
+def bench(args, fuse_nodes, base_dir):
+    wf, tails = make_workflow(args.branches, args.length, base_dir)
+    wf.config["execution"]["fuse_nodes"] = fuse_nodes
+    wf.config["execution"]["poll_sleep_duration"] = args.poll
+    tic = time.perf_counter()
+    execgraph = wf.run(plugin=args.plugin, plugin_args={"n_procs": args.n_procs})
+    elapsed = time.perf_counter() - tic
+    outputs = {node.name: node.result.outputs.out for node in execgraph.nodes()}
+    mismatches = sum(
+        outputs[tail] not in (branch, [branch]) for branch, tail in enumerate(tails)
+    )
+    return elapsed, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--branches", type=int, default=10)
+    parser.add_argument("--length", type=int, default=6)
+    parser.add_argument("--plugin", default="MultiProc")
+    parser.add_argument("--n-procs", type=int, default=4)
+    parser.add_argument("--poll", type=float, default=0.1)
+    args = parser.parse_args()
+
+    logging.getLogger("nipype.workflow").setLevel(logging.WARNING)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as base_dir:
+        os.chdir(base_dir)
+        try:
+            for fuse_nodes in (False, True):
+                elapsed, mismatches = bench(
+                    args, fuse_nodes, os.path.join(base_dir, str(fuse_nodes))
+                )
+                print(
+                    "fuse_nodes=%-5s nodes=%d time=%.2fs mismatches=%d"
+                    % (fuse_nodes, args.branches * args.length, elapsed, mismatches)
+                )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare S3DataGrabber template lookups with scanning the whole listing
+
+A synthetic bucket listing of ``--subjects`` subjects, each with an
+anatomical and ``--runs`` functional runs (plus their sidecars), is searched
+for the files of every subject, first matching every key against each
+template, as S3DataGrabber used to, and then through the sorted index, which
+only tests the keys sharing the literal prefix of the template.
+
+Usage::
+
+    python tools/benchmarks/bench_s3_index.py --subjects 1000 --runs 4
+"""
+import argparse
+import os
+import re
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+from nipype.interfaces.io import _S3KeyIndex  # noqa: E402
+
+TEMPLATES = [
+    "ds/%s/anat/%s_T1w.nii.gz",
+    "ds/%s/func/%s_task-rest_run-0[0-9]_bold.nii.gz",
+]
+
+
+def make_listing(subjects, runs):
+    keys = []
+    for i in range(subjects):
+        sub = "sub-%04d" % i
+        keys.append("ds/%s/anat/%s_T1w.nii.gz" % (sub, sub))
+        for run in range(runs):
+            prefix = "ds/%s/func/%s_task-rest_run-%02d_bold" % (sub, sub, run)
+            keys.extend([prefix + ".nii.gz", prefix + ".json"])
+    return [SimpleNamespace(key=key, size=0, etag="") for key in keys]
+
+
+def bench(match, subjects):
+    tic = time.perf_counter()
+    result = [
+        match(template % ("sub-%04d" % i, "sub-%04d" % i))
+        for i in range(subjects)
+        for template in TEMPLATES
+    ]
+    return result, time.perf_counter() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subjects", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=4)
+    args = parser.parse_args()
+
+    listing = make_listing(args.subjects, args.runs)
+    names = [k.key for k in listing]
+    expected, elapsed = bench(
+        lambda template: [n for n in names if re.match(template, n)], args.subjects
+    )
+    print("scan  keys=%d time=%.2fs" % (len(names), elapsed))
+    tic = time.perf_counter()
+    index = _S3KeyIndex(listing)
+    build = time.perf_counter() - tic
+    result, elapsed = bench(index.match, args.subjects)
+    print(
+        "index keys=%d time=%.2fs (build %.2fs) mismatches=%d"
+        % (
+            len(names),
+            elapsed,
+            build,
+            sum(r != e for r, e in zip(result, expected)),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare the regressors of SpecifySparseModel with the per-event convolutions
+
+An event-related design of ``--trials`` trials split among ``--conditions``
+conditions is converted into sparse-acquisition regressors by
+``SpecifySparseModel._gen_regressors`` and by the implementation it replaced,
+which convolved the whole timeline with a boxcar for every event and sampled
+scans in a Python loop.
+
+Usage::
+
+    python tools/benchmarks/bench_sparse_model.py --trials 2000 --scans 800 \\
+        --conditions 4
+"""
+import argparse
+import math
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import numpy as np  # noqa: E402
+
+from nipype.algorithms.modelgen import SpecifySparseModel, orth, spm_hrf  # noqa: E402
+
+
+def reference_regress(inputs, i_onsets, i_durations, i_amplitudes, nscans):
+    """The single-condition regressor builder ``_gen_regressors`` replaced."""
+    TR = int(np.round(inputs.time_repetition * 1000))
+    TA = int(np.round(inputs.time_acquisition * 1000))
+    nvol = inputs.volumes_in_cluster
+    SCANONSET = np.round(inputs.scan_onset * 1000)
+    total_time = TR * (nscans - nvol) / nvol + TA * nvol + SCANONSET
+    SILENCE = TR - TA * nvol
+    dt = TA / 10.0
+    durations = np.round(np.array(i_durations) * 1000)
+    if len(durations) == 1:
+        durations = durations * np.ones(len(i_onsets))
+    onsets = np.round(np.array(i_onsets) * 1000)
+    dttemp = math.gcd(TA, math.gcd(SILENCE, TR))
+    if dt < dttemp and dttemp % dt != 0:
+        dt = float(math.gcd(dttemp, int(dt)))
+    npts = int(np.ceil(total_time / dt))
+    timeline = np.zeros(npts)
+    timeline2 = np.zeros(npts)
+    hrf = spm_hrf(dt * 1e-3)
+    boxcar = np.zeros(int(50.0 * 1e3 / dt))
+    boxcar[int(1.0 * 1e3 / dt) : int(2.0 * 1e3 / dt)] = 1.0
+    reg_scale = 1.0 / np.convolve(boxcar, hrf).max()
+    for i, t in enumerate(onsets):
+        idx = int(np.round(t / dt))
+        timeline2[idx] = i_amplitudes[i] if i_amplitudes else 1
+        if durations[i] == 0:
+            durations[i] = TA * nvol
+        stimdur = np.ones(int(durations[i] / dt))
+        timeline2 = np.convolve(timeline2, stimdur)[0 : len(timeline2)]
+        timeline += timeline2
+        timeline2[:] = 0
+    timeline = np.convolve(timeline, hrf)[0 : len(timeline)]
+    timederiv = np.concatenate(([0], np.diff(timeline)))
+    reg = []
+    regderiv = []
+    for i, trial in enumerate(np.arange(nscans) / nvol):
+        scanstart = int((SCANONSET + trial * TR + (i % nvol) * TA) / dt)
+        scanidx = scanstart + np.arange(int(TA / dt))
+        reg.insert(i, np.mean(timeline[scanidx]) * reg_scale)
+        regderiv.insert(i, np.mean(timederiv[scanidx]) * reg_scale)
+    return [reg, orth(reg, regderiv)]
+
+
+def make_events(trials, conditions, scans, tr):
+    rng = np.random.default_rng(0)
+    onsets = np.sort(rng.uniform(0, (scans - 2) * tr, trials))
+    labels = rng.integers(0, conditions, trials)
+    return [
+        (
+            onsets[labels == c].tolist(),
+            rng.uniform(0.5, 3, (labels == c).sum()).round(1).tolist(),
+            rng.uniform(0.5, 2, (labels == c).sum()).tolist(),
+        )
+        for c in range(conditions)
+    ]
+
+
+def bench(func, *args):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=1000)
+    parser.add_argument("--conditions", type=int, default=4)
+    parser.add_argument("--scans", type=int, default=400)
+    args = parser.parse_args()
+
+    model = SpecifySparseModel(
+        input_units="secs",
+        time_repetition=3.0,
+        time_acquisition=1.0,
+        model_hrf=True,
+        use_temporal_deriv=True,
+        stimuli_as_impulses=False,
+    )
+    events = make_events(
+        args.trials, args.conditions, args.scans, model.inputs.time_repetition
+    )
+
+    expected, elapsed, peak = bench(
+        lambda: [
+            reference_regress(model.inputs, *event, args.scans) for event in events
+        ]
+    )
+    print(
+        "per-event trials=%d scans=%d time=%.2fs peak=%.1fMB"
+        % (args.trials, args.scans, elapsed, peak / 2**20)
+    )
+    result, elapsed, peak = bench(model._gen_regressors, events, args.scans)
+    error = max(
+        np.max(np.abs(np.array(r) - np.array(e))) for r, e in zip(result, expected)
+    )
+    print(
+        "batched   trials=%d scans=%d time=%.2fs peak=%.1fMB max-err=%.1e"
+        % (args.trials, args.scans, elapsed, peak / 2**20, error)
+    )
+
+
+if __name__ == "__main__":
+    main()
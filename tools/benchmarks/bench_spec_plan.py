@@ -0,0 +1,148 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare command line validation and formatting with and without spec plans
+
+Every :class:`~nipype.interfaces.base.CommandLine` interface found in the
+``--packages`` is instantiated with default inputs, and its mandatory inputs
+are checked and its arguments formatted ``--repeat`` times, both with the
+per-class :class:`~nipype.interfaces.base.specs.SpecPlan` and with the
+metadata queries it replaced.
+
+Usage::
+
+    python tools/benchmarks/bench_spec_plan.py --repeat 200 --packages fsl afni
+"""
+import argparse
+import importlib
+import inspect
+import os
+import time
+import warnings
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+from nipype.interfaces.base import CommandLine, isdefined  # noqa: E402
+
+PACKAGES = ["afni", "ants", "freesurfer", "fsl", "mrtrix3", "niftyreg", "workbench"]
+
+
+def reference_check_mandatory_inputs(iface):
+    """The metadata queries of ``_check_mandatory_inputs`` before plans."""
+    for name, spec in list(iface.inputs.traits(mandatory=True).items()):
+        value = getattr(iface.inputs, name)
+        iface._check_xor(spec, name, value)
+        if not isdefined(value) and spec.xor is None:
+            raise ValueError(name)
+        if isdefined(value):
+            iface._check_requires(spec, name, value)
+    for name, spec in list(iface.inputs.traits(mandatory=None, transient=None).items()):
+        iface._check_requires(spec, name, getattr(iface.inputs, name))
+
+
+def reference_parse_inputs(iface):
+    """``CommandLine._parse_inputs`` before plans."""
+    all_args = []
+    initial_args = {}
+    final_args = {}
+    metadata = dict(argstr=lambda t: t is not None)
+    for name, spec in sorted(iface.inputs.traits(**metadata).items()):
+        value = getattr(iface.inputs, name)
+        if spec.name_source:
+            value = iface._filename_from_source(name)
+        elif spec.genfile:
+            if not isdefined(value) or value is None:
+                value = iface._gen_filename(name)
+        if not isdefined(value):
+            continue
+        arg = iface._format_arg(name, spec, value)
+        if arg is None:
+            continue
+        pos = spec.position
+        if pos is not None:
+            if int(pos) >= 0:
+                initial_args[pos] = arg
+            else:
+                final_args[pos] = arg
+        else:
+            all_args.append(arg)
+    first_args = [el for _, el in sorted(initial_args.items())]
+    last_args = [el for _, el in sorted(final_args.items())]
+    return first_args + all_args + last_args
+
+
+def planned_check_mandatory_inputs(iface):
+    CommandLine._check_mandatory_inputs(iface)
+
+
+def planned_parse_inputs(iface):
+    return CommandLine._parse_inputs(iface)
+
+
+def collect_interfaces(packages):
+    interfaces = []
+    for package in packages:
+        try:
+            module = importlib.import_module("nipype.interfaces.%s" % package)
+        except ImportError:
+            continue
+        for _, klass in inspect.getmembers(module, inspect.isclass):
+            if not issubclass(klass, CommandLine) or klass.input_spec is None:
+                continue
+            try:
+                iface = klass()
+                reference_parse_inputs(iface)
+            except Exception:
+                continue
+            interfaces.append(iface)
+    return interfaces
+
+
+def bench(func, interfaces, repeat):
+    results = []
+    tic = time.perf_counter()
+    for iface in interfaces:
+        for _ in range(repeat):
+            try:
+                result = func(iface)
+            except ValueError as err:
+                result = type(err)
+        results.append(result)
+    return results, time.perf_counter() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--packages", nargs="+", default=PACKAGES)
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        interfaces = collect_interfaces(args.packages)
+        for label, reference, planned in (
+            (
+                "check_mandatory",
+                reference_check_mandatory_inputs,
+                planned_check_mandatory_inputs,
+            ),
+            ("parse_inputs", reference_parse_inputs, planned_parse_inputs),
+        ):
+            expected, elapsed = bench(reference, interfaces, args.repeat)
+            print(
+                "%-16s metadata interfaces=%d time=%.2fs"
+                % (label, len(interfaces), elapsed)
+            )
+            result, elapsed = bench(planned, interfaces, args.repeat)
+            print(
+                "%-16s plan     interfaces=%d time=%.2fs mismatches=%d"
+                % (
+                    label,
+                    len(interfaces),
+                    elapsed,
+                    sum(r != e for r, e in zip(result, expected)),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
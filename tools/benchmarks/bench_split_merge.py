@@ -0,0 +1,163 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare split_rois/merge_rois with the implementations they replaced
+
+A ``--shape`` series of ``--volumes`` volumes and a brain-like mask are
+written to a temporary directory, split into ROIs of ``--roi-size`` voxels
+and merged back, both by :func:`nipype.algorithms.misc.split_rois` /
+:func:`~nipype.algorithms.misc.merge_rois` and by the versions they
+replaced. Those loaded the whole series to split it, and merged 300 volumes
+or more by rewriting one 3D image per volume and ROI.
+
+Usage::
+
+    python tools/benchmarks/bench_split_merge.py --volumes 300 --ext .nii \\
+        --num-threads 4
+"""
+import argparse
+import os
+import os.path as op
+import tempfile
+import time
+import tracemalloc
+from math import ceil
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nibabel as nb  # noqa: E402
+import numpy as np  # noqa: E402
+
+from nipype.algorithms.misc import merge_rois, split_rois  # noqa: E402
+
+
+def reference_split_rois(in_file, mask, roishape):
+    """The split that loaded the whole series (partial masks omitted)."""
+    im = nb.load(in_file)
+    nvols = im.shape[-1]
+    roisize = int(np.prod(roishape))
+    mask = (np.asanyarray(nb.load(mask).dataobj) > 0).reshape(-1).astype(np.uint8)
+    nzels = np.nonzero(mask)
+    els = np.sum(mask)
+    data = np.asanyarray(im.dataobj).reshape((mask.size, -1))
+    data = np.squeeze(data.take(nzels, axis=0))
+    out_files, out_idxs = [], []
+    for i in range(int(ceil(els / float(roisize)))):
+        first, last = i * roisize, min((i + 1) * roisize, els)
+        droi = data[first:last, ...]
+        iname = op.abspath("ref%010d_idx" % i)
+        out_idxs.append(iname + ".npz")
+        np.savez(iname, (nzels[0][first:last],))
+        fill = (i + 1) * roisize - last
+        if fill > 0:
+            droi = np.vstack((droi, np.zeros((fill, nvols), dtype=np.float32)))
+        fname = op.abspath("ref%010d.nii.gz" % i)
+        nb.Nifti1Image(droi.reshape(tuple(roishape) + (nvols,)), None).to_filename(
+            fname
+        )
+        out_files.append(fname)
+    return out_files, out_idxs
+
+
+def reference_merge_rois(in_files, in_idxs, in_ref):
+    """The merge that kept one 3D file per volume for long series."""
+    ref = nb.load(in_ref)
+    aff, hdr, rsh = ref.affine, ref.header.copy(), ref.shape[:3]
+    ndirs = nb.load(in_files[0]).shape[-1]
+    hdr.set_data_dtype(np.float32)
+    out_file = op.abspath("ref_merged.nii.gz")
+    if ndirs < 300:
+        data = np.zeros((np.prod(rsh), ndirs), dtype=np.float32)
+        for cname, iname in zip(in_files, in_idxs):
+            idxs = np.squeeze(np.load(iname)["arr_0"])
+            cdata = np.asanyarray(nb.load(cname).dataobj).reshape(-1, ndirs)
+            data[idxs, ...] = cdata[0 : len(idxs), ...]
+        nb.Nifti1Image(data.reshape(rsh + (ndirs,)), aff, hdr).to_filename(out_file)
+        return out_file
+
+    hdr.set_data_shape(rsh)
+    nii = []
+    for d in range(ndirs):
+        fname = op.abspath("vol%06d.nii" % d)
+        nb.Nifti1Image(np.zeros(rsh), aff, hdr).to_filename(fname)
+        nii.append(fname)
+    for cname, iname in zip(in_files, in_idxs):
+        idxs = np.atleast_1d(np.squeeze(np.load(iname)["arr_0"]))
+        for d, fname in enumerate(nii):
+            data = np.asanyarray(nb.load(fname).dataobj).reshape(-1)
+            data[idxs] = nb.load(cname).dataobj[..., d].reshape(-1)[: len(idxs)]
+            nb.Nifti1Image(data.reshape(rsh), aff, hdr).to_filename(fname)
+    nb.concat_images([nb.load(im) for im in nii]).to_filename(out_file)
+    return out_file
+
+
+def make_data(shape, volumes, ext):
+    rng = np.random.default_rng(0)
+    grid = np.ogrid[tuple(slice(0, s) for s in shape)]
+    dist2 = sum(((g - s / 2) / (s / 2.5)) ** 2 for g, s in zip(grid, shape))
+    mask = (dist2 <= 1).astype(np.uint8)
+    data = rng.normal(1000, 50, shape + (volumes,)).astype(np.float32)
+    nb.Nifti1Image(data, np.eye(4)).to_filename("dwi" + ext)
+    nb.Nifti1Image(mask, np.eye(4)).to_filename("mask.nii.gz")
+    return "dwi" + ext, "mask.nii.gz"
+
+
+def bench(func, *args, **kwargs):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    result = func(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shape", type=int, nargs=3, default=[64, 64, 40])
+    parser.add_argument("--volumes", type=int, default=64)
+    parser.add_argument("--roi-size", type=int, nargs=3, default=[20, 20, 20])
+    parser.add_argument("--ext", choices=[".nii.gz", ".nii"], default=".nii")
+    parser.add_argument("--num-threads", type=int, default=1)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as base_dir:
+        os.chdir(base_dir)
+        try:
+            in_file, mask = make_data(tuple(args.shape), args.volumes, args.ext)
+            (files, idxs), elapsed, peak = bench(
+                reference_split_rois, in_file, mask, args.roi_size
+            )
+            print(
+                "old split  rois=%d time=%.2fs peak=%.1fMB"
+                % (len(files), elapsed, peak / 2**20)
+            )
+            expected, elapsed, peak = bench(reference_merge_rois, files, idxs, mask)
+            print("old merge  time=%.2fs peak=%.1fMB" % (elapsed, peak / 2**20))
+
+            (files, _, idxs), elapsed, peak = bench(
+                split_rois,
+                in_file,
+                mask,
+                args.roi_size,
+                num_threads=args.num_threads,
+            )
+            print(
+                "new split  rois=%d time=%.2fs peak=%.1fMB"
+                % (len(files), elapsed, peak / 2**20)
+            )
+            result, elapsed, peak = bench(
+                merge_rois, files, idxs, mask, num_threads=args.num_threads
+            )
+            error = np.max(
+                np.abs(nb.load(result).get_fdata() - nb.load(expected).get_fdata())
+            )
+            print(
+                "new merge  time=%.2fs peak=%.1fMB max-err=%.1e"
+                % (elapsed, peak / 2**20, error)
+            )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare inserting rows with SQLiteSink one connection at a time and pooled
+
+``--subjects`` times ``--rois`` rows are written to a temporary SQLite
+database: first with the sink as it was before, opening a connection and
+committing for each row; then with one
+:class:`~nipype.interfaces.io.SQLiteSink` run per row through the pooled
+connection; then buffering those rows; and finally with one multi-row run per
+subject.
+
+Usage::
+
+    python tools/benchmarks/bench_sql_sinks.py --subjects 50 --rois 100
+"""
+import argparse
+import os
+import os.path as op
+import sqlite3
+import tempfile
+import time
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+from nipype.interfaces.io import SQLiteSink, sql_sinks  # noqa: E402
+
+NAMES = ["subject_id", "roi", "value"]
+
+
+class ReferenceSQLiteSink(SQLiteSink):
+    """``SQLiteSink`` before pooling: connect, insert and commit every run."""
+
+    def _list_outputs(self):
+        conn = sqlite3.connect(self.inputs.database_file, check_same_thread=False)
+        c = conn.cursor()
+        c.execute(
+            "INSERT OR REPLACE INTO %s (" % self.inputs.table_name
+            + ",".join(self._input_names)
+            + ") VALUES ("
+            + ",".join(["?"] * len(self._input_names))
+            + ")",
+            [getattr(self.inputs, name) for name in self._input_names],
+        )
+        conn.commit()
+        c.close()
+        return None
+
+
+def make_database(database_file):
+    conn = sqlite3.connect(database_file)
+    conn.execute(
+        "CREATE TABLE results (subject_id TEXT, roi INTEGER, value REAL, "
+        "PRIMARY KEY (subject_id, roi))"
+    )
+    conn.commit()
+    conn.close()
+
+
+def read_database(database_file):
+    conn = sqlite3.connect(database_file)
+    rows = conn.execute("SELECT * FROM results ORDER BY subject_id, roi").fetchall()
+    conn.close()
+    return rows
+
+
+def run_sink(database_file, klass=SQLiteSink, **values):
+    sink = klass(input_names=NAMES, database_file=database_file, table_name="results")
+    sink.inputs.trait_set(**values)
+    sink.run()
+
+
+def bench(mode, database_file, subjects, rois):
+    make_database(database_file)
+    tic = time.perf_counter()
+    for subject in range(subjects):
+        subject_id = "sub-%03d" % subject
+        values = [subject + roi / rois for roi in range(rois)]
+        if mode == "multirow":
+            run_sink(
+                database_file,
+                multiple_rows=True,
+                subject_id=subject_id,
+                roi=list(range(rois)),
+                value=values,
+            )
+            continue
+        for roi, value in enumerate(values):
+            run_sink(
+                database_file,
+                klass=ReferenceSQLiteSink if mode == "reference" else SQLiteSink,
+                buffered=mode == "buffered",
+                subject_id=subject_id,
+                roi=roi,
+                value=value,
+            )
+    sql_sinks.flush()
+    return read_database(database_file), time.perf_counter() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subjects", type=int, default=20)
+    parser.add_argument("--rois", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        expected = None
+        for mode in ("reference", "pooled", "buffered", "multirow"):
+            rows, elapsed = bench(
+                mode, op.join(base_dir, "%s.db" % mode), args.subjects, args.rois
+            )
+            expected = rows if expected is None else expected
+            print(
+                "%-9s rows=%d time=%.2fs mismatches=%d"
+                % (
+                    mode,
+                    len(rows),
+                    elapsed,
+                    sum(r != e for r, e in zip(rows, expected)),
+                )
+            )
+        sql_sinks.close()
+
+
+if __name__ == "__main__":
+    main()
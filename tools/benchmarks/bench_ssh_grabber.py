@@ -0,0 +1,78 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare SSHDataGrabber runs with fresh and with pooled connections
+
+One :class:`~nipype.interfaces.io.SSHDataGrabber` per subject fetches the
+files matching ``--template`` (filled with the subject identifier) from
+``--base-directory`` on ``--hostname``: first connecting, listing and
+downloading file after file for every run, as the grabber used to, and then
+sharing the connection and listings across runs and downloading
+``--num-threads`` files at a time. Requires paramiko and an SSH server
+reachable without a password (e.g., through an SSH agent).
+
+Usage::
+
+    python tools/benchmarks/bench_ssh_grabber.py --hostname myhost.com \\
+        --base-directory /data --template '%s/T1w.nii.gz' \\
+        --subjects 01 02 03
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+from nipype.interfaces.io import SSHDataGrabber, ssh_connections  # noqa: E402
+
+
+def bench(args, pooled):
+    outputs = []
+    tic = time.perf_counter()
+    for subject in args.subjects:
+        if not pooled:
+            ssh_connections.close()
+        dg = SSHDataGrabber(infields=["sid"])
+        dg.inputs.hostname = args.hostname
+        dg.inputs.base_directory = args.base_directory
+        dg.inputs.template = args.template
+        dg.inputs.template_args = dict(outfiles=[["sid"]])
+        dg.inputs.sid = subject
+        dg.inputs.sort_filelist = True
+        dg.inputs.cache_listings = pooled
+        dg.inputs.num_threads = args.num_threads if pooled else 1
+        outputs.append(dg.run().outputs.outfiles)
+    ssh_connections.close()
+    return outputs, time.perf_counter() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hostname", required=True)
+    parser.add_argument("--base-directory", required=True)
+    parser.add_argument("--template", required=True)
+    parser.add_argument("--subjects", nargs="+", required=True)
+    parser.add_argument("--num-threads", type=int, default=4)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as base_dir:
+        os.chdir(base_dir)
+        try:
+            expected, elapsed = bench(args, False)
+            print("fresh  subjects=%d time=%.2fs" % (len(args.subjects), elapsed))
+            result, elapsed = bench(args, True)
+            print(
+                "pooled subjects=%d time=%.2fs mismatches=%d"
+                % (
+                    len(args.subjects),
+                    elapsed,
+                    sum(r != e for r, e in zip(result, expected)),
+                )
+            )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
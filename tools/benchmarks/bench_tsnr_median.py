@@ -0,0 +1,123 @@
+# emacs: -*- mode: python; py-indent-offset: 4; indent-tabs-mode: nil -*-
+# vi: set ft=python sts=4 ts=4 sw=4 et:
+"""Compare the slab-wise TSNR and CalculateMedian with whole-series loading
+
+``--runs`` runs of ``--timepoints`` volumes are written to a temporary
+directory. TSNR and CalculateMedian are run with the implementations they
+replaced, which concatenated every run in memory (TSNR) or loaded each file
+with ``get_fdata`` (CalculateMedian), and then with ``--slab-size`` and
+``--num-threads``.
+
+Usage::
+
+    python tools/benchmarks/bench_tsnr_median.py --runs 3 --timepoints 600 \\
+        --slab-size 4 --num-threads 4
+"""
+import argparse
+import os
+import os.path as op
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("NIPYPE_NO_ET", "1")
+
+import nibabel as nb  # noqa: E402
+import numpy as np  # noqa: E402
+
+from nipype.algorithms.confounds import TSNR  # noqa: E402
+from nipype.algorithms.misc import CalculateMedian  # noqa: E402
+
+
+def reference_tsnr(fnames):
+    """The concatenation that ``TSNR`` replaced."""
+    data = np.concatenate(
+        [np.asarray(nb.load(f).dataobj, dtype=np.float32) for f in fnames], axis=3
+    )
+    meanimg = np.mean(data, axis=3)
+    stddevimg = np.std(data, axis=3)
+    return meanimg, stddevimg
+
+
+def reference_median(fnames):
+    """The whole-file loading that ``CalculateMedian`` replaced."""
+    return [np.median(nb.load(f).get_fdata(), axis=3) for f in fnames]
+
+
+def make_runs(runs, timepoints, shape, base_dir):
+    rng = np.random.default_rng(0)
+    fnames = []
+    for i in range(runs):
+        data = rng.normal(1000, 20, shape + (timepoints,)).astype(np.float32)
+        fnames.append(op.join(base_dir, "run-%02d.nii" % i))
+        nb.Nifti1Image(data, np.eye(4)).to_filename(fnames[-1])
+    return fnames
+
+
+def bench(func, *args):
+    tic = time.perf_counter()
+    tracemalloc.start()
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, time.perf_counter() - tic, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timepoints", type=int, default=300)
+    parser.add_argument("--shape", type=int, nargs=3, default=[64, 64, 36])
+    parser.add_argument("--slab-size", type=int, default=4)
+    parser.add_argument("--num-threads", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        fnames = make_runs(args.runs, args.timepoints, tuple(args.shape), base_dir)
+        cwd = os.getcwd()
+        os.chdir(base_dir)
+
+        def run_tsnr():
+            res = TSNR(
+                in_file=fnames,
+                slab_size=args.slab_size,
+                num_threads=args.num_threads,
+            ).run()
+            return [
+                nb.load(f).get_fdata()
+                for f in (res.outputs.mean_file, res.outputs.stddev_file)
+            ]
+
+        def run_median():
+            res = CalculateMedian(
+                in_files=fnames,
+                median_per_file=True,
+                slab_size=args.slab_size,
+                num_threads=args.num_threads,
+            ).run()
+            return [nb.load(f).get_fdata() for f in res.outputs.median_files]
+
+        try:
+            for label, reference, func in (
+                ("TSNR", reference_tsnr, run_tsnr),
+                ("CalculateMedian", reference_median, run_median),
+            ):
+                expected, elapsed, peak = bench(reference, fnames)
+                print(
+                    "%-16s whole  time=%.2fs peak=%.1fMB"
+                    % (label, elapsed, peak / 2**20)
+                )
+                result, elapsed, peak = bench(func)
+                error = max(
+                    np.max(np.abs(r - e) / np.abs(e)) for r, e in zip(result, expected)
+                )
+                print(
+                    "%-16s slabs  time=%.2fs peak=%.1fMB max-rel-err=%.1e"
+                    % (label, elapsed, peak / 2**20, error)
+                )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()